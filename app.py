@@ -3,24 +3,100 @@
 Controlador principal da aplicação web usando Bottle.
 Implementa o padrão MVC - este é o Controller.
 """
-from bottle import Bottle, route, run, template, static_file, request, redirect, response, HTTPResponse
+from bottle import Bottle, route, run, static_file, request, redirect, response, abort, HTTPResponse
 import json
 import os
 import sys
+import threading
+import time
 import traceback
 
 # Adiciona o diretório atual ao path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from models import Colonia, TIPOS_EDIFICIOS
+from models import (Colonia, DiarioAcoes, SalvadorBackground, CacheColonias, ColoniaEmUso,
+                    TIPOS_EDIFICIOS, NUMPY_DISPONIVEL, histograma_fases, endereco_sqlite)
 from logger import game_logger
+from sessoes import ArmazenamentoSessoes
+from servidor import ServidorThreads, TRABALHADORES_PADRAO
+from fragmentos import CacheFragmentos, compilar_templates
+from atualizacoes import AvisosAlteracao, VersoesServidas, diferenca_estado, mensagem_sse
+from respostas import ArquivosEstaticos, CompressaoGzip, etag_corresponde, json_em_partes
 
-# Inicializa aplicação Bottle
+# Inicializa aplicação Bottle; HTML e JSON a partir de COLONIA_GZIP_MINIMO
+# bytes vão comprimidos com gzip para quem aceita
 app = Bottle()
+app.install(CompressaoGzip())
 
-# Variáveis globais para sessão (em produção, usar sessões reais)
-usuario_logado = None
-colonia_atual = None
+# Grava os snapshots em segundo plano (agrupando rajadas de ações)
+salvador = SalvadorBackground()
+
+# Colônias carregadas (LRU com orçamento de memória COLONIA_CACHE_MB). O
+# servidor é um processo só (threads); a trava de arquivo de cada save protege
+# contra outra instância aberta sobre os mesmos saves gravar a mesma colônia
+cache_colonias = CacheColonias(salvador=salvador, travar_saves=True)
+
+# Sessões dos jogadores: o cookie guarda só o identificador
+sessoes = ArmazenamentoSessoes()
+COOKIE_SESSAO = 'sessao'
+
+# Limite de turnos processados em uma única requisição
+MAX_TURNOS_POR_ACAO = 500
+
+# Limite de comandos em um lote do /api/acoes (os turnos do lote somados
+# também respeitam MAX_TURNOS_POR_ACAO)
+MAX_COMANDOS_POR_LOTE = 200
+
+# Colonos mostrados na página do jogo (só esses viram objetos)
+COLONOS_NA_PAGINA = 6
+
+# Grupos de edifícios mostrados na página do jogo
+EDIFICIOS_NA_PAGINA = 8
+
+# Listagens paginadas (/api/colonos, /api/edificios): itens por página
+# (padrão e máximo) e itens lidos de cada vez com a trava da colônia
+LIMITE_PAGINA_PADRAO = 100
+LIMITE_PAGINA_MAXIMO = 5000
+BLOCO_LISTAGEM = 500
+
+# Onde ficam os saves: 'arquivo' (um arquivo por usuário, ver usuarios.json)
+# ou 'sqlite' (todas as colônias no banco COLONIA_BANCO)
+ARMAZENAMENTO = os.environ.get('COLONIA_ARMAZENAMENTO', 'arquivo')
+BANCO_SQLITE = os.environ.get('COLONIA_BANCO', 'saves/colonias.db')
+
+# Modo do servidor: 'desenvolvimento' (servidor do Bottle, uma requisição por
+# vez, debug e reloader) ou 'producao' (COLONIA_TRABALHADORES threads em um
+# único processo, sem debug)
+MODO_SERVIDOR = os.environ.get('COLONIA_MODO', 'desenvolvimento')
+HOST = os.environ.get('COLONIA_HOST', '0.0.0.0')
+PORTA = int(os.environ.get('COLONIA_PORTA', 8080))
+
+# Atualizações em tempo real (SSE): avisos das ações para os streams abertos.
+# Cada stream fica aberto COLONIA_SSE_SEGUNDOS e o navegador reconecta; no
+# servidor de desenvolvimento (uma requisição por vez) ele envia e fecha.
+# Um stream aberto ocupa uma thread de trabalho: no máximo COLONIA_SSE_STREAMS
+# ficam abertos ao mesmo tempo (um quarto das threads); os demais respondem e
+# fecham, e o navegador volta a perguntar a cada SSE_CONSULTA_MS (polling)
+avisos = AvisosAlteracao()
+SSE_SEGUNDOS = float(os.environ.get('COLONIA_SSE_SEGUNDOS',
+                                    25 if MODO_SERVIDOR == 'producao' else 0))
+SSE_MAXIMO_STREAMS = int(os.environ.get('COLONIA_SSE_STREAMS', max(1, TRABALHADORES_PADRAO // 4)))
+streams_abertos = threading.BoundedSemaphore(SSE_MAXIMO_STREAMS)
+SSE_RECONEXAO_MS = 1000
+SSE_CONSULTA_MS = 3000
+SSE_KEEPALIVE = 15  # Segundos entre comentários que mantêm a conexão viva
+
+# Últimas versões servidas pelo /api/status, base das respostas ?since=
+versoes_servidas = VersoesServidas()
+
+# Arquivos estáticos lidos e comprimidos uma vez; os templates usam
+# estatico('style.css'), a URL com a impressão digital do conteúdo
+estaticos = ArquivosEstaticos('static')
+
+# Templates compilados uma vez, na inicialização; os painéis da página do
+# jogo ficam renderizados enquanto sua versão na colônia não muda
+TEMPLATES = compilar_templates('views', estatico=estaticos.url)
+fragmentos = CacheFragmentos()
 
 
 def carregar_usuarios():
@@ -35,6 +111,276 @@ def carregar_usuarios():
         return []
 
 
+def caminho_save(usuario):
+    """
+    Retorna onde fica o save do usuário.
+    
+    Args:
+        usuario: Dicionário do usuário
+        
+    Returns:
+        Caminho do arquivo ou endereço no banco SQLite
+    """
+    if ARMAZENAMENTO == 'sqlite':
+        return endereco_sqlite(BANCO_SQLITE, usuario['username'])
+    return usuario['save_file']
+
+
+def sessao_atual():
+    """
+    Retorna a sessão da requisição (pelo cookie).
+    
+    Returns:
+        Sessão, ou None se não houver ou tiver expirado
+    """
+    return sessoes.obter(request.get_cookie(COOKIE_SESSAO))
+
+
+def colonia_da_sessao(sessao):
+    """
+    Obtém a colônia do usuário da sessão do cache de colônias
+    (carregando o save e o diário se ela não estiver no cache).
+    
+    Args:
+        sessao: Sessão da requisição
+        
+    Returns:
+        Tupla (colônia ou None se não houver save ou ele não puder ser
+        lido, diário de ações do save)
+        
+    Raises:
+        HTTPError 409: Se a colônia estiver aberta em outro processo do servidor
+    """
+    try:
+        return cache_colonias.obter(sessao.caminho_save)
+    except ColoniaEmUso as e:
+        game_logger.warning(str(e), usuario=sessao.username)
+        abort(409, "Sua colônia está aberta em outro processo do servidor.")
+    except Exception as e:
+        # Save ilegível: o jogador ainda pode começar um novo jogo
+        game_logger.error(f"ERRO ao carregar colônia de {sessao.caminho_save}: {e}",
+                          usuario=sessao.username, exception=e)
+        return None, DiarioAcoes(sessao.caminho_save, salvador=salvador)
+
+
+def executar_acao(sessao, colonia, diario, acao, **argumentos):
+    """
+    Executa uma ação do jogador na colônia, registrando-a no diário,
+    atualiza a memória ocupada pela colônia no cache e avisa os streams
+    de atualização.
+    
+    Args:
+        sessao: Sessão da requisição
+        colonia: Colônia do usuário
+        diario: Diário de ações do save
+        acao: Nome da ação (ver DiarioAcoes.ACOES)
+        **argumentos: Argumentos da ação
+        
+    Returns:
+        Retorno da ação na colônia
+    """
+    resultado = diario.executar(colonia, acao, **argumentos)
+    cache_colonias.atualizar(sessao.caminho_save)
+    avisos.avisar(sessao.caminho_save)
+    return resultado
+
+
+def preparar_comando(comando):
+    """
+    Valida um comando do /api/acoes e o converte em ação do diário.
+    Comandos: {"acao": "construir", "tipo": ...}, {"acao": "contratar"},
+    {"acao": "turno", "n": ...} e {"acao": "voltar_dia", "dia": ...}.
+    
+    Args:
+        comando: Dicionário do comando
+        
+    Returns:
+        Tupla (ação do diário, argumentos)
+        
+    Raises:
+        ValueError: Se o comando for inválido
+    """
+    if not isinstance(comando, dict):
+        raise ValueError("Comando deve ser um objeto JSON")
+    acao = comando.get('acao')
+    if acao == 'construir':
+        tipo = comando.get('tipo')
+        if not isinstance(tipo, str) or tipo not in TIPOS_EDIFICIOS:
+            raise ValueError(f"Tipo de edifício inválido: {tipo}")
+        return 'construir', {'tipo': tipo}
+    if acao == 'contratar':
+        return 'contratar', {}
+    try:
+        if acao == 'turno':
+            n = int(comando.get('n', 1))
+            return 'proximo_turno', {'n': max(1, min(n, MAX_TURNOS_POR_ACAO))}
+        if acao == 'voltar_dia':
+            return 'voltar_dia', {'dia': int(comando['dia'])}
+    except (KeyError, TypeError, ValueError, OverflowError):
+        raise ValueError(f"Argumento inválido para {acao}")
+    raise ValueError(f"Ação desconhecida: {acao}")
+
+
+def resultado_comando(acao, retorno):
+    """
+    Converte o retorno de uma ação do diário no resultado do /api/acoes.
+    
+    Args:
+        acao: Ação do diário
+        retorno: Retorno da ação na colônia
+        
+    Returns:
+        Dicionário com 'sucesso' e a mensagem (ou o resumo dos turnos)
+    """
+    if acao == 'proximo_turno':
+        return {'sucesso': True, 'resumo': retorno}
+    sucesso, mensagem = retorno
+    return {'sucesso': sucesso, 'mensagem': mensagem}
+
+
+def marca_versao(versao: int) -> str:
+    """
+    Versão da colônia como a API a expõe ('versao', ETag e ?since=): o
+    número precedido da origem das versões deste processo
+    (Colonia.ORIGEM_VERSOES), para que uma versão vista antes de um
+    reinício do servidor nunca seja tomada por uma de agora.
+    """
+    return f'{Colonia.ORIGEM_VERSOES}.{versao}'
+
+
+def ler_marca_versao(marca: str):
+    """
+    Lê uma versão gerada por marca_versao.
+    
+    Returns:
+        Número da versão, ou None se ela é de outro processo
+        
+    Raises:
+        ValueError: Se a marca é inválida
+    """
+    origem, _, numero = marca.partition('.')
+    numero = int(numero)
+    return numero if origem == Colonia.ORIGEM_VERSOES else None
+
+
+def listagem_paginada(colonia, diario, chave, pagina, **filtros):
+    """
+    Resposta JSON de uma listagem paginada por cursor, gerada em partes:
+    {"versao": ..., "<chave>": [...], "proximo": <cursor ou null>}.
+    Os itens são lidos em blocos de BLOCO_LISTAGEM, cada um com a trava da
+    colônia, e enviados sem montar a página inteira. Parâmetros da
+    requisição: cursor (o 'proximo' da página anterior) e limite.
+    
+    Args:
+        colonia: Colônia do usuário
+        diario: Diário de ações do save (com a trava da colônia)
+        chave: Nome da lista na resposta ('colonos' ou 'edificios')
+        pagina: Método da colônia que retorna (itens, próxima posição)
+        **filtros: Filtros repassados ao método (None: sem filtro)
+        
+    Returns:
+        Gerador com o corpo, ou JSON de erro (status 400) se os
+        parâmetros forem inválidos
+    """
+    try:
+        inicio = int(request.query.get('cursor') or 0)
+        limite = int(request.query.get('limite') or LIMITE_PAGINA_PADRAO)
+        if inicio < 0 or limite < 1:
+            raise ValueError("Cursor e limite devem ser positivos")
+        limite = min(limite, LIMITE_PAGINA_MAXIMO)
+        
+        # Página vazia: valida os filtros e acha o primeiro item antes de
+        # começar a enviar
+        with diario.trava:
+            versao = colonia.versao
+            _, proximo = pagina(inicio=inicio, limite=0, **filtros)
+    except ValueError as e:
+        response.status = 400
+        return json.dumps({'erro': str(e)}, ensure_ascii=False)
+    
+    cursor = {'proximo': proximo}
+    
+    def itens():
+        restante = limite
+        while restante > 0 and cursor['proximo'] is not None:
+            with diario.trava:
+                bloco, cursor['proximo'] = pagina(inicio=cursor['proximo'],
+                                                  limite=min(restante, BLOCO_LISTAGEM), **filtros)
+            yield from bloco
+            restante -= len(bloco)
+    
+    return json_em_partes(itens(), chave, antes={'versao': marca_versao(versao)},
+                          depois=lambda: {'proximo': cursor['proximo']})
+
+
+def renderizar(nome, **variaveis):
+    """
+    Renderiza um dos templates compilados na inicialização.
+    
+    Args:
+        nome: Nome do template em views/, sem extensão (ex.: 'jogo')
+        **variaveis: Variáveis do template
+        
+    Returns:
+        HTML renderizado
+    """
+    return TEMPLATES[nome].render(**variaveis)
+
+
+def paineis_jogo(sessao, colonia, diario):
+    """
+    Dados e painéis da página do jogo. Cada painel (Colonia.PAINEIS) vem do
+    cache de fragmentos se sua versão não mudou; só os que mudaram são
+    renderizados de novo, e as estatísticas só são montadas se algum mudou.
+    
+    Args:
+        sessao: Sessão do usuário
+        colonia: Colônia do usuário
+        diario: Diário de ações do save (com a trava da colônia)
+        
+    Returns:
+        Tupla (estatísticas, condições, HTML de cada painel); sem painéis
+        desatualizados, as estatísticas trazem só nome e dia
+    """
+    with diario.trava:  # Outra thread pode estar alterando a colônia
+        versoes = colonia.versoes_paineis
+        paineis = {painel: fragmentos.obter((sessao.caminho_save, painel), versao)
+                   for painel, versao in versoes.items()}
+        faltando = [painel for painel, html in paineis.items() if html is None]
+        if faltando:
+            # A página mostra só os 6 primeiros colonos e 8 grupos de edifícios
+            stats = colonia.obter_estatisticas(limite_colonos=COLONOS_NA_PAGINA,
+                                               limite_edificios=EDIFICIOS_NA_PAGINA)
+        else:
+            stats = {'nome': colonia.nome, 'dia': colonia.dia}
+        condicoes = colonia.verificar_condicoes()
+    
+    for painel in faltando:
+        paineis[painel] = renderizar(f'paineis/{painel}', stats=stats)
+        fragmentos.guardar((sessao.caminho_save, painel), versoes[painel], paineis[painel])
+    return stats, condicoes, paineis
+
+
+def estado_tempo_real(colonia, diario):
+    """
+    Estado da colônia enviado pelos streams de atualização: o que a
+    página do jogo mostra (recursos, contagens, primeiros colonos e
+    edifícios, eventos recentes e condições de vitória/derrota).
+    
+    Args:
+        colonia: Colônia do usuário
+        diario: Diário de ações do save (com a trava da colônia)
+        
+    Returns:
+        Dicionário com o estado
+    """
+    with diario.trava:
+        estado = colonia.obter_estatisticas(limite_colonos=COLONOS_NA_PAGINA,
+                                            limite_edificios=EDIFICIOS_NA_PAGINA)
+        estado['condicoes'] = colonia.verificar_condicoes()
+    return estado
+
+
 def autenticar(username, password):
     """
     Autentica usuário.
@@ -71,7 +417,7 @@ def login_page():
     """
     response.content_type = 'text/html; charset=utf-8'
     game_logger.debug("Exibindo página de login")
-    return template('views/login.html')
+    return renderizar('login')
 
 
 @app.route('/login', method='POST')
@@ -79,8 +425,6 @@ def login_submit():
     """
     Processa login do usuário.
     """
-    global usuario_logado, colonia_atual
-    
     username = request.forms.get('username', '').strip()
     password = request.forms.get('password', '').strip()
     
@@ -90,28 +434,30 @@ def login_submit():
     if usuario is None:
         game_logger.warning(f"Login rejeitado para: {username}")
         response.content_type = 'text/html; charset=utf-8'
-        return template('views/login.html', erro="Usuário ou senha inválidos!")
+        return renderizar('login', erro="Usuário ou senha inválidos!")
     
-    # Usuário autenticado
-    usuario_logado = usuario
+    # Usuário autenticado: cria a sessão (o cookie guarda só o identificador)
+    save_file = caminho_save(usuario)
+    sessao = sessoes.criar(usuario, save_file)
+    response.set_cookie(COOKIE_SESSAO, sessao.id, path='/', httponly=True, samesite='lax')
     game_logger.log_action("LOGIN", usuario=username)
     
-    # Tenta carregar colônia do usuário
-    save_file = usuario['save_file']
-    if os.path.exists(save_file):
-        try:
+    # Carrega a colônia do usuário no cache (snapshot + ações do diário)
+    try:
+        if save_file in cache_colonias:
+            colonia, _ = colonia_da_sessao(sessao)
+            game_logger.info(f"Colônia em memória: {colonia.nome}", usuario=username)
+        elif Colonia.existe_save(save_file):
             game_logger.info(f"Carregando colônia salva: {save_file}", usuario=username)
-            colonia_atual = Colonia.carregar(save_file)
-            if colonia_atual:
-                game_logger.info(f"Colônia carregada: {colonia_atual.nome}", usuario=username)
+            colonia, _ = colonia_da_sessao(sessao)
+            if colonia:
+                game_logger.info(f"Colônia carregada: {colonia.nome}", usuario=username)
             else:
                 game_logger.warning(f"Arquivo existe mas colônia é None: {save_file}", usuario=username)
-        except Exception as e:
-            game_logger.error(f"ERRO ao carregar colônia de {save_file}: {e}", usuario=username, exception=e)
-            colonia_atual = None
-    else:
-        game_logger.info(f"Nenhum save encontrado para {username}", usuario=username)
-        colonia_atual = None
+        else:
+            game_logger.info(f"Nenhum save encontrado para {username}", usuario=username)
+    except HTTPResponse:
+        pass  # Colônia em outro processo: o login vale, o erro aparece ao jogar
     
     redirect('/menu')
 
@@ -121,22 +467,32 @@ def logout():
     """
     Faz logout do usuário.
     """
-    global usuario_logado, colonia_atual
+    sessao = sessao_atual()
+    username = sessao.username if sessao else 'desconhecido'
     
-    username = usuario_logado['username'] if usuario_logado else 'desconhecido'
-    
-    # Salva colônia antes de sair
-    if colonia_atual is not None and usuario_logado is not None:
+    # Salva colônia antes de sair (snapshot completo, esvazia o diário);
+    # fora do cache ela já está no disco
+    if sessao is not None and sessao.caminho_save in cache_colonias:
+        colonia, diario = colonia_da_sessao(sessao)
+    else:
+        colonia, diario = None, None
+    if colonia is not None:
         try:
-            save_file = usuario_logado['save_file']
-            colonia_atual.salvar(save_file)
-            game_logger.info(f"Colônia salva antes do logout: {save_file}", usuario=username)
+            save_file = sessao.caminho_save
+            # Barreira: só sai depois que o snapshot chegou ao disco
+            if diario.snapshot(colonia, aguardar=True):
+                game_logger.info(f"Colônia salva antes do logout: {save_file}", usuario=username)
+            else:
+                game_logger.error(f"Falha ao salvar colônia no logout: {save_file} | "
+                                  f"{salvador.estatisticas['falhas']}", usuario=username)
         except Exception as e:
             game_logger.error(f"Erro ao salvar colônia no logout: {e}", usuario=username, exception=e)
     
     game_logger.log_action("LOGOUT", usuario=username)
-    usuario_logado = None
-    colonia_atual = None
+    # A colônia continua no cache de colônias para o próximo login
+    if sessao is not None:
+        sessoes.encerrar(sessao.id)
+    response.delete_cookie(COOKIE_SESSAO, path='/')
     
     redirect('/login')
 
@@ -146,9 +502,8 @@ def menu():
     """
     Menu principal após login.
     """
-    global usuario_logado, colonia_atual
-    
-    if usuario_logado is None:
+    sessao = sessao_atual()
+    if sessao is None:
         game_logger.warning("Acesso ao menu sem autenticação")
         redirect('/login')
         return
@@ -156,19 +511,26 @@ def menu():
     response.content_type = 'text/html; charset=utf-8'
     
     # Verifica se usuário tem jogo salvo
-    tem_save = colonia_atual is not None
+    colonia, _ = colonia_da_sessao(sessao)
+    tem_save = colonia is not None
     
-    username = usuario_logado['username']
+    username = sessao.username
     game_logger.debug(f"Exibindo menu para {username} | Tem save: {tem_save}")
     
-    return template('views/index.html', 
-                   usuario=usuario_logado,
-                   tem_save=tem_save)
+    return renderizar('index', 
+                      usuario=sessao.usuario,
+                      tem_save=tem_save)
 
 
 @app.route('/static/<filepath:path>')
 def server_static(filepath):
-    """Serve arquivos estáticos (CSS, JS)."""
+    """
+    Serve arquivos estáticos (CSS, JS). Os lidos na inicialização saem da
+    memória, com gzip e cache longo quando o nome tem a impressão digital.
+    """
+    resposta = estaticos.responder(filepath)
+    if resposta is not None:
+        return resposta
     return static_file(filepath, root='./static')
 
 
@@ -178,25 +540,32 @@ def novo_jogo():
     Cria uma nova colônia.
     Controller que manipula o Model.
     """
-    global colonia_atual, usuario_logado
-    
-    if usuario_logado is None:
+    sessao = sessao_atual()
+    if sessao is None:
         game_logger.warning("Tentativa de criar jogo sem autenticação")
         redirect('/login')
         return
     
-    username = usuario_logado['username']
+    username = sessao.username
     nome_colonia = request.forms.get('nome_colonia', 'Nova Colônia')
     
     try:
         game_logger.log_action("NOVO_JOGO", usuario=username, details=f"Nome: {nome_colonia}")
         
-        # Cria nova colônia (Model)
-        colonia_atual = Colonia(nome_colonia)
-        colonia_atual.salvar(usuario_logado['save_file'])
+        # Cria nova colônia (Model); guardá-la no cache trava o save, depois o
+        # diário da colônia anterior é descartado e o snapshot inicial é
+        # gravado antes de continuar
+        _, diario = colonia_da_sessao(sessao)
+        colonia = Colonia(nome_colonia, vetorizado=NUMPY_DISPONIVEL)
+        cache_colonias.guardar(sessao.caminho_save, colonia, diario)
+        diario.descartar()
+        diario.snapshot(colonia, aguardar=True)
+        avisos.avisar(sessao.caminho_save)
         
         game_logger.info(f"Nova colônia criada e salva: {nome_colonia}", usuario=username)
         game_logger.log_game_event("COLONIA_CRIADA", nome_colonia, f"Usuário: {username}")
+    except HTTPResponse:
+        raise
     except Exception as e:
         game_logger.error(f"Erro ao criar nova colônia: {e}", usuario=username, exception=e)
     
@@ -209,35 +578,34 @@ def carregar_jogo():
     Carrega um jogo salvo do usuário.
     Controller que carrega o Model persistido.
     """
-    global colonia_atual, usuario_logado
-    
-    if usuario_logado is None:
+    sessao = sessao_atual()
+    if sessao is None:
         game_logger.warning("Tentativa de carregar jogo sem autenticação")
         redirect('/login')
         return
     
-    username = usuario_logado['username']
-    save_file = usuario_logado['save_file']
+    username = sessao.username
+    save_file = sessao.caminho_save
     
     game_logger.log_action("CARREGAR_JOGO", usuario=username, details=f"Arquivo: {save_file}")
     
-    if not os.path.exists(save_file):
+    if not Colonia.existe_save(save_file):
         game_logger.warning(f"Arquivo de save não encontrado: {save_file}", usuario=username)
         response.content_type = 'text/html; charset=utf-8'
-        return template('views/index.html', 
-                       usuario=usuario_logado,
-                       tem_save=False,
-                       erro="Nenhum jogo salvo encontrado!")
+        return renderizar('index', 
+                          usuario=sessao.usuario,
+                          tem_save=False,
+                          erro="Nenhum jogo salvo encontrado!")
     
     try:
         game_logger.info(f"Carregando jogo de: {save_file}", usuario=username)
-        colonia_atual = Colonia.carregar(save_file)
+        colonia, diario = cache_colonias.obter(save_file)
         
-        if colonia_atual is None:
+        if colonia is None:
             game_logger.error(f"Colonia.carregar() retornou None para: {save_file}", usuario=username)
             raise Exception("Arquivo corrompido ou incompatível")
         
-        game_logger.info(f"Jogo carregado com sucesso: {colonia_atual.nome} (Dia {colonia_atual.dia})", usuario=username)
+        game_logger.info(f"Jogo carregado com sucesso: {colonia.nome} (Dia {colonia.dia})", usuario=username)
         redirect('/jogo')
     except HTTPResponse:
         # Redirecionamento do Bottle - não é erro, é comportamento normal
@@ -247,10 +615,10 @@ def carregar_jogo():
         game_logger.error(f"Traceback completo: {traceback.format_exc()}", usuario=username)
         
         response.content_type = 'text/html; charset=utf-8'
-        return template('views/index.html', 
-                       usuario=usuario_logado,
-                       tem_save=False,
-                       erro=f"Erro ao carregar jogo: {str(e)}")
+        return renderizar('index', 
+                          usuario=sessao.usuario,
+                          tem_save=False,
+                          erro=f"Erro ao carregar jogo: {str(e)}")
 
 
 @app.route('/jogo')
@@ -259,35 +627,35 @@ def jogo():
     Página principal do jogo.
     Controller que passa dados do Model para a View.
     """
-    global colonia_atual, usuario_logado
-    
-    if usuario_logado is None:
+    sessao = sessao_atual()
+    if sessao is None:
         game_logger.warning("Acesso ao jogo sem autenticação")
         redirect('/login')
         return
     
-    if colonia_atual is None:
-        username = usuario_logado['username']
+    colonia, diario = colonia_da_sessao(sessao)
+    if colonia is None:
+        username = sessao.username
         game_logger.warning(f"Acesso ao jogo sem colônia ativa", usuario=username)
         redirect('/menu')
         return
     
     try:
-        # Obtém dados do Model
-        stats = colonia_atual.obter_estatisticas()
-        condicoes = colonia_atual.verificar_condicoes()
+        # Obtém dados do Model e os painéis que mudaram desde a última página
+        stats, condicoes, paineis = paineis_jogo(sessao, colonia, diario)
         
         # Renderiza View com dados do Model
         response.content_type = 'text/html; charset=utf-8'
-        return template('views/jogo.html', 
-                       stats=stats, 
-                       condicoes=condicoes,
-                       tipos_edificios=TIPOS_EDIFICIOS,
-                       usuario=usuario_logado)
+        return renderizar('jogo', 
+                          stats=stats, 
+                          condicoes=condicoes,
+                          paineis=paineis,
+                          tipos_edificios=TIPOS_EDIFICIOS,
+                          usuario=sessao.usuario)
     except HTTPResponse:
         raise
     except Exception as e:
-        username = usuario_logado['username']
+        username = sessao.username
         game_logger.error(f"Erro ao renderizar página do jogo: {e}", usuario=username, exception=e)
         redirect('/menu')
 
@@ -295,35 +663,35 @@ def jogo():
 @app.route('/proximo_turno', method='POST')
 def proximo_turno():
     """
-    Processa o próximo turno.
+    Processa o próximo turno (ou os próximos `n` turnos).
     Controller que executa lógica do Model.
     """
-    global colonia_atual, usuario_logado
-    
-    if usuario_logado is None:
+    sessao = sessao_atual()
+    if sessao is None:
         redirect('/login')
         return
     
-    if colonia_atual is None:
+    colonia, diario = colonia_da_sessao(sessao)
+    if colonia is None:
         redirect('/menu')
         return
     
-    username = usuario_logado['username']
+    username = sessao.username
     
     try:
-        dia_anterior = colonia_atual.dia
+        n = int(request.forms.get('n', 1))
+        n = max(1, min(n, MAX_TURNOS_POR_ACAO))
+        dia_anterior = colonia.dia
         
-        # Processa turno no Model
-        relatorio = colonia_atual.processar_turno()
+        # Processa turnos no Model (registrado no diário de ações)
+        resumo = executar_acao(sessao, colonia, diario, 'proximo_turno', n=n)
         
         game_logger.log_action("PROXIMO_TURNO", usuario=username, 
-                              details=f"Dia {dia_anterior} → {colonia_atual.dia}")
-        game_logger.log_game_event("TURNO_PROCESSADO", colonia_atual.nome, 
-                                   f"Dia {colonia_atual.dia}")
-        
-        # Salva automaticamente
-        colonia_atual.salvar(usuario_logado['save_file'])
-        game_logger.debug(f"Jogo salvo automaticamente", usuario=username)
+                              details=f"Dia {dia_anterior} → {colonia.dia} ({resumo['turnos']} turno(s))")
+        game_logger.log_game_event("TURNO_PROCESSADO", colonia.nome, 
+                                   f"Dia {colonia.dia} | Mortes: {resumo['mortes']} | "
+                                   f"Eventos: {len(resumo['eventos'])}")
+        game_logger.debug(f"Ação registrada no diário ({diario.pendentes} pendentes)", usuario=username)
     except Exception as e:
         game_logger.error(f"Erro ao processar turno: {e}", usuario=username, exception=e)
     
@@ -339,33 +707,30 @@ def construir(tipo):
     Args:
         tipo: Tipo do edifício a construir
     """
-    global colonia_atual, usuario_logado
-    
-    if usuario_logado is None:
+    sessao = sessao_atual()
+    if sessao is None:
         redirect('/login')
         return
     
-    if colonia_atual is None:
+    colonia, diario = colonia_da_sessao(sessao)
+    if colonia is None:
         redirect('/menu')
         return
     
-    username = usuario_logado['username']
+    username = sessao.username
     
     try:
         game_logger.log_action("CONSTRUIR", usuario=username, details=f"Tipo: {tipo}")
         
-        # Executa ação no Model
-        sucesso, mensagem = colonia_atual.construir_edificio(tipo)
+        # Executa ação no Model (registrada no diário de ações)
+        sucesso, mensagem = executar_acao(sessao, colonia, diario, 'construir', tipo=tipo)
         
         if sucesso:
             game_logger.info(f"Edifício construído: {tipo}", usuario=username)
-            game_logger.log_game_event("EDIFICIO_CONSTRUIDO", colonia_atual.nome, 
+            game_logger.log_game_event("EDIFICIO_CONSTRUIDO", colonia.nome, 
                                        f"Tipo: {tipo}")
         else:
             game_logger.warning(f"Falha ao construir {tipo}: {mensagem}", usuario=username)
-        
-        # Salva automaticamente
-        colonia_atual.salvar(usuario_logado['save_file'])
     except Exception as e:
         game_logger.error(f"Erro ao construir edifício {tipo}: {e}", usuario=username, exception=e)
     
@@ -378,91 +743,499 @@ def contratar_colono():
     Adiciona um novo colono.
     Controller que manipula o Model.
     """
-    global colonia_atual, usuario_logado
-    
-    if usuario_logado is None:
+    sessao = sessao_atual()
+    if sessao is None:
         redirect('/login')
         return
     
-    if colonia_atual is None:
+    colonia, diario = colonia_da_sessao(sessao)
+    if colonia is None:
         redirect('/menu')
         return
     
-    username = usuario_logado['username']
+    username = sessao.username
     
     try:
         game_logger.log_action("CONTRATAR_COLONO", usuario=username)
         
-        # Executa ação no Model
-        sucesso, mensagem = colonia_atual.adicionar_colono()
+        # Executa ação no Model (registrada no diário de ações)
+        sucesso, mensagem = executar_acao(sessao, colonia, diario, 'contratar')
         
         if sucesso:
             game_logger.info(f"Colono contratado", usuario=username)
-            game_logger.log_game_event("COLONO_CONTRATADO", colonia_atual.nome, 
-                                       f"Total: {colonia_atual.total_colonos_vivos}")
+            game_logger.log_game_event("COLONO_CONTRATADO", colonia.nome, 
+                                       f"Total: {colonia.total_colonos_vivos}")
         else:
             game_logger.warning(f"Falha ao contratar colono: {mensagem}", usuario=username)
-        
-        # Salva automaticamente
-        colonia_atual.salvar(usuario_logado['save_file'])
     except Exception as e:
         game_logger.error(f"Erro ao contratar colono: {e}", usuario=username, exception=e)
     
     redirect('/jogo')
 
 
+@app.route('/api/acoes', method='POST')
+def api_acoes():
+    """
+    Executa um lote de comandos em ordem, com uma única gravação no diário
+    de ações (e um único aviso aos streams de atualização).
+    O corpo é uma lista JSON de comandos (ver preparar_comando); a resposta
+    traz o resultado de cada um, na mesma ordem. Comandos inválidos não são
+    executados e não impedem os demais.
+    """
+    sessao = sessao_atual()
+    
+    response.content_type = 'application/json; charset=utf-8'
+    if sessao is None:
+        response.status = 401
+        return json.dumps({'erro': 'Usuário não autenticado'}, ensure_ascii=False)
+    
+    try:
+        comandos = json.loads(request.body.read().decode('utf-8'))
+    except ValueError:
+        comandos = None
+    if not isinstance(comandos, list):
+        response.status = 400
+        return json.dumps({'erro': 'O corpo deve ser uma lista JSON de comandos'}, ensure_ascii=False)
+    if len(comandos) > MAX_COMANDOS_POR_LOTE:
+        response.status = 400
+        return json.dumps({'erro': f'Máximo de {MAX_COMANDOS_POR_LOTE} comandos por lote'},
+                          ensure_ascii=False)
+    
+    colonia, diario = colonia_da_sessao(sessao)
+    if colonia is None:
+        response.status = 404
+        return json.dumps({'erro': 'Nenhuma colônia ativa'}, ensure_ascii=False)
+    
+    username = sessao.username
+    
+    # Valida tudo antes de executar; os turnos do lote somados têm o mesmo
+    # limite de uma requisição de turnos
+    resultados = []
+    validos = []  # (posição em resultados, ação, argumentos)
+    turnos = 0
+    for comando in comandos:
+        nome = comando.get('acao') if isinstance(comando, dict) else None
+        try:
+            acao, argumentos = preparar_comando(comando)
+            if acao == 'proximo_turno':
+                argumentos['n'] = min(argumentos['n'], MAX_TURNOS_POR_ACAO - turnos)
+                if argumentos['n'] < 1:
+                    raise ValueError(f"Limite de {MAX_TURNOS_POR_ACAO} turnos por lote atingido")
+                turnos += argumentos['n']
+        except ValueError as e:
+            resultados.append({'acao': nome, 'sucesso': False, 'mensagem': str(e)})
+            continue
+        validos.append((len(resultados), acao, argumentos))
+        resultados.append({'acao': nome})
+    
+    try:
+        if validos:
+            try:
+                retornos = diario.executar_lote(colonia, [(acao, argumentos)
+                                                          for _, acao, argumentos in validos])
+            finally:
+                # Mesmo com erro no meio, os comandos anteriores foram aplicados
+                cache_colonias.atualizar(sessao.caminho_save)
+                avisos.avisar(sessao.caminho_save)
+            for (posicao, acao, _), retorno in zip(validos, retornos):
+                resultados[posicao].update(resultado_comando(acao, retorno))
+        
+        sucessos = sum(1 for resultado in resultados if resultado.get('sucesso'))
+        game_logger.log_action("ACOES", usuario=username,
+                               details=f"{sucessos}/{len(comandos)} comando(s) | Dia {colonia.dia}")
+        game_logger.debug(f"Lote registrado no diário ({diario.pendentes} pendentes)", usuario=username)
+        
+        with diario.trava:
+            return json.dumps({'resultados': resultados, 'versao': marca_versao(colonia.versao),
+                               'dia': colonia.dia},
+                              ensure_ascii=False, separators=(',', ':'))
+    except Exception as e:
+        game_logger.error(f"Erro ao executar lote de ações: {e}", usuario=username, exception=e)
+        response.status = 500
+        return json.dumps({'erro': str(e)}, ensure_ascii=False)
+
+
+@app.route('/api/colonos')
+def api_colonos():
+    """
+    Lista os colonos, paginada por cursor (ordem de chegada à colônia).
+    Filtros: status=vivo|morto|todos (padrão: vivo) e profissao.
+    """
+    sessao = sessao_atual()
+    
+    response.content_type = 'application/json; charset=utf-8'
+    if sessao is None:
+        response.status = 401
+        return json.dumps({'erro': 'Usuário não autenticado'}, ensure_ascii=False)
+    colonia, diario = colonia_da_sessao(sessao)
+    if colonia is None:
+        response.status = 404
+        return json.dumps({'erro': 'Nenhuma colônia ativa'}, ensure_ascii=False)
+    
+    status = request.query.get('status') or 'vivo'
+    vivos = {'vivo': True, 'morto': False, 'todos': None}
+    if status not in vivos:
+        response.status = 400
+        return json.dumps({'erro': f'Status inválido: {status}'}, ensure_ascii=False)
+    
+    return listagem_paginada(colonia, diario, 'colonos', colonia.pagina_colonos,
+                             vivos=vivos[status],
+                             profissao=request.query.get('profissao') or None)
+
+
+@app.route('/api/edificios')
+def api_edificios():
+    """
+    Lista os grupos de edifícios, paginada por cursor (ordem de construção).
+    Filtros: tipo e status (ativo, inativo, manutencao).
+    """
+    sessao = sessao_atual()
+    
+    response.content_type = 'application/json; charset=utf-8'
+    if sessao is None:
+        response.status = 401
+        return json.dumps({'erro': 'Usuário não autenticado'}, ensure_ascii=False)
+    colonia, diario = colonia_da_sessao(sessao)
+    if colonia is None:
+        response.status = 404
+        return json.dumps({'erro': 'Nenhuma colônia ativa'}, ensure_ascii=False)
+    
+    return listagem_paginada(colonia, diario, 'edificios', colonia.pagina_edificios,
+                             tipo=request.query.get('tipo') or None,
+                             status=request.query.get('status') or None)
+
+
 @app.route('/api/status')
 def api_status():
     """
     API REST que retorna o status da colônia em JSON.
     Controller que expõe dados do Model via API.
-    """
-    global colonia_atual, usuario_logado
     
-    if usuario_logado is None:
+    A resposta traz a versão da colônia ('versao', ver marca_versao) e a
+    ETag correspondente: com If-None-Match igual à ETag a resposta é 304,
+    sem corpo. Com ?since=<versão>, traz só o que mudou desde aquela
+    versão (ou tudo, com 'completo': true, se ela não é mais conhecida);
+    só os campos dos painéis alterados desde ela são montados.
+    """
+    sessao = sessao_atual()
+    if sessao is None:
         response.content_type = 'application/json; charset=utf-8'
         return json.dumps({'erro': 'Usuário não autenticado'}, ensure_ascii=False)
     
-    if colonia_atual is None:
+    colonia, diario = colonia_da_sessao(sessao)
+    if colonia is None:
         response.content_type = 'application/json; charset=utf-8'
         return json.dumps({'erro': 'Nenhuma colônia ativa'}, ensure_ascii=False)
     
+    # (?expandir=1 mostra edifícios empilhados como uma linha cada; ?resumo=1
+    # omite as listas de colonos e edifícios, ver /api/colonos e /api/edificios)
+    expandir = request.query.get('expandir') == '1'
+    resumo = request.query.get('resumo') == '1'
+    marca_desde = request.query.get('since')
+    desde = None
+    if marca_desde is not None:
+        try:
+            desde = ler_marca_versao(marca_desde)
+        except ValueError:
+            response.status = 400
+            response.content_type = 'application/json; charset=utf-8'
+            return json.dumps({'erro': 'Versão inválida em since'}, ensure_ascii=False)
+    
+    def etag_da_versao(versao):
+        sufixos = (('-e' if expandir else '') + ('-r' if resumo else '')
+                   + ('' if marca_desde is None else f'-d{desde}' if desde is not None else '-d'))
+        return f'"{marca_versao(versao)}{sufixos}"'
+    
+    response.set_header('Cache-Control', 'no-cache')
+    etag = etag_da_versao(colonia.versao)
+    if etag_corresponde(request.get_header('If-None-Match'), etag):
+        response.set_header('ETag', etag)
+        response.status = 304
+        return ''
+    
     try:
+        chave = (sessao.caminho_save, expandir, resumo)
+        # Uma versão de outro processo (desde None) ou já esquecida recebe
+        # tudo; as versões só crescem, então desde >= versao é "nada mudou"
+        anterior = None
+        if desde is not None:
+            anterior = versoes_servidas.obter(chave, desde)
+        
         # Retorna dados do Model em formato JSON
-        stats = colonia_atual.obter_estatisticas()
+        with diario.trava:
+            versao = colonia.versao
+            if desde is not None and desde >= versao:
+                stats = None
+            elif anterior is not None:
+                paineis = [painel for painel, versao_painel in colonia.versoes_paineis.items()
+                           if versao_painel > desde]
+                stats = colonia.obter_estatisticas(expandir_pilhas=expandir, resumo=resumo,
+                                                   paineis=paineis)
+            else:
+                stats = colonia.obter_estatisticas(expandir_pilhas=expandir, resumo=resumo)
+        
+        if stats is None:
+            dados = {'versao': marca_versao(versao), 'desde': marca_desde, 'completo': False}
+        elif anterior is not None:
+            mudancas = versoes_servidas.diferenca(chave, anterior, versao, stats)
+            dados = dict(mudancas, versao=marca_versao(versao), desde=marca_desde, completo=False)
+        else:
+            versoes_servidas.registrar(chave, versao, stats)
+            dados = dict(stats, versao=marca_versao(versao))
+            if marca_desde is not None:
+                dados['completo'] = True
+        
+        response.set_header('ETag', etag_da_versao(versao))
         response.content_type = 'application/json; charset=utf-8'
-        return json.dumps(stats, ensure_ascii=False, indent=2)
+        return json.dumps(dados, ensure_ascii=False, separators=(',', ':'))
     except Exception as e:
-        username = usuario_logado['username']
+        username = sessao.username
         game_logger.error(f"Erro na API status: {e}", usuario=username, exception=e)
         response.content_type = 'application/json; charset=utf-8'
         return json.dumps({'erro': str(e)}, ensure_ascii=False)
 
 
+@app.route('/api/atualizacoes')
+def api_atualizacoes():
+    """
+    Stream Server-Sent Events com as mudanças da colônia.
+    A primeira mensagem ('estado') traz o estado da página do jogo; a cada
+    ação, uma mensagem 'mudancas' traz só os campos que mudaram. Se a
+    colônia deixar de existir (reiniciar), envia 'encerrada'. Com
+    SSE_MAXIMO_STREAMS streams já abertos, responde e fecha (o navegador
+    reconecta depois de SSE_CONSULTA_MS).
+    """
+    sessao = sessao_atual()
+    
+    response.content_type = 'application/json; charset=utf-8'
+    if sessao is None:
+        response.status = 401
+        return json.dumps({'erro': 'Usuário não autenticado'}, ensure_ascii=False)
+    colonia, diario = colonia_da_sessao(sessao)
+    if colonia is None:
+        response.status = 404
+        return json.dumps({'erro': 'Nenhuma colônia ativa'}, ensure_ascii=False)
+    
+    response.content_type = 'text/event-stream; charset=utf-8'
+    response.set_header('Cache-Control', 'no-cache')
+    response.set_header('X-Accel-Buffering', 'no')  # Sem buffer em proxies (nginx)
+    caminho = sessao.caminho_save
+    
+    # O id de cada mensagem é o contador de avisos; ao reconectar sem
+    # novidades (Last-Event-ID igual), nada é reenviado
+    contador = avisos.contador(caminho)
+    ultimo_id = request.get_header('Last-Event-ID')
+    
+    def stream():
+        nonlocal colonia, diario, contador
+        # A vaga é tomada (e devolvida) dentro do gerador: se a resposta
+        # nunca começar, não há vaga a devolver
+        aberto = SSE_SEGUNDOS > 0 and streams_abertos.acquire(blocking=False)
+        try:
+            retry = SSE_RECONEXAO_MS if aberto or SSE_SEGUNDOS <= 0 else SSE_CONSULTA_MS
+            estado = None
+            if ultimo_id != str(contador):
+                estado = estado_tempo_real(colonia, diario)
+                yield mensagem_sse(estado, evento='estado', id_mensagem=contador, retry=retry)
+            else:
+                yield f"retry: {retry}\n\n"
+            if not aberto:
+                return
+            
+            fim = time.monotonic() + SSE_SEGUNDOS
+            while True:
+                restante = fim - time.monotonic()
+                if restante <= 0:
+                    return
+                novo = avisos.aguardar(caminho, contador, min(restante, SSE_KEEPALIVE))
+                if novo == contador:
+                    if time.monotonic() < fim:
+                        yield ": keepalive\n\n"
+                    continue
+                contador = novo
+                
+                # A colônia pode ter sido trocada (novo jogo) ou removida (reiniciar)
+                try:
+                    colonia, diario = cache_colonias.obter(caminho)
+                except Exception as e:
+                    game_logger.error(f"Erro no stream de atualizações: {e}", usuario=sessao.username,
+                                      exception=e)
+                    return
+                if colonia is None:
+                    yield mensagem_sse({}, evento='encerrada', id_mensagem=contador)
+                    return
+                atual = estado_tempo_real(colonia, diario)
+                if estado is None:
+                    yield mensagem_sse(atual, evento='estado', id_mensagem=contador)
+                else:
+                    mudancas = diferenca_estado(estado, atual)
+                    if mudancas:
+                        yield mensagem_sse(mudancas, evento='mudancas', id_mensagem=contador)
+                estado = atual
+        finally:
+            if aberto:
+                streams_abertos.release()
+    
+    return stream()
+
+
+@app.route('/api/historico')
+def api_historico():
+    """
+    Dias disponíveis no histórico da colônia (viagem no tempo).
+    """
+    sessao = sessao_atual()
+    
+    response.content_type = 'application/json; charset=utf-8'
+    if sessao is None:
+        response.status = 401
+        return json.dumps({'erro': 'Usuário não autenticado'}, ensure_ascii=False)
+    colonia, diario = colonia_da_sessao(sessao)
+    if colonia is None:
+        response.status = 404
+        return json.dumps({'erro': 'Nenhuma colônia ativa'}, ensure_ascii=False)
+    
+    with diario.trava:
+        resumo = colonia.historico.resumo()
+        resumo['dia_atual'] = colonia.dia
+    return json.dumps(resumo, ensure_ascii=False, indent=2)
+
+
+@app.route('/api/historico/<dia:int>')
+def api_historico_dia(dia):
+    """
+    Estado da colônia ao fim de um dia passado, sem alterar o jogo.
+    Com ?comparar=<outro dia>, inclui o que mudou entre os dois dias.
+    
+    Args:
+        dia: Dia do histórico
+    """
+    sessao = sessao_atual()
+    
+    response.content_type = 'application/json; charset=utf-8'
+    if sessao is None:
+        response.status = 401
+        return json.dumps({'erro': 'Usuário não autenticado'}, ensure_ascii=False)
+    colonia, diario = colonia_da_sessao(sessao)
+    if colonia is None:
+        response.status = 404
+        return json.dumps({'erro': 'Nenhuma colônia ativa'}, ensure_ascii=False)
+    
+    try:
+        with diario.trava:
+            dados = {'dia': dia, 'estado': colonia.colonia_no_dia(dia).obter_estatisticas()}
+            comparar = request.query.get('comparar')
+            if comparar:
+                dados['comparacao'] = colonia.historico.comparar(dia, int(comparar))
+    except ValueError as e:
+        response.status = 404
+        return json.dumps({'erro': str(e)}, ensure_ascii=False)
+    
+    return json.dumps(dados, ensure_ascii=False, indent=2)
+
+
+@app.route('/api/historico/<dia:int>', method='POST')
+def api_historico_voltar(dia):
+    """
+    Volta a colônia para o fim de um dia passado.
+    Controller que manipula o Model.
+    
+    Args:
+        dia: Dia do histórico
+    """
+    sessao = sessao_atual()
+    
+    response.content_type = 'application/json; charset=utf-8'
+    if sessao is None:
+        response.status = 401
+        return json.dumps({'erro': 'Usuário não autenticado'}, ensure_ascii=False)
+    colonia, diario = colonia_da_sessao(sessao)
+    if colonia is None:
+        response.status = 404
+        return json.dumps({'erro': 'Nenhuma colônia ativa'}, ensure_ascii=False)
+    
+    username = sessao.username
+    game_logger.log_action("VOLTAR_DIA", usuario=username,
+                           details=f"Dia {colonia.dia} → {dia}")
+    
+    try:
+        # Registrado no diário de ações, como as demais ações do jogador
+        sucesso, mensagem = executar_acao(sessao, colonia, diario, 'voltar_dia', dia=dia)
+    except Exception as e:
+        game_logger.error(f"Erro ao voltar para o dia {dia}: {e}", usuario=username, exception=e)
+        response.status = 500
+        return json.dumps({'erro': str(e)}, ensure_ascii=False)
+    
+    if not sucesso:
+        game_logger.warning(f"Falha ao voltar para o dia {dia}: {mensagem}", usuario=username)
+        response.status = 404
+        return json.dumps({'erro': mensagem}, ensure_ascii=False)
+    
+    game_logger.log_game_event("VIAGEM_NO_TEMPO", colonia.nome, mensagem)
+    return json.dumps({'mensagem': mensagem, 'dia': colonia.dia}, ensure_ascii=False)
+
+
+@app.route('/api/eventos')
+def api_eventos():
+    """
+    Eventos da colônia em um intervalo de dias (?de=&ate=, inclusive),
+    incluindo os já arquivados em disco.
+    """
+    sessao = sessao_atual()
+    
+    response.content_type = 'application/json; charset=utf-8'
+    if sessao is None:
+        response.status = 401
+        return json.dumps({'erro': 'Usuário não autenticado'}, ensure_ascii=False)
+    colonia, diario = colonia_da_sessao(sessao)
+    if colonia is None:
+        response.status = 404
+        return json.dumps({'erro': 'Nenhuma colônia ativa'}, ensure_ascii=False)
+    
+    try:
+        de = request.query.get('de')
+        ate = request.query.get('ate')
+        with diario.trava:
+            registros = colonia.eventos.consultar(int(de) if de else None,
+                                                  int(ate) if ate else None)
+            total = colonia.eventos.total
+    except ValueError:
+        response.status = 400
+        return json.dumps({'erro': 'Parâmetros de/ate devem ser inteiros'}, ensure_ascii=False)
+    
+    return json.dumps({'total': total,
+                       'eventos': [r.to_dict() for r in registros]},
+                      ensure_ascii=False, indent=2)
+
+
 @app.route('/reiniciar', method='POST')
 def reiniciar():
     """
     Reinicia o jogo do usuário.
     Controller que reseta o Model.
     """
-    global colonia_atual, usuario_logado
-    
-    if usuario_logado is None:
+    sessao = sessao_atual()
+    if sessao is None:
         redirect('/login')
         return
     
-    username = usuario_logado['username']
-    save_file = usuario_logado['save_file']
+    username = sessao.username
+    save_file = sessao.caminho_save
     
     try:
         game_logger.log_action("REINICIAR", usuario=username)
         
-        colonia_atual = None
+        # Só apaga a colônia que este processo detém (409 se for de outro)
+        _, diario = colonia_da_sessao(sessao)
+        cache_colonias.descartar(save_file)
         
-        # Remove arquivo de save do usuário
-        if os.path.exists(save_file):
-            os.remove(save_file)
+        # Remove arquivo de save e diário do usuário
+        diario.descartar()
+        if Colonia.excluir_save(save_file):
             game_logger.info(f"Save removido: {save_file}", usuario=username)
+        avisos.avisar(save_file)
+    except HTTPResponse:
+        raise
     except Exception as e:
         game_logger.error(f"Erro ao reiniciar jogo: {e}", usuario=username, exception=e)
     
@@ -474,9 +1247,8 @@ def view_logs():
     """
     Visualiza logs do sistema (apenas para admin).
     """
-    global usuario_logado
-    
-    if usuario_logado is None or usuario_logado['username'] != 'admin':
+    sessao = sessao_atual()
+    if sessao is None or sessao.username != 'admin':
         game_logger.warning(f"Tentativa de acesso aos logs sem permissão")
         redirect('/login')
         return
@@ -486,15 +1258,80 @@ def view_logs():
         logs_erro = game_logger.get_error_logs(lines=50)
         
         response.content_type = 'text/html; charset=utf-8'
-        return template('views/logs.html', 
-                       logs=logs_recentes,
-                       erros=logs_erro,
-                       usuario=usuario_logado)
+        return renderizar('logs', 
+                          logs=logs_recentes,
+                          erros=logs_erro,
+                          usuario=sessao.usuario)
     except Exception as e:
         game_logger.error(f"Erro ao exibir logs: {e}", exception=e)
         return f"Erro ao carregar logs: {e}"
 
 
+@app.route('/api/admin/fases')
+def api_admin_fases():
+    """
+    Histogramas dos tempos das fases do turno (apenas para admin).
+    Os tempos só são coletados com a instrumentação ativa.
+    """
+    sessao = sessao_atual()
+    
+    response.content_type = 'application/json; charset=utf-8'
+    if sessao is None or sessao.username != 'admin':
+        game_logger.warning(f"Tentativa de acesso às fases sem permissão")
+        response.status = 403
+        return json.dumps({'erro': 'Acesso restrito ao administrador'}, ensure_ascii=False)
+    
+    resumo = histograma_fases.resumo()
+    resumo['instrumentacao_ativa'] = Colonia.INSTRUMENTAR
+    return json.dumps(resumo, ensure_ascii=False, indent=2)
+
+
+@app.route('/api/admin/fases', method='POST')
+def api_admin_fases_configurar():
+    """
+    Liga ou desliga a instrumentação das fases (apenas para admin).
+    Campos do formulário: ativa=1|0, limpar=1 (descarta as amostras).
+    """
+    sessao = sessao_atual()
+    
+    response.content_type = 'application/json; charset=utf-8'
+    if sessao is None or sessao.username != 'admin':
+        game_logger.warning(f"Tentativa de configurar as fases sem permissão")
+        response.status = 403
+        return json.dumps({'erro': 'Acesso restrito ao administrador'}, ensure_ascii=False)
+    
+    ativa = request.forms.get('ativa')
+    if ativa is not None:
+        Colonia.INSTRUMENTAR = ativa == '1'
+    if request.forms.get('limpar') == '1':
+        histograma_fases.limpar()
+    
+    game_logger.log_action("INSTRUMENTACAO", usuario='admin',
+                           details=f"Ativa: {Colonia.INSTRUMENTAR}")
+    return json.dumps({'instrumentacao_ativa': Colonia.INSTRUMENTAR}, ensure_ascii=False)
+
+
+@app.route('/api/admin/cache')
+def api_admin_cache():
+    """
+    Contadores do cache de colônias, dos fragmentos, das versões servidas
+    pelo /api/status, do salvador e das sessões (apenas para admin).
+    """
+    sessao = sessao_atual()
+    
+    response.content_type = 'application/json; charset=utf-8'
+    if sessao is None or sessao.username != 'admin':
+        game_logger.warning(f"Tentativa de acesso ao cache sem permissão")
+        response.status = 403
+        return json.dumps({'erro': 'Acesso restrito ao administrador'}, ensure_ascii=False)
+    
+    return json.dumps({'cache': cache_colonias.estatisticas,
+                       'fragmentos': fragmentos.estatisticas,
+                       'versoes': versoes_servidas.estatisticas,
+                       'salvador': salvador.estatisticas,
+                       'sessoes': sessoes.estatisticas}, ensure_ascii=False, indent=2)
+
+
 if __name__ == '__main__':
     """
     Ponto de entrada da aplicação.
@@ -506,7 +1343,7 @@ if __name__ == '__main__':
     game_logger.info("Projeto de Orientação a Objetos - UnB")
     game_logger.info("Demonstra: POO, MVC, Persistência com Pickle")
     game_logger.info("=" * 60)
-    game_logger.info("🌐 Servidor iniciando em http://localhost:8080")
+    game_logger.info(f"🌐 Servidor iniciando em http://localhost:{PORTA} (modo {MODO_SERVIDOR})")
     game_logger.info("📝 Pressione Ctrl+C para encerrar")
     game_logger.info("=" * 60)
     
@@ -517,9 +1354,19 @@ if __name__ == '__main__':
     
     # Inicia servidor Bottle
     try:
-        run(app, host='0.0.0.0', port=8080, debug=True, reloader=True)
+        if MODO_SERVIDOR == 'producao':
+            # Várias requisições ao mesmo tempo, sem debug nem reloader
+            game_logger.info(f"Trabalhadores: {TRABALHADORES_PADRAO} threads")
+            run(app, server=ServidorThreads, host=HOST, port=PORTA, quiet=True,
+                debug=False, reloader=False, trabalhadores=TRABALHADORES_PADRAO)
+        else:
+            run(app, host=HOST, port=PORTA, debug=True, reloader=True)
     except KeyboardInterrupt:
         game_logger.info("Servidor encerrado pelo usuário")
     except Exception as e:
         game_logger.critical(f"Erro crítico no servidor: {e}", exception=e)
+    finally:
+        # Grava as colônias do cache e os saves pendentes antes de sair
+        cache_colonias.esvaziar()
+        salvador.encerrar()
 
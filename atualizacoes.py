@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Atualizações em tempo real das colônias (Server-Sent Events).
+A página do jogo recebe só o que mudou, sem recarregar.
+"""
+from collections import OrderedDict
+import json
+import os
+import threading
+
+
+class AvisosAlteracao:
+    """
+    Contador de alterações por save: quem altera a colônia avisa e os
+    streams SSE que esperam por aquele save acordam.
+    """
+
+    def __init__(self):
+        """Inicializa sem alterações registradas."""
+        self.__condicao = threading.Condition()
+        self.__contadores = {}  # caminho do save -> número de alterações
+
+    def contador(self, caminho: str) -> int:
+        """Retorna o número de alterações avisadas para o save."""
+        with self.__condicao:
+            return self.__contadores.get(caminho, 0)
+
+    def avisar(self, caminho: str):
+        """
+        Registra uma alteração na colônia do save e acorda quem espera.
+
+        Args:
+            caminho: Caminho do save
+        """
+        with self.__condicao:
+            self.__contadores[caminho] = self.__contadores.get(caminho, 0) + 1
+            self.__condicao.notify_all()
+
+    def aguardar(self, caminho: str, contador: int, timeout: float) -> int:
+        """
+        Espera uma alteração posterior a `contador`.
+
+        Args:
+            caminho: Caminho do save
+            contador: Último contador visto
+            timeout: Espera máxima em segundos
+
+        Returns:
+            Contador atual (igual a `contador` se o tempo acabou)
+        """
+        with self.__condicao:
+            self.__condicao.wait_for(lambda: self.__contadores.get(caminho, 0) != contador, timeout)
+            return self.__contadores.get(caminho, 0)
+
+
+def diferenca_estado(anterior: dict, atual: dict) -> dict:
+    """
+    Campos de `atual` que mudaram em relação a `anterior`. Dicionários
+    aninhados (ex.: recursos) entram só com as chaves que mudaram; listas
+    e valores simples entram inteiros.
+
+    Args:
+        anterior: Estado enviado antes (vazio na primeira mensagem)
+        atual: Estado atual
+
+    Returns:
+        Dicionário com as mudanças (vazio se nada mudou)
+    """
+    mudancas = {}
+    for chave, valor in atual.items():
+        antigo = anterior.get(chave)
+        if valor == antigo:
+            continue
+        if isinstance(valor, dict) and isinstance(antigo, dict):
+            valor = diferenca_estado(antigo, valor)
+        mudancas[chave] = valor
+    return mudancas
+
+
+def mensagem_sse(dados: dict, evento: str = None, id_mensagem=None, retry: int = None) -> str:
+    """
+    Formata uma mensagem Server-Sent Events com JSON compacto.
+
+    Args:
+        dados: Conteúdo da mensagem
+        evento: Nome do evento (padrão do navegador: 'message')
+        id_mensagem: Identificador (o navegador o reenvia ao reconectar)
+        retry: Milissegundos até o navegador reconectar
+
+    Returns:
+        Texto da mensagem, terminado por linha em branco
+    """
+    linhas = []
+    if retry is not None:
+        linhas.append(f"retry: {retry}")
+    if id_mensagem is not None:
+        linhas.append(f"id: {id_mensagem}")
+    if evento:
+        linhas.append(f"event: {evento}")
+    linhas.append("data: " + json.dumps(dados, ensure_ascii=False, separators=(',', ':')))
+    return '\n'.join(linhas) + '\n\n'
+
+
+# Listas de entidades do /api/status e o campo que identifica cada item
+_LISTAS_STATUS = {'colonos': 'id', 'edificios': 'id', 'eventos_recentes': 'seq'}
+
+
+def indexar_estatisticas(estatisticas: dict) -> dict:
+    """
+    Converte a saída de Colonia.obter_estatisticas para comparação: as
+    listas de entidades viram dicionários pelo identificador de cada item.
+    """
+    indexado = dict(estatisticas)
+    for lista, campo_id in _LISTAS_STATUS.items():
+        if lista in indexado:
+            indexado[lista] = {item[campo_id]: item for item in indexado[lista]}
+    return indexado
+
+
+def diferenca_estatisticas(anterior: dict, atual: dict) -> dict:
+    """
+    O que mudou entre duas estatísticas indexadas (indexar_estatisticas):
+    campos simples que mudaram, recursos só com os campos alterados e, por
+    lista de entidades, os itens novos (inteiros), os alterados (o
+    identificador e só os campos que mudaram) e os identificadores removidos.
+
+    Returns:
+        Dicionário com as mudanças (vazio se nada mudou)
+    """
+    mudancas = {}
+    for chave, valor in atual.items():
+        if chave not in _LISTAS_STATUS:
+            antigo = anterior.get(chave)
+            if valor != antigo:
+                mudancas[chave] = (diferenca_estado(antigo, valor)
+                                   if isinstance(valor, dict) and isinstance(antigo, dict)
+                                   else valor)
+            continue
+
+        campo_id = _LISTAS_STATUS[chave]
+        antigos = anterior.get(chave, {})
+        novos, alterados = [], []
+        for identificador, item in valor.items():
+            antigo = antigos.get(identificador)
+            if antigo is None:
+                novos.append(item)
+            elif antigo != item:
+                alterado = {campo_id: identificador}
+                alterado.update((c, v) for c, v in item.items() if antigo.get(c) != v)
+                alterados.append(alterado)
+        removidos = [identificador for identificador in antigos if identificador not in valor]
+        if novos or alterados or removidos:
+            mudancas[chave] = {'novos': novos, 'alterados': alterados, 'removidos': removidos}
+    return mudancas
+
+
+class VersoesServidas:
+    """
+    Estatísticas das últimas versões de colônia enviadas pelo /api/status,
+    para que `?since=<versão>` responda só com o que mudou desde ela.
+    Guarda as últimas `versoes_por_chave` versões de cada colônia e
+    variante da resposta, em JSON compacto; quando o total passa de
+    `orcamento` bytes, saem as versões mais antigas das colônias
+    consultadas há mais tempo. Pedidos com uma versão que já saiu recebem
+    as estatísticas completas.
+    """
+
+    VERSOES_POR_CHAVE_PADRAO = int(os.environ.get('COLONIA_VERSOES_GUARDADAS', 8))
+    ORCAMENTO_PADRAO = int(os.environ.get('COLONIA_VERSOES_MB', 32)) * 1024 * 1024
+
+    def __init__(self, versoes_por_chave: int = None, orcamento: int = None):
+        """
+        Inicializa vazio.
+
+        Args:
+            versoes_por_chave: Máximo de versões guardadas por colônia e variante
+            orcamento: Máximo de bytes (JSON) guardados no total
+        """
+        if versoes_por_chave is None:
+            versoes_por_chave = self.VERSOES_POR_CHAVE_PADRAO
+        if orcamento is None:
+            orcamento = self.ORCAMENTO_PADRAO
+        if versoes_por_chave < 1:
+            raise ValueError("Versões por chave deve ser maior que 0")
+        if orcamento < 0:
+            raise ValueError("Orçamento deve ser maior ou igual a 0")
+
+        self.__versoes_por_chave = versoes_por_chave
+        self.__orcamento = orcamento
+        self.__trava = threading.Lock()
+        self.__chaves = OrderedDict()  # (caminho, variante...) -> OrderedDict versão -> JSON
+        self.__bytes = 0
+
+    @property
+    def estatisticas(self) -> dict:
+        """Retorna o número de chaves, de versões e os bytes guardados."""
+        with self.__trava:
+            return {'chaves': len(self.__chaves),
+                    'versoes': sum(len(versoes) for versoes in self.__chaves.values()),
+                    'bytes': self.__bytes, 'orcamento': self.__orcamento}
+
+    def registrar(self, chave: tuple, versao: int, estatisticas: dict):
+        """
+        Guarda as estatísticas enviadas em uma versão.
+
+        Args:
+            chave: Identifica a colônia e a variante da resposta (ex.: (caminho, expandir))
+            versao: Versão da colônia
+            estatisticas: Saída de Colonia.obter_estatisticas
+        """
+        texto = json.dumps(estatisticas, separators=(',', ':'))
+        with self.__trava:
+            versoes = self.__chaves.setdefault(chave, OrderedDict())
+            self.__chaves.move_to_end(chave)
+            anterior = versoes.pop(versao, None)
+            if anterior is not None:
+                self.__bytes -= len(anterior)
+            versoes[versao] = texto
+            self.__bytes += len(texto)
+            while len(versoes) > self.__versoes_por_chave:
+                self.__bytes -= len(versoes.popitem(last=False)[1])
+            self._despejar()
+
+    def obter(self, chave: tuple, versao: int):
+        """
+        Estatísticas enviadas em uma versão.
+
+        Args:
+            chave: Identifica a colônia e a variante da resposta
+            versao: Versão da colônia
+
+        Returns:
+            Estatísticas, ou None se a versão não está guardada
+        """
+        with self.__trava:
+            texto = self.__chaves.get(chave, {}).get(versao)
+        return None if texto is None else json.loads(texto)
+
+    def diferenca(self, chave: tuple, anterior: dict, versao: int, estatisticas: dict) -> dict:
+        """
+        Registra a versão atual e retorna o que mudou desde `anterior`.
+
+        Args:
+            chave: Identifica a colônia e a variante da resposta
+            anterior: Estatísticas da versão que o cliente já tem (ver obter)
+            versao: Versão atual
+            estatisticas: Estatísticas atuais; basta trazer os campos que
+                          podem ter mudado (os demais são os de `anterior`)
+
+        Returns:
+            Mudanças (diferenca_estatisticas)
+        """
+        self.registrar(chave, versao, dict(anterior, **estatisticas))
+        comparados = {campo: anterior[campo] for campo in estatisticas if campo in anterior}
+        return diferenca_estatisticas(indexar_estatisticas(comparados),
+                                      indexar_estatisticas(estatisticas))
+
+    def _despejar(self):
+        """Tira versões das chaves usadas há mais tempo até caber no orçamento. Chamar com a trava."""
+        while self.__bytes > self.__orcamento and self.__chaves:
+            chave, versoes = next(iter(self.__chaves.items()))
+            self.__bytes -= len(versoes.popitem(last=False)[1])
+            if not versoes:
+                del self.__chaves[chave]
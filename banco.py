@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Ferramentas do banco SQLite de colônias.
+
+Subcomandos:
+    importar  Copia para o banco os saves em arquivo (pickle ou binário) de
+              todos os usuários de usuarios.json, incluindo as ações ainda
+              no diário. Execute uma vez antes de usar COLONIA_ARMAZENAMENTO=sqlite.
+    listar    Consulta as colônias do banco sem carregá-las.
+
+Uso:
+    python3 banco.py importar [--banco saves/colonias.db] [--sobrescrever]
+    python3 banco.py listar --dia-minimo 100
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+# Adiciona o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import ArmazenamentoSQLite, Colonia, DiarioAcoes, caminho_auxiliar, endereco_sqlite
+
+
+BANCO_PADRAO = os.environ.get('COLONIA_BANCO', 'saves/colonias.db')
+
+
+def importar(banco: str, usuarios: list, sobrescrever: bool = False) -> dict:
+    """
+    Importa os saves em arquivo dos usuários para o banco.
+
+    Args:
+        banco: Caminho do banco SQLite
+        usuarios: Lista de usuários (com 'username' e 'save_file')
+        sobrescrever: Substitui colônias que já estão no banco
+
+    Returns:
+        Dicionário {username: situação}
+    """
+    situacao = {}
+    for usuario in usuarios:
+        chave = usuario['username']
+        endereco = endereco_sqlite(banco, chave)
+        if not os.path.exists(usuario['save_file']):
+            situacao[chave] = 'sem save'
+            continue
+        if Colonia.existe_save(endereco) and not sobrescrever:
+            situacao[chave] = 'já no banco'
+            continue
+
+        try:
+            # Snapshot + ações do diário, como no login
+            colonia = DiarioAcoes(usuario['save_file']).recuperar()
+        except Exception as e:
+            situacao[chave] = f"erro: {e}"
+            continue
+
+        Colonia.excluir_save(endereco)
+        # Os eventos já arquivados acompanham a colônia para o banco
+        arquivo_eventos = caminho_auxiliar(endereco, '.eventos')
+        if colonia.eventos.arquivo and os.path.exists(colonia.eventos.arquivo):
+            shutil.copyfile(colonia.eventos.arquivo, arquivo_eventos)
+        colonia.eventos.vincular(arquivo_eventos)
+        colonia.salvar(endereco)
+        situacao[chave] = f"importado ({colonia.nome}, dia {colonia.dia})"
+    return situacao
+
+
+def main(argv: list = None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(description="Banco SQLite de colônias")
+    parser.add_argument('--banco', default=BANCO_PADRAO, help="Arquivo do banco SQLite")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    p_importar = subcomandos.add_parser('importar', help="Importa os saves em arquivo")
+    p_importar.add_argument('--usuarios', default='usuarios.json', help="Arquivo de usuários")
+    p_importar.add_argument('--sobrescrever', action='store_true',
+                            help="Substitui colônias já importadas")
+
+    p_listar = subcomandos.add_parser('listar', help="Lista as colônias do banco")
+    p_listar.add_argument('--dia-minimo', type=int, default=0, help="Só colônias a partir deste dia")
+    args = parser.parse_args(argv)
+
+    if args.comando == 'importar':
+        with open(args.usuarios, 'r', encoding='utf-8') as f:
+            usuarios = json.load(f)['usuarios']
+        for chave, situacao in importar(args.banco, usuarios, args.sobrescrever).items():
+            print(f"{chave:15s} {situacao}")
+    else:
+        colonias = ArmazenamentoSQLite.abrir(args.banco).listar_colonias(args.dia_minimo)
+        print(f"{'Chave':15s} {'Colônia':25s} {'Dia':>6s} {'Vivos':>7s} {'Edifícios':>10s}  Atualizado em")
+        for c in colonias:
+            atualizado = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(c['atualizado_em']))
+            print(f"{c['chave']:15s} {c['nome'][:25]:25s} {c['dia']:6d} {c['colonos_vivos']:7d} "
+                  f"{c['edificios']:10d}  {atualizado}")
+        print(f"\n{len(colonias)} colônia(s)")
+
+
+if __name__ == '__main__':
+    main()
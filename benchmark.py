@@ -0,0 +1,426 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks da simulação, da persistência e da camada web.
+
+Monta colônias sintéticas de vários tamanhos e mede as operações
+principais, gravando os resultados em JSON. O comando 'comparar'
+aponta regressões em relação a um resultado de referência.
+
+Uso:
+    python3 benchmark.py executar --saida atual.json
+    python3 benchmark.py executar --tamanhos 10,1000 --saida atual.json
+    python3 benchmark.py comparar referencia.json atual.json --limite 1.2
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Adiciona o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import Colonia, EventoAleatorio, TIPOS_EDIFICIOS, NUMPY_DISPONIVEL
+from logger import GameLogger
+
+
+# Tamanhos padrão (número de colonos; edifícios = colonos // 10)
+TAMANHOS_PADRAO = [10, 1_000, 100_000, 1_000_000]
+
+# Tempo mínimo medido por benchmark e limites de repetições
+TEMPO_MINIMO = 0.5
+REPETICOES_MINIMAS = 3
+REPETICOES_MAXIMAS = 50
+
+# Formato do arquivo de resultados
+VERSAO_RESULTADOS = 1
+
+
+def colonia_sintetica(tamanho: int, vetorizado: bool = NUMPY_DISPONIVEL,
+                      empilhar: bool = False, semente: int = 0,
+                      historico_dias: int = None) -> Colonia:
+    """
+    Monta uma colônia com `tamanho` colonos e `tamanho // 10` edifícios,
+    com recursos abundantes para que o turno não mate todos de uma vez.
+
+    Args:
+        tamanho: Número de colonos
+        vetorizado: Usa o motor vetorizado de colonos
+        empilhar: Agrupa edifícios idênticos
+        semente: Semente do gerador aleatório da colônia
+        historico_dias: Dias guardados no histórico (padrão: o da colônia,
+                        COLONIA_HISTORICO_DIAS)
+
+    Returns:
+        Colônia sintética
+    """
+    colonia = Colonia(f"Benchmark {tamanho}", vetorizado=vetorizado,
+                      empilhar=empilhar, semente=semente, historico_dias=historico_dias)
+
+    abundancia = max(1000, tamanho * 100)
+    for recurso in colonia.recursos.values():
+        recurso.capacidade_maxima = abundancia * 10
+        recurso.adicionar(abundancia)
+
+    # Colonos antes das habitações: a capacidade não limita a colônia sintética
+    while colonia._total_colonos() < tamanho:
+        colonia.adicionar_colono()
+
+    tipos = list(TIPOS_EDIFICIOS)
+    for i in range(max(0, tamanho // 10 - colonia.total_edificios)):
+        colonia.construir_edificio(tipos[i % len(tipos)])
+
+    for recurso in colonia.recursos.values():
+        recurso.adicionar(abundancia)
+
+    return colonia
+
+
+def medir(funcao, preparar=None, tempo_minimo: float = TEMPO_MINIMO) -> dict:
+    """
+    Mede uma função repetindo-a até acumular tempo_minimo segundos.
+
+    Args:
+        funcao: Função medida; recebe o valor retornado por preparar()
+        preparar: Função chamada fora da medição antes de cada repetição
+        tempo_minimo: Tempo total mínimo medido
+
+    Returns:
+        Dicionário com repeticoes, min, mediana e media (segundos)
+    """
+    tempos = []
+    while (len(tempos) < REPETICOES_MINIMAS or sum(tempos) < tempo_minimo) \
+            and len(tempos) < REPETICOES_MAXIMAS:
+        argumento = preparar() if preparar else None
+        inicio = time.perf_counter()
+        funcao(argumento)
+        tempos.append(time.perf_counter() - inicio)
+
+        # Operações muito lentas: uma repetição basta
+        if tempos[0] > tempo_minimo * 10:
+            break
+
+    return {
+        'repeticoes': len(tempos),
+        'min': min(tempos),
+        'mediana': statistics.median(tempos),
+        'media': statistics.fmean(tempos)
+    }
+
+
+class ClienteWSGI:
+    """
+    Cliente HTTP em processo: chama a aplicação WSGI diretamente,
+    sem abrir sockets.
+    """
+
+    def __init__(self, aplicacao):
+        """
+        Inicializa o cliente.
+
+        Args:
+            aplicacao: Aplicação WSGI
+        """
+        self.__aplicacao = aplicacao
+
+    def get(self, caminho: str, cookies: dict = None) -> tuple:
+        """
+        Faz uma requisição GET.
+
+        Args:
+            caminho: Caminho com query string opcional
+            cookies: Cookies enviados (nome -> valor)
+
+        Returns:
+            Tupla (status: str, corpo: bytes)
+        """
+        caminho, _, query = caminho.partition('?')
+        ambiente = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': caminho,
+            'QUERY_STRING': query,
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '8080',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': False,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False
+        }
+        if cookies:
+            ambiente['HTTP_COOKIE'] = '; '.join(f"{nome}={valor}" for nome, valor in cookies.items())
+        resposta = {}
+
+        def iniciar_resposta(status, cabecalhos, exc_info=None):
+            resposta['status'] = status
+
+        partes = self.__aplicacao(ambiente, iniciar_resposta)
+        try:
+            corpo = b''.join(partes)
+        finally:
+            if hasattr(partes, 'close'):
+                partes.close()
+        return resposta['status'], corpo
+
+
+@contextmanager
+def _diretorio_temporario():
+    """Executa o bloco dentro de um diretório temporário."""
+    anterior = os.getcwd()
+    diretorio = tempfile.mkdtemp(prefix='benchmark_')
+    os.chdir(diretorio)
+    try:
+        yield diretorio
+    finally:
+        os.chdir(anterior)
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+@contextmanager
+def _console_silenciado():
+    """Silencia o handler de console do GameLogger durante as rotas."""
+    logger = GameLogger().logger
+    handlers = [h for h in logger.handlers if not isinstance(h, logging.FileHandler)]
+    niveis = [h.level for h in handlers]
+    for handler in handlers:
+        handler.setLevel(logging.CRITICAL + 1)
+    try:
+        yield
+    finally:
+        for handler, nivel in zip(handlers, niveis):
+            handler.setLevel(nivel)
+
+
+def _bench_turno(tamanho: int, opcoes: dict) -> dict:
+    """Mede processar_turno (sem salvar) em uma colônia sintética."""
+    colonia = colonia_sintetica(tamanho, **opcoes)
+    return medir(lambda _: colonia.processar_turno(salvar=False))
+
+
+def _bench_estatisticas(colonia: Colonia) -> dict:
+    """Mede obter_estatisticas."""
+    return medir(lambda _: colonia.obter_estatisticas())
+
+
+def _bench_persistencia(colonia: Colonia) -> dict:
+    """Mede Colonia.salvar e Colonia.carregar em um arquivo temporário."""
+    with tempfile.TemporaryDirectory(prefix='benchmark_') as diretorio:
+        caminho = os.path.join(diretorio, 'colonia.pkl')
+        salvar = medir(lambda _: colonia.salvar(caminho))
+        carregar = medir(lambda _: Colonia.carregar(caminho))
+        tamanho_arquivo = os.path.getsize(caminho)
+    salvar['bytes'] = tamanho_arquivo
+    return {'salvar': salvar, 'carregar': carregar}
+
+
+def _bench_eventos(colonia: Colonia) -> dict:
+    """Mede EventoAleatorio.aplicar para cada tipo de evento."""
+    resultados = {}
+    for dados in EventoAleatorio.EVENTOS:
+        def novo_evento(dados=dados):
+            return EventoAleatorio(dados['tipo'], dados['nome'], dados['descricao'],
+                                   dados['efeitos'].copy())
+        resultados[dados['tipo']] = medir(lambda evento: evento.aplicar(colonia), novo_evento)
+    return resultados
+
+
+def _bench_logs(tamanho: int) -> dict:
+    """Mede GameLogger.get_recent_logs sobre um arquivo de log com `tamanho` linhas."""
+    niveis = ['DEBUG', 'INFO', 'INFO', 'WARNING', 'ERROR']
+    with _diretorio_temporario():
+        os.makedirs('logs')
+        with open(os.path.join('logs', 'colony_game.log'), 'w', encoding='utf-8') as f:
+            for i in range(tamanho):
+                nivel = niveis[i % len(niveis)]
+                f.write(f"2025-01-01 00:00:00 | {nivel:<8} | ColonyGame | Linha {i}\n")
+        return medir(lambda _: GameLogger().get_recent_logs(lines=50))
+
+
+def _bench_rotas(colonia: Colonia) -> dict:
+    """
+    Mede as rotas /jogo e /api/status com um cliente WSGI em processo,
+    com uma sessão cuja colônia já está no cache de colônias.
+    """
+    import app as aplicacao
+
+    cliente = ClienteWSGI(aplicacao.app)
+    with _diretorio_temporario() as diretorio:
+        caminho = os.path.join(diretorio, 'benchmark.json')
+        sessao = aplicacao.sessoes.criar({'username': 'benchmark', 'nome': 'Benchmark',
+                                          'save_file': caminho}, caminho)
+        aplicacao.cache_colonias.guardar(
+            caminho, colonia, aplicacao.DiarioAcoes(caminho, salvador=aplicacao.salvador))
+        cookies = {aplicacao.COOKIE_SESSAO: sessao.id}
+
+        def requisitar(rota):
+            status, _ = cliente.get(rota, cookies=cookies)
+            if not status.startswith('200'):
+                raise RuntimeError(f"GET {rota} retornou {status}")
+
+        try:
+            with _console_silenciado():
+                return {
+                    '/jogo': medir(lambda _: requisitar('/jogo')),
+                    '/api/status': medir(lambda _: requisitar('/api/status'))
+                }
+        finally:
+            aplicacao.cache_colonias.descartar(caminho)
+            aplicacao.sessoes.encerrar(sessao.id)
+
+
+def executar(tamanhos: list, opcoes: dict, progresso=None) -> dict:
+    """
+    Executa a suíte completa para cada tamanho.
+
+    Args:
+        tamanhos: Números de colonos das colônias sintéticas
+        opcoes: Argumentos repassados a colonia_sintetica()
+        progresso: Função chamada com o nome de cada medição (opcional)
+
+    Returns:
+        Dicionário de resultados (serializável em JSON)
+    """
+    resultados = []
+
+    def registrar(nome, tamanho, medicao):
+        resultados.append({'nome': nome, 'tamanho': tamanho, **medicao})
+        if progresso:
+            progresso(resultados[-1])
+
+    for tamanho in tamanhos:
+        registrar('processar_turno', tamanho, _bench_turno(tamanho, opcoes))
+
+        colonia = colonia_sintetica(tamanho, **opcoes)
+        registrar('obter_estatisticas', tamanho, _bench_estatisticas(colonia))
+        for nome, medicao in _bench_persistencia(colonia).items():
+            registrar(f"Colonia.{nome}", tamanho, medicao)
+        for rota, medicao in _bench_rotas(colonia).items():
+            registrar(f"GET {rota}", tamanho, medicao)
+        for tipo, medicao in _bench_eventos(colonia).items():
+            registrar(f"EventoAleatorio.aplicar[{tipo}]", tamanho, medicao)
+
+        registrar('GameLogger.get_recent_logs', tamanho, _bench_logs(tamanho))
+
+    return {
+        'versao': VERSAO_RESULTADOS,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'ambiente': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'numpy': NUMPY_DISPONIVEL,
+            **opcoes
+        },
+        'resultados': resultados
+    }
+
+
+def comparar(referencia: dict, atual: dict, limite: float = 1.2) -> list:
+    """
+    Compara dois resultados pela mediana de cada medição.
+
+    Args:
+        referencia: Resultados de referência
+        atual: Resultados atuais
+        limite: Razão atual/referência a partir da qual há regressão
+
+    Returns:
+        Lista de dicionários (nome, tamanho, referencia, atual, razao, regressao)
+        para as medições presentes nos dois resultados
+    """
+    base = {(r['nome'], r['tamanho']): r for r in referencia['resultados']}
+    comparacoes = []
+    for resultado in atual['resultados']:
+        anterior = base.get((resultado['nome'], resultado['tamanho']))
+        if anterior is None:
+            continue
+        razao = resultado['mediana'] / anterior['mediana'] if anterior['mediana'] else float('inf')
+        comparacoes.append({
+            'nome': resultado['nome'],
+            'tamanho': resultado['tamanho'],
+            'referencia': anterior['mediana'],
+            'atual': resultado['mediana'],
+            'razao': razao,
+            'regressao': razao > limite
+        })
+    return comparacoes
+
+
+def _formatar_tempo(segundos: float) -> str:
+    """Formata um tempo em s, ms ou µs."""
+    if segundos >= 1:
+        return f"{segundos:.2f}s"
+    if segundos >= 1e-3:
+        return f"{segundos * 1e3:.2f}ms"
+    return f"{segundos * 1e6:.1f}µs"
+
+
+def _imprimir_medicao(resultado: dict):
+    """Imprime uma linha com o resultado de uma medição."""
+    print(f"{resultado['nome']:<45} {resultado['tamanho']:>9} "
+          f"{_formatar_tempo(resultado['mediana']):>10} "
+          f"(min {_formatar_tempo(resultado['min'])}, {resultado['repeticoes']}x)", flush=True)
+
+
+def main(argv: list = None) -> int:
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(description="Benchmarks da colônia")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    cmd_executar = comandos.add_parser('executar', help="Executa a suíte")
+    cmd_executar.add_argument('--tamanhos', default=','.join(map(str, TAMANHOS_PADRAO)),
+                              help="Números de colonos separados por vírgula")
+    cmd_executar.add_argument('--saida', '-o', help="Arquivo JSON com os resultados")
+    cmd_executar.add_argument('--objeto', action='store_true',
+                              help="Usa o motor de objetos mesmo com NumPy disponível")
+    cmd_executar.add_argument('--empilhar', action='store_true',
+                              help="Agrupa edifícios idênticos")
+    cmd_executar.add_argument('--historico-dias', type=int,
+                              help="Dias guardados no histórico (padrão: o da colônia)")
+
+    cmd_comparar = comandos.add_parser('comparar', help="Compara com uma referência")
+    cmd_comparar.add_argument('referencia', help="Resultados de referência (JSON)")
+    cmd_comparar.add_argument('atual', help="Resultados atuais (JSON)")
+    cmd_comparar.add_argument('--limite', type=float, default=1.2,
+                              help="Razão atual/referência considerada regressão")
+
+    args = parser.parse_args(argv)
+
+    if args.comando == 'executar':
+        tamanhos = [int(t) for t in args.tamanhos.split(',') if t]
+        opcoes = {'vetorizado': NUMPY_DISPONIVEL and not args.objeto,
+                  'empilhar': args.empilhar, 'historico_dias': args.historico_dias}
+        resultados = executar(tamanhos, opcoes, progresso=_imprimir_medicao)
+        if args.saida:
+            with open(args.saida, 'w', encoding='utf-8') as f:
+                json.dump(resultados, f, ensure_ascii=False, indent=2)
+        return 0
+
+    with open(args.referencia, 'r', encoding='utf-8') as f:
+        referencia = json.load(f)
+    with open(args.atual, 'r', encoding='utf-8') as f:
+        atual = json.load(f)
+
+    comparacoes = comparar(referencia, atual, args.limite)
+    for c in comparacoes:
+        marca = "REGRESSÃO" if c['regressao'] else ""
+        print(f"{c['nome']:<45} {c['tamanho']:>9} {_formatar_tempo(c['referencia']):>10} -> "
+              f"{_formatar_tempo(c['atual']):>10} {c['razao']:>6.2f}x {marca}")
+
+    regressoes = [c for c in comparacoes if c['regressao']]
+    print(f"\n{len(regressoes)} regressão(ões) em {len(comparacoes)} medições (limite {args.limite}x)")
+    return 1 if regressoes else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Renderização das páginas: templates compilados uma vez na inicialização e
+cache dos painéis da página do jogo, reaproveitados enquanto não mudam.
+"""
+from bottle import SimpleTemplate
+from collections import OrderedDict
+import os
+import threading
+
+
+def compilar_templates(pasta: str = 'views', **padroes) -> dict:
+    """
+    Compila todos os templates .html da pasta (e subpastas).
+
+    Args:
+        pasta: Pasta dos templates
+        **padroes: Variáveis disponíveis em todos os templates
+
+    Returns:
+        Dicionário nome relativo sem extensão (ex.: 'paineis/colonos') -> SimpleTemplate
+    """
+    templates = {}
+    for raiz, _, arquivos in os.walk(pasta):
+        for arquivo in sorted(arquivos):
+            if not arquivo.endswith('.html'):
+                continue
+            relativo = os.path.relpath(os.path.join(raiz, arquivo), pasta)
+            nome = os.path.splitext(relativo)[0].replace(os.sep, '/')
+            tpl = SimpleTemplate(name=relativo, lookup=[pasta])
+            tpl.co  # Compila agora, não na primeira requisição
+            tpl.defaults = dict(padroes)
+            templates[nome] = tpl
+    return templates
+
+
+class CacheFragmentos:
+    """
+    HTML já renderizado de cada painel, guardado com a versão do painel
+    (ver Colonia.versoes_paineis). Enquanto a versão não muda o HTML é
+    reaproveitado; os fragmentos usados há mais tempo saem quando passa de
+    `capacidade`.
+    """
+
+    CAPACIDADE_PADRAO = int(os.environ.get('COLONIA_FRAGMENTOS', 512))
+
+    def __init__(self, capacidade: int = None):
+        """
+        Inicializa vazio.
+
+        Args:
+            capacidade: Máximo de fragmentos guardados
+        """
+        if capacidade is None:
+            capacidade = self.CAPACIDADE_PADRAO
+        if capacidade < 1:
+            raise ValueError("Capacidade deve ser maior que 0")
+
+        self.__capacidade = capacidade
+        self.__trava = threading.Lock()
+        self.__fragmentos = OrderedDict()  # chave -> (versão, html)
+        self.__estatisticas = {'acertos': 0, 'faltas': 0}
+
+    @property
+    def estatisticas(self) -> dict:
+        """Retorna acertos, faltas e número de fragmentos guardados."""
+        with self.__trava:
+            return dict(self.__estatisticas, fragmentos=len(self.__fragmentos))
+
+    def obter(self, chave, versao: int):
+        """
+        Retorna o HTML guardado para a chave, se for da versão pedida.
+
+        Args:
+            chave: Identifica o fragmento (ex.: (caminho do save, painel))
+            versao: Versão atual do painel
+
+        Returns:
+            HTML, ou None se não houver ou for de outra versão
+        """
+        with self.__trava:
+            guardado = self.__fragmentos.get(chave)
+            if guardado is None or guardado[0] != versao:
+                self.__estatisticas['faltas'] += 1
+                return None
+            self.__fragmentos.move_to_end(chave)
+            self.__estatisticas['acertos'] += 1
+            return guardado[1]
+
+    def guardar(self, chave, versao: int, html: str):
+        """
+        Guarda o HTML renderizado de uma versão, substituindo o anterior.
+
+        Args:
+            chave: Identifica o fragmento
+            versao: Versão do painel renderizada
+            html: HTML do painel
+        """
+        with self.__trava:
+            self.__fragmentos[chave] = (versao, html)
+            self.__fragmentos.move_to_end(chave)
+            while len(self.__fragmentos) > self.__capacidade:
+                self.__fragmentos.popitem(last=False)
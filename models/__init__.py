@@ -10,7 +10,19 @@ from models.edificio import (
     Mina, Habitacao, Hospital, TIPOS_EDIFICIOS
 )
 from models.evento import EventoAleatorio
+from models.registro_eventos import HistoricoEventos, RegistroEvento
+from models.aleatorio import GeradorAleatorio
+from models.populacao import PopulacaoColonos, ColonoVista, NUMPY_DISPONIVEL
+from models.instrumentacao import MedidorFases, HistogramaFases, histograma_fases, FASES_TURNO
+from models.salvamento import SalvadorBackground, TravaArquivo, TRAVAS_DISPONIVEIS, escrever_atomico
+from models.formato_binario import codificar_estado, decodificar_estado, eh_formato_binario
+from models.historico import HistoricoDias
+from models.armazenamento_sqlite import (
+    ArmazenamentoSQLite, endereco_sqlite, separar_endereco, caminho_auxiliar
+)
 from models.colonia import Colonia
+from models.diario import DiarioAcoes
+from models.cache_colonias import CacheColonias, ColoniaEmUso
 
 __all__ = [
     'Entidade',
@@ -25,6 +37,31 @@ __all__ = [
     'Hospital',
     'TIPOS_EDIFICIOS',
     'EventoAleatorio',
-    'Colonia'
+    'HistoricoEventos',
+    'RegistroEvento',
+    'GeradorAleatorio',
+    'PopulacaoColonos',
+    'ColonoVista',
+    'NUMPY_DISPONIVEL',
+    'MedidorFases',
+    'HistogramaFases',
+    'histograma_fases',
+    'FASES_TURNO',
+    'SalvadorBackground',
+    'TravaArquivo',
+    'TRAVAS_DISPONIVEIS',
+    'escrever_atomico',
+    'codificar_estado',
+    'decodificar_estado',
+    'eh_formato_binario',
+    'HistoricoDias',
+    'ArmazenamentoSQLite',
+    'endereco_sqlite',
+    'separar_endereco',
+    'caminho_auxiliar',
+    'Colonia',
+    'DiarioAcoes',
+    'CacheColonias',
+    'ColoniaEmUso'
 ]
 
@@ -0,0 +1,126 @@
+"""
+Gerador de números aleatórios de cada colônia.
+Demonstra: Encapsulamento, Composição
+"""
+import random
+
+try:
+    import numpy as np
+    NUMPY_DISPONIVEL = True
+except ImportError:
+    np = None
+    NUMPY_DISPONIVEL = False
+
+
+class GeradorAleatorio:
+    """
+    Fluxo aleatório semeado e independente, salvo junto com a colônia.
+
+    O fluxo é dividido em passos: cada ação que sorteia algo começa com
+    avancar(), que ressemeia o gerador a partir de (semente, passo).
+    Assim o par (semente, passo) descreve todo o estado no início de
+    uma ação, e a mesma semente sempre reproduz a mesma partida.
+    """
+
+    def __init__(self, semente: int = None):
+        """
+        Inicializa o gerador.
+
+        Args:
+            semente: Semente do fluxo (aleatória se não especificada)
+        """
+        if semente is None:
+            semente = random.SystemRandom().randrange(2 ** 63)
+
+        self.__semente = semente
+        self.__passo = 0
+        self.__python = random.Random()
+        self.__numpy = None
+        self._ressemear()
+
+    @property
+    def semente(self) -> int:
+        """Retorna a semente do fluxo."""
+        return self.__semente
+
+    @property
+    def passo(self) -> int:
+        """Retorna o passo atual do fluxo."""
+        return self.__passo
+
+    @property
+    def estado(self) -> tuple:
+        """Retorna (semente, passo): o estado no início do passo atual."""
+        return (self.__semente, self.__passo)
+
+    def _ressemear(self):
+        """Ressemeia os geradores a partir de (semente, passo)."""
+        self.__python.seed(f"{self.__semente}:{self.__passo}")
+        self.__numpy = None  # Recriado sob demanda
+
+    def _gerador_numpy(self):
+        """Retorna o gerador NumPy do passo atual (criado sob demanda)."""
+        if self.__numpy is None:
+            self.__numpy = np.random.default_rng([self.__semente, self.__passo])
+        return self.__numpy
+
+    def avancar(self):
+        """Inicia um novo passo do fluxo."""
+        self.__passo += 1
+        self._ressemear()
+
+    def restaurar(self, semente: int, passo: int):
+        """
+        Volta o fluxo para o início de um passo.
+
+        Args:
+            semente: Semente do fluxo
+            passo: Passo a restaurar
+        """
+        self.__semente = semente
+        self.__passo = passo
+        self._ressemear()
+
+    # Sorteios individuais (mesma interface do módulo random)
+    def random(self) -> float:
+        """Retorna um float em [0, 1)."""
+        return self.__python.random()
+
+    def randint(self, a: int, b: int) -> int:
+        """Retorna um inteiro em [a, b]."""
+        return self.__python.randint(a, b)
+
+    def choice(self, sequencia):
+        """Retorna um elemento da sequência."""
+        return self.__python.choice(sequencia)
+
+    def choices(self, populacao, weights=None, k: int = 1) -> list:
+        """Retorna k elementos sorteados com reposição, com pesos opcionais."""
+        return self.__python.choices(populacao, weights=weights, k=k)
+
+    # Sorteios em lote
+    def lote_inteiros(self, a: int, b: int, n: int):
+        """
+        Retorna n inteiros em [a, b] de uma vez.
+
+        Returns:
+            Array NumPy (int16) ou lista, se NumPy não estiver disponível
+        """
+        if NUMPY_DISPONIVEL:
+            return self._gerador_numpy().integers(a, b + 1, size=n, dtype=np.int16)
+        return [self.__python.randint(a, b) for _ in range(n)]
+
+    def lote_uniforme(self, n: int):
+        """
+        Retorna n floats em [0, 1) de uma vez.
+
+        Returns:
+            Array NumPy ou lista, se NumPy não estiver disponível
+        """
+        if NUMPY_DISPONIVEL:
+            return self._gerador_numpy().random(n)
+        return [self.__python.random() for _ in range(n)]
+
+    def __repr__(self) -> str:
+        """Representação técnica do gerador."""
+        return f"GeradorAleatorio(semente={self.__semente}, passo={self.__passo})"
@@ -0,0 +1,396 @@
+"""
+Armazenamento das colônias de todos os usuários em um banco SQLite.
+Demonstra: Encapsulamento, Persistência
+"""
+from models.historico import HistoricoDias
+from models.linhas import COLUNAS, COLUNAS_META, extrair_linhas, montar_estado
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+# Endereços de save no banco: 'sqlite:<arquivo do banco>#<chave da colônia>'
+PREFIXO_ENDERECO = 'sqlite:'
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS colonias (
+    chave TEXT PRIMARY KEY,
+    nome TEXT NOT NULL,
+    dia INTEGER NOT NULL,
+    vetorizado INTEGER NOT NULL,
+    empilhar INTEGER NOT NULL,
+    rng_semente TEXT NOT NULL,
+    rng_passo INTEGER NOT NULL,
+    bonus_eficiencia REAL NOT NULL,
+    seq_diario INTEGER NOT NULL,
+    total_colonos_mortos INTEGER NOT NULL,
+    total_edificios_construidos INTEGER NOT NULL,
+    recursos TEXT NOT NULL,
+    historico TEXT NOT NULL,
+    atualizado_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_colonias_dia ON colonias (dia);
+
+CREATE TABLE IF NOT EXISTS colonos (
+    colonia TEXT NOT NULL REFERENCES colonias (chave) ON DELETE CASCADE,
+    id TEXT NOT NULL,
+    ordem INTEGER NOT NULL,
+    nome TEXT NOT NULL,
+    descricao TEXT,
+    profissao TEXT NOT NULL,
+    saude INTEGER NOT NULL,
+    felicidade INTEGER NOT NULL,
+    produtividade REAL NOT NULL,
+    dias_trabalhados INTEGER NOT NULL,
+    PRIMARY KEY (colonia, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_colonos_ordem ON colonos (colonia, ordem);
+CREATE INDEX IF NOT EXISTS idx_colonos_profissao ON colonos (profissao);
+
+CREATE TABLE IF NOT EXISTS edificios (
+    colonia TEXT NOT NULL REFERENCES colonias (chave) ON DELETE CASCADE,
+    id TEXT NOT NULL,
+    ordem INTEGER NOT NULL,
+    tipo TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    descricao TEXT NOT NULL,
+    custo TEXT NOT NULL,
+    nivel INTEGER NOT NULL,
+    capacidade INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    quantidade INTEGER NOT NULL,
+    producao_total REAL NOT NULL,
+    PRIMARY KEY (colonia, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_edificios_ordem ON edificios (colonia, ordem);
+CREATE INDEX IF NOT EXISTS idx_edificios_tipo ON edificios (tipo);
+
+CREATE TABLE IF NOT EXISTS eventos (
+    colonia TEXT NOT NULL REFERENCES colonias (chave) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    dia INTEGER NOT NULL,
+    tipo TEXT NOT NULL,
+    efeitos TEXT NOT NULL,
+    PRIMARY KEY (colonia, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_eventos_dia ON eventos (colonia, dia);
+CREATE INDEX IF NOT EXISTS idx_eventos_tipo ON eventos (tipo);
+
+CREATE TABLE IF NOT EXISTS historico (
+    colonia TEXT NOT NULL REFERENCES colonias (chave) ON DELETE CASCADE,
+    dia INTEGER NOT NULL,
+    keyframe INTEGER NOT NULL,
+    dados BLOB NOT NULL,
+    PRIMARY KEY (colonia, dia)
+) WITHOUT ROWID;
+"""
+
+_COLUNAS_COLONIA = ('chave',) + COLUNAS_META + ('historico', 'atualizado_em')
+
+# Tabelas filhas: colunas (a primeira é a chave da linha) e ordenação
+_TABELAS = dict(COLUNAS, historico=('dia', 'keyframe', 'dados'))
+_ORDEM = {'colonos': 'ordem', 'edificios': 'ordem', 'eventos': 'seq', 'historico': 'dia'}
+
+
+def endereco_sqlite(banco: str, chave: str) -> str:
+    """
+    Monta o endereço de uma colônia no banco, aceito por Colonia.salvar/carregar.
+
+    Args:
+        banco: Caminho do arquivo do banco
+        chave: Chave da colônia (ex.: nome do usuário)
+    """
+    return f"{PREFIXO_ENDERECO}{banco}#{chave}"
+
+
+def separar_endereco(caminho: str):
+    """
+    Separa um endereço 'sqlite:<banco>#<chave>'.
+
+    Returns:
+        Tupla (banco, chave), ou None se o caminho for um arquivo comum
+    """
+    if not caminho.startswith(PREFIXO_ENDERECO):
+        return None
+    banco, separador, chave = caminho[len(PREFIXO_ENDERECO):].rpartition('#')
+    if not separador or not banco or not chave:
+        raise ValueError(f"Endereço SQLite inválido: {caminho}")
+    return banco, chave
+
+
+def caminho_auxiliar(caminho_save: str, extensao: str) -> str:
+    """
+    Caminho de um arquivo que acompanha o save (ex.: '.diario', '.eventos').
+    Para saves no banco, fica ao lado do arquivo do banco.
+
+    Args:
+        caminho_save: Caminho do arquivo ou endereço SQLite do save
+        extensao: Extensão do arquivo auxiliar
+    """
+    endereco = separar_endereco(caminho_save)
+    if endereco is not None:
+        banco, chave = endereco
+        return f"{banco}.{chave}{extensao}"
+    return caminho_save + extensao
+
+
+class ArmazenamentoSQLite:
+    """
+    Guarda as colônias em tabelas indexadas (colonias, colonos, edificios,
+    eventos, historico) de um banco SQLite em modo WAL, permitindo consultas sobre
+    todas as colônias do servidor sem carregar nenhuma.
+
+    As gravações são por linha: o armazenamento lembra as linhas que
+    gravou de cada colônia e, a cada save, só insere, atualiza ou remove
+    as que mudaram. A primeira gravação de uma colônia neste processo
+    (sem carregá-la antes) reescreve todas as suas linhas.
+    """
+
+    __abertos = {}  # caminho absoluto do banco -> instância
+    __trava_abertos = threading.Lock()
+
+    @classmethod
+    def abrir(cls, banco: str) -> 'ArmazenamentoSQLite':
+        """
+        Retorna o armazenamento do banco, compartilhado no processo
+        (as linhas já gravadas ficam guardadas na instância).
+
+        Args:
+            banco: Caminho do arquivo do banco
+        """
+        caminho = os.path.abspath(banco)
+        with cls.__trava_abertos:
+            if caminho not in cls.__abertos:
+                cls.__abertos[caminho] = cls(banco)
+            return cls.__abertos[caminho]
+
+    def __init__(self, banco: str):
+        """
+        Abre (ou cria) o banco.
+
+        Args:
+            banco: Caminho do arquivo do banco
+        """
+        diretorio = os.path.dirname(banco)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        self.__banco = banco
+        self.__trava = threading.Lock()  # A conexão é usada pela thread do salvador e pelas requisições
+        self.__conexao = sqlite3.connect(banco, check_same_thread=False, isolation_level=None)
+        self.__conexao.execute('PRAGMA journal_mode=WAL')
+        # FULL: o commit já está no disco quando o diário de ações é compactado
+        self.__conexao.execute('PRAGMA synchronous=FULL')
+        self.__conexao.execute('PRAGMA foreign_keys=ON')
+        self.__conexao.executescript(ESQUEMA)
+
+        self.__gravadas = {}  # chave -> {tabela: {chave da linha: linha}}
+        self.__estatisticas = {'gravacoes': 0, 'inseridas': 0, 'atualizadas': 0, 'removidas': 0}
+
+    @property
+    def banco(self) -> str:
+        """Retorna o caminho do arquivo do banco."""
+        return self.__banco
+
+    @property
+    def estatisticas(self) -> dict:
+        """Retorna contadores de gravações e de linhas escritas."""
+        with self.__trava:
+            return dict(self.__estatisticas)
+
+    def fechar(self):
+        """Fecha a conexão e esquece a instância compartilhada."""
+        with self.__trava_abertos:
+            ArmazenamentoSQLite.__abertos.pop(os.path.abspath(self.__banco), None)
+        with self.__trava:
+            self.__conexao.close()
+            self.__gravadas.clear()
+
+    # ------------------------------------------------------------------
+    # Gravação
+    # ------------------------------------------------------------------
+
+    def preparar_salvamento(self, estado: dict, chave: str):
+        """
+        Extrai as linhas do estado da colônia (deve ser chamado com a
+        colônia parada) e retorna a função que as grava no banco.
+
+        Args:
+            estado: Estado da colônia (Colonia.__getstate__)
+            chave: Chave da colônia no banco
+
+        Returns:
+            Função sem argumentos que grava as linhas alteradas
+        """
+        linhas = self._extrair_linhas(estado, chave)
+        return lambda: self._gravar(chave, linhas)
+
+    def salvar(self, estado: dict, chave: str):
+        """
+        Grava o estado de uma colônia.
+
+        Args:
+            estado: Estado da colônia (Colonia.__getstate__)
+            chave: Chave da colônia no banco
+        """
+        self.preparar_salvamento(estado, chave)()
+
+    def _extrair_linhas(self, estado: dict, chave: str) -> tuple:
+        """Retorna (linha da colônia, {tabela: {chave da linha: linha}})."""
+        meta, tabelas = extrair_linhas(estado)
+        # Os dias ainda não arquivados já estão comprimidos: cada dia é uma
+        # linha; a configuração e a posição no arquivo do histórico vão em JSON
+        historico = estado['_Colonia__historico']
+        tabelas['historico'] = {
+            dia: (dia, int(keyframe), dados) for dia, keyframe, dados in historico.pendentes
+        }
+        configuracao = json.dumps([historico.limite, historico.intervalo_keyframe,
+                                   historico.geracao, historico.arquivadas,
+                                   historico.descartadas])
+        return (chave,) + meta + (configuracao, time.time()), tabelas
+
+    def _gravar(self, chave: str, linhas: tuple):
+        """Grava em uma transação só as linhas que mudaram desde a última gravação."""
+        colonia, tabelas = linhas
+        with self.__trava:
+            anteriores = self.__gravadas.get(chave)
+            contagem = {'inseridas': 0, 'atualizadas': 0, 'removidas': 0}
+            cursor = self.__conexao.cursor()
+            try:
+                cursor.execute('BEGIN IMMEDIATE')
+                # Upsert (REPLACE apagaria as linhas filhas em cascata)
+                cursor.execute(
+                    f"INSERT INTO colonias ({', '.join(_COLUNAS_COLONIA)}) "
+                    f"VALUES ({', '.join('?' * len(_COLUNAS_COLONIA))}) "
+                    f"ON CONFLICT (chave) DO UPDATE SET "
+                    + ', '.join(f"{c} = excluded.{c}" for c in _COLUNAS_COLONIA[1:]),
+                    colonia
+                )
+                for tabela, atuais in tabelas.items():
+                    colunas = _TABELAS[tabela]
+                    if anteriores is None:
+                        # Estado do banco desconhecido: reescreve tudo
+                        cursor.execute(f"DELETE FROM {tabela} WHERE colonia = ?", (chave,))
+                        alteradas, removidas = list(atuais.values()), []
+                        contagem['inseridas'] += len(alteradas)
+                    else:
+                        antigas = anteriores[tabela]
+                        alteradas = [linha for k, linha in atuais.items() if antigas.get(k) != linha]
+                        removidas = [(chave, k) for k in antigas.keys() - atuais.keys()]
+                        novas = sum(1 for linha in alteradas if linha[0] not in antigas)
+                        contagem['inseridas'] += novas
+                        contagem['atualizadas'] += len(alteradas) - novas
+                        contagem['removidas'] += len(removidas)
+
+                    if removidas:
+                        cursor.executemany(
+                            f"DELETE FROM {tabela} WHERE colonia = ? AND {colunas[0]} = ?",
+                            removidas
+                        )
+                    if alteradas:
+                        cursor.executemany(
+                            f"INSERT OR REPLACE INTO {tabela} (colonia, {', '.join(colunas)}) "
+                            f"VALUES (?, {', '.join('?' * len(colunas))})",
+                            ((chave,) + linha for linha in alteradas)
+                        )
+                cursor.execute('COMMIT')
+            except BaseException:
+                if self.__conexao.in_transaction:
+                    cursor.execute('ROLLBACK')
+                self.__gravadas.pop(chave, None)
+                raise
+
+            self.__gravadas[chave] = tabelas
+            self.__estatisticas['gravacoes'] += 1
+            for nome, valor in contagem.items():
+                self.__estatisticas[nome] += valor
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def existe(self, chave: str) -> bool:
+        """Verifica se há uma colônia com a chave."""
+        with self.__trava:
+            return self.__conexao.execute(
+                "SELECT 1 FROM colonias WHERE chave = ?", (chave,)
+            ).fetchone() is not None
+
+    def excluir(self, chave: str):
+        """Remove a colônia e todas as suas linhas."""
+        with self.__trava:
+            with self.__conexao:
+                self.__conexao.execute("DELETE FROM colonias WHERE chave = ?", (chave,))
+            self.__gravadas.pop(chave, None)
+
+    def carregar_estado(self, chave: str):
+        """
+        Lê uma colônia do banco.
+
+        Args:
+            chave: Chave da colônia
+
+        Returns:
+            Estado aceito por Colonia.__setstate__, ou None se não existir
+        """
+        with self.__trava:
+            cursor = self.__conexao.cursor()
+            cursor.execute('BEGIN')  # Leitura consistente entre as tabelas
+            try:
+                colonia = cursor.execute(
+                    f"SELECT {', '.join(_COLUNAS_COLONIA)} FROM colonias WHERE chave = ?", (chave,)
+                ).fetchone()
+                if colonia is None:
+                    return None
+                tabelas = {
+                    tabela: cursor.execute(
+                        f"SELECT {', '.join(colunas)} FROM {tabela} WHERE colonia = ? "
+                        f"ORDER BY {_ORDEM[tabela]}", (chave,)
+                    ).fetchall()
+                    for tabela, colunas in _TABELAS.items()
+                }
+            finally:
+                cursor.execute('COMMIT')
+
+            self.__gravadas[chave] = {
+                tabela: {linha[0]: linha for linha in linhas} for tabela, linhas in tabelas.items()
+            }
+
+        estado = montar_estado(colonia[1:-2], tabelas)
+        limite, intervalo, geracao, arquivadas, descartadas = json.loads(colonia[-2])
+        estado['_Colonia__historico'] = HistoricoDias(
+            limite, intervalo,
+            [(dia, bool(keyframe), dados) for dia, keyframe, dados in tabelas['historico']],
+            arquivadas, descartadas, geracao
+        )
+        return estado
+
+    def listar_colonias(self, dia_minimo: int = 0) -> list:
+        """
+        Consulta as colônias do servidor sem carregá-las.
+
+        Args:
+            dia_minimo: Só colônias a partir deste dia
+
+        Returns:
+            Lista de dicionários (chave, nome, dia, colonos_vivos,
+            edificios, atualizado_em), dos dias mais avançados primeiro
+        """
+        with self.__trava:
+            linhas = self.__conexao.execute(
+                """
+                SELECT c.chave, c.nome, c.dia,
+                       (SELECT COUNT(*) FROM colonos WHERE colonia = c.chave AND saude > 0),
+                       (SELECT COALESCE(SUM(quantidade), 0) FROM edificios WHERE colonia = c.chave),
+                       c.atualizado_em
+                FROM colonias c
+                WHERE c.dia >= ?
+                ORDER BY c.dia DESC, c.chave
+                """,
+                (dia_minimo,)
+            ).fetchall()
+        return [dict(zip(('chave', 'nome', 'dia', 'colonos_vivos', 'edificios', 'atualizado_em'),
+                         linha))
+                for linha in linhas]
@@ -0,0 +1,267 @@
+"""
+Cache em memória das colônias carregadas, com despejo LRU.
+Demonstra: Encapsulamento, Composição
+"""
+from models.colonia import Colonia
+from models.diario import DiarioAcoes
+from models.armazenamento_sqlite import caminho_auxiliar
+from models.salvamento import TravaArquivo
+from collections import OrderedDict
+import os
+import threading
+
+
+class ColoniaEmUso(RuntimeError):
+    """A colônia está no cache de outro processo do servidor."""
+
+
+class CacheColonias:
+    """
+    Guarda as colônias carregadas (com seus diários de ações) por caminho
+    do save, para que logins repetidos e a troca entre jogadores não
+    releiam nem desserializem o save.
+
+    O cache respeita um orçamento de memória (Colonia.memoria_estimada):
+    ao passar dele, as colônias usadas há mais tempo saem. Uma colônia
+    suja (com ações ainda não incluídas em um snapshot no disco) recebe
+    um snapshot ao sair; sem o snapshot, o diário ainda a recuperaria,
+    mas reaplicando as ações.
+
+    Quem lê ou altera uma colônia do cache deve segurar a trava do seu
+    diário (diario.trava), como nas demais ações do jogo.
+
+    Com `travar_saves`, o processo é o dono das colônias do seu cache:
+    cada uma tem uma trava de arquivo (`<save>.trava`) adquirida ao
+    entrar no cache e liberada ao sair, depois do snapshot chegar ao
+    disco. Outro processo que tente carregar a mesma colônia recebe
+    ColoniaEmUso em vez de gravar por cima. Enquanto o snapshot de uma
+    colônia despejada é gravado, ela continua alcançável: um obter()
+    nesse meio-tempo a devolve ao cache com a mesma trava de arquivo.
+    """
+
+    ORCAMENTO_PADRAO = int(os.environ.get('COLONIA_CACHE_MB', 256)) * 1024 * 1024
+
+    def __init__(self, orcamento: int = None, salvador=None, intervalo_snapshot: int = None,
+                 travar_saves: bool = False):
+        """
+        Inicializa o cache vazio.
+
+        Args:
+            orcamento: Memória máxima das colônias guardadas, em bytes
+            salvador: SalvadorBackground repassado aos diários (opcional)
+            intervalo_snapshot: Ações entre snapshots dos diários (padrão do diário)
+            travar_saves: Trava o save de cada colônia guardada contra outros processos
+        """
+        if orcamento is None:
+            orcamento = self.ORCAMENTO_PADRAO
+        if orcamento < 0:
+            raise ValueError("Orçamento deve ser maior ou igual a 0")
+
+        self.__orcamento = orcamento
+        self.__salvador = salvador
+        self.__intervalo_snapshot = intervalo_snapshot
+        self.__travar_saves = travar_saves
+        self.__trava = threading.Lock()
+        self.__entradas = OrderedDict()  # caminho -> [colonia, diario, bytes, trava do save]; mais recente no fim
+        self.__carregando = {}  # caminho -> trava do carregamento em andamento
+        self.__despejando = {}  # caminho -> entrada despejada com snapshot em gravação
+        self.__estatisticas = {'acertos': 0, 'falhas': 0, 'despejos': 0, 'snapshots_despejo': 0}
+
+    @property
+    def orcamento(self) -> int:
+        """Retorna a memória máxima das colônias guardadas, em bytes."""
+        return self.__orcamento
+
+    @property
+    def estatisticas(self) -> dict:
+        """Retorna acertos, falhas, despejos e a ocupação atual."""
+        with self.__trava:
+            return dict(self.__estatisticas,
+                        colonias=len(self.__entradas),
+                        bytes=sum(entrada[2] for entrada in self.__entradas.values()),
+                        orcamento=self.__orcamento)
+
+    def __contains__(self, caminho: str) -> bool:
+        """Verifica se a colônia do save está no cache (ou gravando o snapshot de saída)."""
+        with self.__trava:
+            return caminho in self.__entradas or caminho in self.__despejando
+
+    def __len__(self) -> int:
+        """Retorna o número de colônias no cache."""
+        with self.__trava:
+            return len(self.__entradas)
+
+    def obter(self, caminho: str) -> tuple:
+        """
+        Retorna a colônia do save e seu diário, carregando-a (snapshot +
+        diário) só se não estiver no cache.
+
+        Args:
+            caminho: Caminho do save (arquivo ou endereço SQLite)
+
+        Returns:
+            Tupla (colônia ou None se não houver save, diário de ações)
+
+        Raises:
+            ColoniaEmUso: Se o save estiver travado por outro processo
+        """
+        with self.__trava:
+            entrada = self._acessar(caminho)
+            if entrada is not None:
+                return entrada[0], entrada[1]
+            carregamento = self.__carregando.setdefault(caminho, threading.Lock())
+
+        # Carrega fora da trava do cache; dois pedidos do mesmo save esperam um ao outro
+        with carregamento:
+            with self.__trava:
+                entrada = self._acessar(caminho, contar=False)
+                if entrada is not None:
+                    return entrada[0], entrada[1]
+                self.__estatisticas['falhas'] += 1
+
+            try:
+                trava = self._travar(caminho)
+                try:
+                    diario = DiarioAcoes(caminho, intervalo_snapshot=self.__intervalo_snapshot,
+                                         salvador=self.__salvador)
+                    colonia = diario.recuperar() if Colonia.existe_save(caminho) else None
+                    if colonia is not None:
+                        self._inserir(caminho, colonia, diario, trava)
+                        trava = None  # Agora pertence à entrada
+                finally:
+                    if trava is not None:
+                        trava.liberar()
+            finally:
+                with self.__trava:
+                    self.__carregando.pop(caminho, None)
+        return colonia, diario
+
+    def guardar(self, caminho: str, colonia: Colonia, diario: DiarioAcoes):
+        """
+        Põe (ou substitui) a colônia do save no cache, como a mais recente
+        (ex.: ao criar um novo jogo).
+
+        Args:
+            caminho: Caminho do save
+            colonia: Colônia
+            diario: Diário de ações do save
+
+        Raises:
+            ColoniaEmUso: Se o save estiver travado por outro processo
+        """
+        with self.__trava:
+            entrada = self.__entradas.get(caminho) or self.__despejando.pop(caminho, None)
+            trava = entrada[3] if entrada is not None else None
+        if trava is None:
+            trava = self._travar(caminho)
+        self._inserir(caminho, colonia, diario, trava)
+
+    def _inserir(self, caminho: str, colonia: Colonia, diario: DiarioAcoes, trava):
+        """Põe a entrada no cache como a mais recente e despeja as que passarem do orçamento."""
+        with self.__trava:
+            self.__entradas[caminho] = [colonia, diario, colonia.memoria_estimada(), trava]
+            self.__entradas.move_to_end(caminho)
+            despejadas = self._despejar()
+        self._gravar_despejadas(despejadas)
+
+    def atualizar(self, caminho: str):
+        """
+        Recalcula a memória estimada da colônia depois de uma ação (ela
+        pode ter crescido) e despeja outras se o orçamento passou.
+
+        Args:
+            caminho: Caminho do save
+        """
+        with self.__trava:
+            entrada = self.__entradas.get(caminho)
+            if entrada is None:
+                return
+            entrada[2] = entrada[0].memoria_estimada()
+            despejadas = self._despejar()
+        self._gravar_despejadas(despejadas)
+
+    def descartar(self, caminho: str):
+        """
+        Remove a colônia do cache sem gravá-la (ex.: ao reiniciar o jogo).
+
+        Args:
+            caminho: Caminho do save
+        """
+        with self.__trava:
+            entrada = self.__entradas.pop(caminho, None) or self.__despejando.pop(caminho, None)
+        if entrada is not None and entrada[3] is not None:
+            entrada[3].liberar()
+
+    def esvaziar(self):
+        """Remove todas as colônias, gravando um snapshot das sujas (ex.: ao encerrar)."""
+        with self.__trava:
+            despejadas = list(self.__entradas.items())
+            self.__entradas.clear()
+            self.__despejando.update(despejadas)
+            self.__estatisticas['despejos'] += len(despejadas)
+        self._gravar_despejadas(despejadas)
+
+    def _travar(self, caminho: str):
+        """Trava do save adquirida (None sem travar_saves); ColoniaEmUso se ocupada."""
+        if not self.__travar_saves:
+            return None
+        trava = TravaArquivo(caminho_auxiliar(caminho, '.trava'))
+        if not trava.adquirir():
+            raise ColoniaEmUso(f"Colônia aberta por outro processo do servidor: {caminho}")
+        return trava
+
+    def _acessar(self, caminho: str, contar: bool = True):
+        """
+        Entrada do save (marcada como a mais recente), ou None. Uma entrada
+        despejada que ainda está gravando volta ao cache (como uma nova
+        lista: quem a gravava não libera mais a trava). Chamar com a trava.
+        """
+        entrada = self.__entradas.get(caminho)
+        if entrada is None and caminho in self.__despejando:
+            entrada = list(self.__despejando.pop(caminho))
+            self.__entradas[caminho] = entrada
+        if entrada is not None:
+            self.__entradas.move_to_end(caminho)
+            if contar:
+                self.__estatisticas['acertos'] += 1
+        return entrada
+
+    def _despejar(self) -> list:
+        """
+        Retira as colônias usadas há mais tempo até caber no orçamento
+        (a mais recente sempre fica). Chamar com a trava.
+
+        Returns:
+            Lista de (caminho, entrada) despejadas
+        """
+        despejadas = []
+        total = sum(entrada[2] for entrada in self.__entradas.values())
+        while total > self.__orcamento and len(self.__entradas) > 1:
+            caminho, entrada = self.__entradas.popitem(last=False)
+            total -= entrada[2]
+            despejadas.append((caminho, entrada))
+            self.__despejando[caminho] = entrada
+        self.__estatisticas['despejos'] += len(despejadas)
+        return despejadas
+
+    def _gravar_despejadas(self, despejadas: list):
+        """
+        Grava um snapshot das colônias despejadas que estão sujas. Com a
+        trava do save, espera a gravação antes de liberá-la; se a colônia
+        voltou ao cache durante a gravação, a trava fica com ela.
+        """
+        for caminho, entrada in despejadas:
+            colonia, diario, _, trava = entrada
+            try:
+                if colonia._seq_diario != diario.seq_gravado:
+                    diario.snapshot(colonia, aguardar=trava is not None)
+                    with self.__trava:
+                        self.__estatisticas['snapshots_despejo'] += 1
+            finally:
+                with self.__trava:
+                    if self.__despejando.get(caminho) is entrada:
+                        del self.__despejando[caminho]
+                    else:
+                        trava = None  # Voltou ao cache (ou foi descartada)
+                if trava is not None:
+                    trava.liberar()
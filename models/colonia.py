@@ -3,12 +3,23 @@ Classe principal Colonia - gerencia todo o estado do jogo.
 Demonstra: Composição, Agregação, Associação
 """
 from models.colono import Colono
-from models.edificio import TIPOS_EDIFICIOS
+from models.edificio import TIPOS_EDIFICIOS, GeradorEnergia
 from models.recurso import Recurso
 from models.evento import EventoAleatorio
+from models.populacao import PopulacaoColonos
+from models.aleatorio import GeradorAleatorio
+from models.instrumentacao import MedidorFases, histograma_fases
+from models.salvamento import escrever_atomico
+from models.formato_binario import codificar_estado, decodificar_estado, eh_formato_binario
+from models.armazenamento_sqlite import ArmazenamentoSQLite, separar_endereco, caminho_auxiliar
+from models.registro_eventos import HistoricoEventos
+from models.historico import HistoricoDias
+from itertools import count, islice
 import random
 import pickle
+import mmap
 import os
+import secrets
 
 
 class Colonia:
@@ -17,19 +28,85 @@ class Colonia:
     Demonstra composição (contém objetos de outras classes) e agregação.
     """
     
-    def __init__(self, nome: str):
+    # Modo de depuração: confere os agregados com uma varredura completa
+    # a cada leitura (ative com COLONIA_DEBUG_AGREGADOS=1)
+    DEBUG_AGREGADOS = os.environ.get('COLONIA_DEBUG_AGREGADOS') == '1'
+    
+    # Mede o tempo de cada fase do turno (ative com COLONIA_INSTRUMENTAR=1)
+    INSTRUMENTAR = os.environ.get('COLONIA_INSTRUMENTAR') == '1'
+    
+    # Formato dos saves: 'binario' (colunar, ver formato_binario) ou 'pickle'
+    FORMATO_SAVE = os.environ.get('COLONIA_FORMATO_SAVE', 'binario')
+    # Compressão do formato binário: 'nenhuma', 'zlib', 'lzma' ou 'auto'
+    # ('nenhuma' para colônias vetorizadas com COLONOS_SAVE_MAPEADO colonos
+    # ou mais, cujo save é mapeado na memória ao carregar; senão 'zlib')
+    COMPRESSAO_SAVE = os.environ.get('COLONIA_COMPRESSAO_SAVE', 'auto')
+    COLONOS_SAVE_MAPEADO = int(os.environ.get('COLONIA_COLONOS_SAVE_MAPEADO', 10000))
+    # Carrega saves binários sem compressão com mmap (sem cópia)
+    MAPEAR_SAVES = os.environ.get('COLONIA_MAPEAR_SAVES', '1') == '1'
+    # Confere o CRC de saves mapeados, lendo o arquivo inteiro do disco
+    # (os demais saves são sempre conferidos)
+    VERIFICAR_SAVES_MAPEADOS = os.environ.get('COLONIA_VERIFICAR_SAVES_MAPEADOS') == '1'
+    
+    # Bytes aproximados por entidade (medidos com tracemalloc), para memoria_estimada
+    BYTES_COLONO = 400
+    BYTES_COLONO_VETORIZADO = 160  # ID e nome; as colunas são somadas à parte
+    BYTES_EDIFICIO = 500
+    BYTES_EVENTO = 150
+    
+    # Painéis da página do jogo, cada um com sua versão (ver versoes_paineis)
+    PAINEIS = ('recursos', 'estatisticas', 'colonos', 'edificios', 'eventos')
+    
+    # Campos de obter_estatisticas mostrados em cada painel: um campo só
+    # muda junto com a versão dos painéis que o mostram
+    CAMPOS_PAINEIS = {
+        'recursos': ('recursos',),
+        'estatisticas': ('colonos_vivos', 'colonos_mortos', 'saude_media', 'felicidade_media',
+                         'total_edificios', 'capacidade_habitacao'),
+        'colonos': ('colonos_vivos', 'colonos'),
+        'edificios': ('total_edificios', 'grupos_edificios', 'edificios'),
+        'eventos': ('eventos_recentes',)
+    }
+    
+    # Contador de versões do processo e a marca que distingue os números
+    # deste processo dos de outro (ver versao)
+    _VERSOES = count(1)
+    ORIGEM_VERSOES = secrets.token_hex(4)
+    
+    def __init__(self, nome: str, vetorizado: bool = False, empilhar: bool = False,
+                 semente: int = None, historico_dias: int = None):
         """
         Inicializa uma nova colônia.
         
         Args:
             nome: Nome da colônia
+            vetorizado: Se True, guarda os colonos em colunas NumPy
+                        (PopulacaoColonos) e processa o turno em lote
+            empilhar: Se True, edifícios idênticos (tipo, nível e status)
+                      são agrupados em um único objeto com quantidade
+            semente: Semente do gerador aleatório da colônia (aleatória se
+                     não especificada); a mesma semente reproduz a partida
+            historico_dias: Dias guardados para viagem no tempo (padrão:
+                            HistoricoDias.LIMITE_PADRAO, 1000 ou o de
+                            COLONIA_HISTORICO_DIAS; 0 desativa)
         """
         self.__nome = nome
         self.__dia = 1
+        self.__rng = GeradorAleatorio(semente)  # Fluxo aleatório próprio
         self.__colonos = []  # Composição - colônia contém colonos
+        self.__populacao = PopulacaoColonos() if vetorizado else None
+        if self.__populacao is not None:
+            self.__populacao._observador = self
+        self.__agregados = {'vivos': 0, 'mortos': 0, 'soma_saude': 0, 'soma_felicidade': 0}
         self.__edificios = []  # Composição - colônia contém edifícios
-        self.__eventos_historico = []  # Lista de eventos ocorridos
+        self.__empilhar = empilhar
+        self._indexar_edificios()
+        self.__eventos = HistoricoEventos()  # Eventos recentes + arquivo dos antigos
         self._bonus_eficiencia = 1.0  # Bonus temporário de eficiência
+        self._seq_diario = 0  # Última ação do diário incluída neste estado
+        self.__versao = self._nova_versao()
+        self.__versoes_paineis = dict.fromkeys(self.PAINEIS, self.__versao)
+        self.__historico = HistoricoDias(historico_dias)  # Estados dos dias anteriores
         
         # Inicializa recursos (Composição)
         self.__recursos = {
@@ -68,9 +145,21 @@ class Colonia:
         """Retorna o dia atual."""
         return self.__dia
     
+    @property
+    def rng(self) -> GeradorAleatorio:
+        """Retorna o gerador aleatório da colônia."""
+        return self.__rng
+    
+    @property
+    def vetorizado(self) -> bool:
+        """Indica se os colonos usam o armazenamento vetorizado."""
+        return self.__populacao is not None
+    
     @property
     def colonos(self) -> list:
         """Retorna lista de colonos (cópia para evitar modificação direta)."""
+        if self.__populacao is not None:
+            return self.__populacao.colonos()
         return self.__colonos.copy()
     
     @property
@@ -83,15 +172,146 @@ class Colonia:
         """Retorna dicionário de recursos."""
         return self.__recursos
     
+    @property
+    def eventos(self) -> HistoricoEventos:
+        """Retorna o histórico compacto de eventos."""
+        return self.__eventos
+    
     @property
     def eventos_historico(self) -> list:
-        """Retorna histórico de eventos."""
-        return self.__eventos_historico.copy()
+        """Retorna o histórico completo de eventos (registros compactos)."""
+        return self.__eventos.consultar()
+    
+    @property
+    def historico(self) -> HistoricoDias:
+        """Retorna o histórico de dias (viagem no tempo)."""
+        return self.__historico
+    
+    @property
+    def versao(self) -> int:
+        """
+        Retorna a versão da colônia, incrementada a cada alteração feita
+        pelos métodos da colônia (turno, construção, contratação...).
+        
+        As versões vêm de um contador do processo (não do relógio, nem do
+        save): cada colônia criada ou carregada e cada alteração recebe um
+        número maior que todos os anteriores, então a versão nunca se
+        repete entre duas instâncias da mesma colônia nem entre um jogo e o
+        seguinte. Entre processos os números se repetem; quem os expõe
+        (ETag, ?since=) inclui ORIGEM_VERSOES, sorteada a cada processo.
+        """
+        return self.__versao
+    
+    @property
+    def versoes_paineis(self) -> dict:
+        """
+        Retorna a versão de cada painel da página do jogo (PAINEIS): a
+        versão da colônia na última alteração que mudou o painel.
+        """
+        return dict(self.__versoes_paineis)
+    
+    @staticmethod
+    def _nova_versao() -> int:
+        """Próximo número do contador de versões do processo."""
+        return next(Colonia._VERSOES)
+    
+    def _alterada(self, *paineis: str):
+        """
+        Marca uma alteração (nova versão).
+        
+        Args:
+            paineis: Painéis afetados (padrão: todos)
+        """
+        self.__versao = self._nova_versao()
+        for painel in paineis or self.PAINEIS:
+            self.__versoes_paineis[painel] = self.__versao
     
     @property
     def total_colonos_vivos(self) -> int:
         """Retorna número de colonos vivos."""
-        return sum(1 for c in self.__colonos if c.esta_vivo)
+        return self.agregados['vivos']
+    
+    @property
+    def agregados(self) -> dict:
+        """
+        Retorna os agregados mantidos incrementalmente: colonos vivos e
+        mortos, somas de saúde e felicidade (dos vivos) e capacidade de
+        habitação. Leitura O(1).
+        """
+        if self.DEBUG_AGREGADOS:
+            self.verificar_agregados()
+        agregados = self.__agregados.copy()
+        agregados['capacidade_habitacao'] = self.capacidade_habitacao
+        return agregados
+    
+    def _calcular_agregados(self) -> dict:
+        """Calcula os agregados de colonos com uma varredura completa."""
+        if self.__populacao is not None:
+            vivos = self.__populacao.total_vivos()
+            soma_saude, soma_felicidade = self.__populacao.somas_vivos()
+            total = len(self.__populacao)
+        else:
+            colonos_vivos = [c for c in self.__colonos if c.esta_vivo]
+            vivos = len(colonos_vivos)
+            soma_saude = sum(c.saude for c in colonos_vivos)
+            soma_felicidade = sum(c.felicidade for c in colonos_vivos)
+            total = len(self.__colonos)
+        
+        return {
+            'vivos': vivos,
+            'mortos': total - vivos,
+            'soma_saude': soma_saude,
+            'soma_felicidade': soma_felicidade
+        }
+    
+    def _recalcular_agregados(self):
+        """Substitui os agregados pelo resultado de uma varredura completa."""
+        self.__agregados = self._calcular_agregados()
+    
+    def verificar_agregados(self):
+        """
+        Confere os agregados incrementais com uma varredura completa
+        (e a capacidade de habitação com os edifícios).
+        
+        Raises:
+            AssertionError: Se algum agregado estiver divergente
+        """
+        esperado = self._calcular_agregados()
+        esperado['capacidade_habitacao'] = sum(
+            e.capacidade * e.quantidade for e in self.__edificios
+            if e.__class__.__name__ == 'Habitacao' and e.status == 'ativo'
+        )
+        
+        atual = self.__agregados.copy()
+        atual['capacidade_habitacao'] = self.capacidade_habitacao
+        
+        divergentes = {
+            chave: (atual[chave], valor)
+            for chave, valor in esperado.items() if atual[chave] != valor
+        }
+        if divergentes:
+            raise AssertionError(f"Agregados divergentes (atual, esperado): {divergentes}")
+    
+    def _colono_alterado(self, saude_anterior: int, felicidade_anterior: int,
+                         saude: int, felicidade: int):
+        """
+        Chamado pelo colono quando sua saúde ou felicidade muda.
+        Atualiza os agregados em O(1).
+        """
+        agregados = self.__agregados
+        if saude_anterior > 0:
+            agregados['vivos'] -= 1
+            agregados['soma_saude'] -= saude_anterior
+            agregados['soma_felicidade'] -= felicidade_anterior
+        else:
+            agregados['mortos'] -= 1
+        
+        if saude > 0:
+            agregados['vivos'] += 1
+            agregados['soma_saude'] += saude
+            agregados['soma_felicidade'] += felicidade
+        else:
+            agregados['mortos'] += 1
     
     @property
     def total_colonos_mortos(self) -> int:
@@ -101,8 +321,107 @@ class Colonia:
     @property
     def capacidade_habitacao(self) -> int:
         """Retorna capacidade total de habitação."""
-        return sum(e.capacidade for e in self.__edificios 
-                  if e.__class__.__name__ == 'Habitacao' and e.status == 'ativo')
+        return self.__capacidade_edificios.get('Habitacao', {}).get('ativo', 0)
+    
+    @property
+    def total_edificios(self) -> int:
+        """Retorna o número de edifícios (contando os empilhados)."""
+        return sum(sum(status.values()) for status in self.__totais_edificios.values())
+    
+    @property
+    def empilhado(self) -> bool:
+        """Indica se edifícios idênticos são agrupados."""
+        return self.__empilhar
+    
+    @property
+    def totais_edificios(self) -> dict:
+        """Retorna o número de edifícios por tipo e por status."""
+        return {tipo: status.copy() for tipo, status in self.__totais_edificios.items()}
+    
+    def edificios_do_tipo(self, tipo: str) -> list:
+        """
+        Retorna os edifícios de um tipo, em ordem de construção.
+        
+        Args:
+            tipo: Nome da classe do edifício (ex.: 'Hospital')
+        """
+        return self.__edificios_por_tipo.get(tipo, []).copy()
+    
+    def _indexar_edificios(self):
+        """(Re)constrói os índices de edifícios por tipo e status."""
+        self.__edificios_por_tipo = {}  # tipo -> lista de edifícios
+        self.__totais_edificios = {}  # tipo -> {status: quantidade}
+        self.__capacidade_edificios = {}  # tipo -> {status: capacidade}
+        for edificio in self.__edificios:
+            self._indexar_edificio(edificio)
+    
+    def _indexar_edificio(self, edificio):
+        """Adiciona um edifício aos índices e passa a observá-lo."""
+        tipo = edificio.tipo
+        self.__edificios_por_tipo.setdefault(tipo, []).append(edificio)
+        self._contabilizar_edificio(tipo, edificio.status, edificio.capacidade,
+                                    edificio.quantidade)
+        edificio._observador = self
+    
+    def _contabilizar_edificio(self, tipo: str, status: str, capacidade: int, quantidade: int):
+        """Soma (quantidade > 0) ou subtrai (quantidade < 0) edifícios dos totais."""
+        totais = self.__totais_edificios.setdefault(tipo, {})
+        totais[status] = totais.get(status, 0) + quantidade
+        capacidades = self.__capacidade_edificios.setdefault(tipo, {})
+        capacidades[status] = capacidades.get(status, 0) + quantidade * capacidade
+    
+    def _edificio_alterado(self, edificio, status_anterior: str, capacidade_anterior: int,
+                           quantidade_anterior: int):
+        """
+        Chamado pelo edifício quando seu status, capacidade ou quantidade
+        muda. Mantém os totais por tipo e status atualizados.
+        """
+        tipo = edificio.tipo
+        self._contabilizar_edificio(tipo, status_anterior, capacidade_anterior, -quantidade_anterior)
+        self._contabilizar_edificio(tipo, edificio.status, edificio.capacidade, edificio.quantidade)
+    
+    def _edificio_desempilhado(self, original, novo):
+        """
+        Chamado quando parte de um grupo muda de status e é separada.
+        Junta o novo grupo a um idêntico, se houver, ou o adiciona.
+        """
+        self._adicionar_edificio(novo)
+    
+    def _adicionar_edificio(self, edificio):
+        """
+        Adiciona um edifício à colônia. Com empilhamento ativo, ele é
+        absorvido por um grupo idêntico já existente.
+        """
+        if self.__empilhar:
+            for existente in self.__edificios_por_tipo.get(edificio.tipo, []):
+                if existente is not edificio and existente.pode_empilhar(edificio):
+                    existente.empilhar(edificio)
+                    return
+        
+        self.__edificios.append(edificio)
+        self._indexar_edificio(edificio)
+    
+    def empilhar_edificios(self):
+        """
+        Ativa o empilhamento e agrupa os edifícios idênticos existentes.
+        Cada grupo fica na posição do seu primeiro edifício.
+        """
+        self.__empilhar = True
+        
+        grupos = {}
+        edificios = []
+        for edificio in self.__edificios:
+            chave = (edificio.tipo, edificio.nivel, edificio.status, edificio.capacidade)
+            if chave in grupos:
+                grupos[chave].empilhar(edificio)
+                edificio._observador = None
+            else:
+                grupos[chave] = edificio
+                edificios.append(edificio)
+        
+        self.__edificios = edificios
+        self._indexar_edificios()
+        self._alterada('edificios')
     
     def adicionar_colono(self, nome: str = None):
         """
@@ -113,16 +432,99 @@ class Colonia:
             nome: Nome do colono (gerado automaticamente se não fornecido)
         """
         if nome is None:
-            nome = f"Colono {len(self.__colonos) + 1}"
+            nome = f"Colono {self._total_colonos() + 1}"
         
         # Verifica capacidade de habitação
-        if self.total_colonos_vivos >= self.capacidade_habitacao and self.capacidade_habitacao > 0:
+        capacidade = self.capacidade_habitacao
+        if capacidade > 0 and self.total_colonos_vivos >= capacidade:
             return False, "Capacidade de habitação atingida! Construa mais habitações."
         
-        novo_colono = Colono(nome)
-        self.__colonos.append(novo_colono)
+        # Só a contratação aceita inicia um passo do fluxo aleatório: uma
+        # recusa não muda os sorteios seguintes
+        self.__rng.avancar()
+        profissao = self.__rng.choice(Colono.PROFISSOES)
+        if self.__populacao is not None:
+            self.__populacao.adicionar(nome, profissao)
+        else:
+            novo_colono = Colono(nome, profissao)
+            novo_colono._observador = self
+            self.__colonos.append(novo_colono)
+        
+        # Colono novo: saúde 100, felicidade 80
+        self.__agregados['vivos'] += 1
+        self.__agregados['soma_saude'] += 100
+        self.__agregados['soma_felicidade'] += 80
+        self._alterada('estatisticas', 'colonos')
         return True, f"{nome} se juntou à colônia!"
     
+    def memoria_estimada(self) -> int:
+        """
+        Estima a memória ocupada pela colônia (usada pelo cache de colônias).
+        
+        Returns:
+            Bytes aproximados
+        """
+        if self.__populacao is not None:
+            colonos = (self.__populacao.nbytes
+                       + len(self.__populacao) * self.BYTES_COLONO_VETORIZADO)
+        else:
+            colonos = len(self.__colonos) * self.BYTES_COLONO
+        return (colonos
+                + len(self.__edificios) * self.BYTES_EDIFICIO
+                + len(self.__eventos.registros()) * self.BYTES_EVENTO
+                + self.__historico.resumo()['bytes_em_memoria'])
+    
+    def _total_colonos(self) -> int:
+        """Retorna o número de colonos (vivos e mortos)."""
+        if self.__populacao is not None:
+            return len(self.__populacao)
+        return len(self.__colonos)
+    
+    def ajustar_colonos(self, saude: int = 0, felicidade: int = 0):
+        """
+        Soma valores à saúde e felicidade de todos os colonos vivos,
+        respeitando os limites dos setters de Colono.
+        
+        Args:
+            saude: Valor somado à saúde
+            felicidade: Valor somado à felicidade
+        """
+        self._alterada('estatisticas', 'colonos')
+        if self.__populacao is not None:
+            vivos = self.__populacao.indices_vivos()
+            self.__populacao.ajustar(vivos, saude=saude, felicidade=felicidade)
+            self._recalcular_agregados()
+            return
+        
+        for colono in self.__colonos:
+            if colono.esta_vivo:
+                if saude:
+                    colono.saude = colono.saude + saude
+                if felicidade:
+                    colono.felicidade = colono.felicidade + felicidade
+    
+    def vetorizar(self):
+        """
+        Converte os colonos atuais para o armazenamento vetorizado.
+        Útil para colônias salvas antes do motor vetorizado existir.
+        """
+        if self.__populacao is not None:
+            return
+        
+        populacao = PopulacaoColonos()
+        for colono in self.__colonos:
+            vista = populacao.colono(populacao.adicionar(colono.nome, colono.profissao))
+            vista._Entidade__id = colono.id
+            vista._Colono__saude = colono.saude
+            vista._Colono__felicidade = colono.felicidade
+            vista._Colono__produtividade = colono.produtividade
+            vista._Colono__dias_trabalhados = colono.dias_trabalhados
+        
+        populacao._observador = self
+        self.__populacao = populacao
+        self.__colonos = []
+        self._recalcular_agregados()
+    
     def construir_edificio(self, tipo: str) -> tuple:
         """
         Constrói um novo edifício.
@@ -152,19 +554,58 @@ class Colonia:
             self.__recursos[recurso].remover(quantidade)
         
         # Adiciona edifício
-        self.__edificios.append(novo_edificio)
+        self._adicionar_edificio(novo_edificio)
         self.__total_edificios_construidos += 1
+        self._alterada('recursos', 'estatisticas', 'edificios')
         
         return True, f"{novo_edificio.nome} construído com sucesso!"
     
-    def processar_turno(self) -> dict:
+    @staticmethod
+    def _aplicar_beneficios(populacao: PopulacaoColonos, vivos, lotes: list):
+        """
+        Aplica em lote os benefícios de hospitais e habitações no modo
+        vetorizado, na ordem em que os edifícios foram construídos.
+        
+        Args:
+            populacao: Colunas dos colonos
+            vivos: Índices dos colonos vivos no início da fase
+            lotes: Sequências de edifícios do mesmo tipo, em ordem:
+                   ['Hospital', atendimentos, 0] ou
+                   ['Habitacao', bônus da primeira, bônus total]
+        """
+        for tipo, primeiro, total in lotes:
+            if tipo == 'Hospital':
+                populacao.receber_cuidados_medicos(vivos[:3], primeiro)
+            else:
+                # O primeiro bônus pode subir valores negativos até 0; os demais
+                # são positivos, então basta um segundo ajuste com o restante
+                populacao.ajustar(vivos, felicidade=primeiro)
+                populacao.ajustar(vivos, felicidade=total - primeiro)
+    
+    def processar_turno(self, salvar: bool = True, instrumentar: bool = None) -> dict:
         """
         Processa um turno completo do jogo.
         Demonstra orquestração de múltiplos objetos (composição).
         
+        Args:
+            salvar: Se True, salva automaticamente ao final do turno
+            instrumentar: Se True, mede o tempo de cada fase e inclui as
+                          medições em relatorio['fases'] (padrão:
+                          Colonia.INSTRUMENTAR)
+        
         Returns:
             Dicionário com informações do turno
         """
+        if instrumentar is None:
+            instrumentar = self.INSTRUMENTAR
+        medidor = MedidorFases() if instrumentar else None
+        
+        # Guarda o estado ao fim do dia que está sendo encerrado
+        if self.__historico.ativo:
+            self.__historico.registrar(self.__dia, self.__getstate__())
+            if medidor:
+                medidor.marcar('historico', self._total_colonos() + len(self.__edificios))
+        
         relatorio = {
             'dia': self.__dia,
             'producao': {},
@@ -173,21 +614,28 @@ class Colonia:
             'alertas': []
         }
         
+        # Cada turno usa um novo passo do fluxo aleatório da colônia
+        rng = self.__rng
+        rng.avancar()
+        
         # 1. PRODUÇÃO DE ENERGIA (primeiro, pois outros precisam)
         energia_produzida = 0
-        for edificio in self.__edificios:
-            if edificio.__class__.__name__ == 'GeradorEnergia':
-                resultado = edificio.produzir()
-                energia_produzida += resultado.get('energia', 0)
+        geradores = self.__edificios_por_tipo.get('GeradorEnergia', [])
+        for edificio in geradores:
+            resultado = edificio.produzir()
+            energia_produzida += resultado.get('energia', 0)
         
         self.__recursos['energia'].adicionar(energia_produzida)
         relatorio['producao']['energia'] = energia_produzida
+        if medidor:
+            medidor.marcar('producao_energia', len(geradores))
         
         # 2. PRODUÇÃO DE RECURSOS (usando energia disponível)
         energia_disponivel = self.__recursos['energia'].quantidade
         
+        # Percorre em ordem de construção: a energia é distribuída nessa ordem
         for edificio in self.__edificios:
-            if edificio.__class__.__name__ == 'GeradorEnergia':
+            if isinstance(edificio, GeradorEnergia):
                 continue  # Já processado
             
             resultado = edificio.produzir(energia_disponivel)
@@ -203,83 +651,240 @@ class Colonia:
         
         # Reset bonus de eficiência
         self._bonus_eficiencia = 1.0
+        if medidor:
+            medidor.marcar('producao_recursos', len(self.__edificios) - len(geradores))
+        
+        populacao = self.__populacao
         
         # 3. TRABALHO DOS COLONOS
-        for colono in self.__colonos:
-            if colono.esta_vivo:
-                colono.trabalhar()
+        if populacao is not None:
+            populacao.trabalhar(rng)
+        else:
+            trabalhadores = [c for c in self.__colonos if c.esta_vivo]
+            desgaste_saude = rng.lote_inteiros(1, 3, len(trabalhadores))
+            desgaste_felicidade = rng.lote_inteiros(1, 2, len(trabalhadores))
+            for colono, saude, felicidade in zip(trabalhadores, desgaste_saude, desgaste_felicidade):
+                colono.trabalhar(desgaste=(int(saude), int(felicidade)))
+        if medidor:
+            medidor.marcar('trabalho', self.__agregados['vivos'])
         
         # 4. CONSUMO DE RECURSOS PELOS COLONOS
         consumo_total = {'comida': 0, 'agua': 0}
-        colonos_vivos = [c for c in self.__colonos if c.esta_vivo]
         
-        for colono in colonos_vivos:
-            comida_disp = self.__recursos['comida'].quantidade
-            agua_disp = self.__recursos['agua'].quantidade
-            
-            comida_cons, agua_cons = colono.consumir_recursos(comida_disp, agua_disp)
+        if populacao is not None:
+            vivos = populacao.indices_vivos()
+            comida_cons, agua_cons = populacao.consumir_recursos(
+                vivos,
+                self.__recursos['comida'].quantidade,
+                self.__recursos['agua'].quantidade
+            )
             
             self.__recursos['comida'].remover(comida_cons)
             self.__recursos['agua'].remover(agua_cons)
             
             consumo_total['comida'] += comida_cons
             consumo_total['agua'] += agua_cons
+        else:
+            colonos_vivos = [c for c in self.__colonos if c.esta_vivo]
+            
+            for colono in colonos_vivos:
+                comida_disp = self.__recursos['comida'].quantidade
+                agua_disp = self.__recursos['agua'].quantidade
+                
+                comida_cons, agua_cons = colono.consumir_recursos(comida_disp, agua_disp)
+                
+                self.__recursos['comida'].remover(comida_cons)
+                self.__recursos['agua'].remover(agua_cons)
+                
+                consumo_total['comida'] += comida_cons
+                consumo_total['agua'] += agua_cons
         
         relatorio['consumo'] = consumo_total
+        if medidor:
+            medidor.marcar('consumo', len(vivos) if populacao is not None else len(colonos_vivos))
         
-        # 5. BENEFÍCIOS DE EDIFÍCIOS ESPECIAIS
-        for edificio in self.__edificios:
-            if edificio.__class__.__name__ == 'Hospital':
-                resultado = edificio.produzir(energia_disponivel)
-                bonus_saude = resultado.get('bonus_saude', 0)
-                if bonus_saude > 0:
-                    for colono in colonos_vivos[:3]:  # Trata até 3 colonos
-                        colono.receber_cuidados_medicos()
-            
-            elif edificio.__class__.__name__ == 'Habitacao':
-                resultado = edificio.produzir(energia_disponivel)
+        # 5. BENEFÍCIOS DE EDIFÍCIOS ESPECIAIS (em ordem de construção)
+        # A ordem importa: o hospital não limita a felicidade em 0 e a
+        # habitação sim. Com os dois tipos, percorre os edifícios; com um só,
+        # basta o índice do tipo. No modo vetorizado, hospitais e habitações
+        # seguidos são aplicados em lote (ver _aplicar_beneficios)
+        hospitais = self.__edificios_por_tipo.get('Hospital', [])
+        habitacoes = self.__edificios_por_tipo.get('Habitacao', [])
+        if hospitais and habitacoes:
+            especiais = [e for e in self.__edificios if e.tipo in ('Hospital', 'Habitacao')]
+        else:
+            especiais = hospitais or habitacoes
+        
+        lotes = []  # [tipo, atendimentos ou bônus da primeira habitação, bônus total]
+        for edificio in especiais:
+            resultado = edificio.produzir(energia_disponivel)
+            if edificio.tipo == 'Hospital':
+                if resultado.get('bonus_saude', 0) <= 0:
+                    continue
+                if populacao is not None:
+                    if not lotes or lotes[-1][0] != 'Hospital':
+                        lotes.append(['Hospital', 0, 0])
+                    lotes[-1][1] += edificio.quantidade
+                else:
+                    for _ in range(edificio.quantidade):
+                        for colono in colonos_vivos[:3]:  # Trata até 3 colonos
+                            colono.receber_cuidados_medicos()
+            else:
                 bonus_felicidade = resultado.get('bonus_felicidade', 0)
-                if bonus_felicidade > 0:
-                    for colono in colonos_vivos:
-                        colono.felicidade = colono.felicidade + bonus_felicidade
+                if bonus_felicidade <= 0:
+                    continue
+                if populacao is not None:
+                    if not lotes or lotes[-1][0] != 'Habitacao':
+                        lotes.append(['Habitacao', bonus_felicidade, 0])
+                    lotes[-1][2] += bonus_felicidade * edificio.quantidade
+                else:
+                    for _ in range(edificio.quantidade):
+                        for colono in colonos_vivos:
+                            colono.felicidade = colono.felicidade + bonus_felicidade
+        
+        if populacao is not None:
+            self._aplicar_beneficios(populacao, vivos, lotes)
+        if medidor:
+            medidor.marcar('beneficios', len(especiais))
         
         # 6. ATUALIZAÇÃO DE ENTIDADES
-        for colono in self.__colonos:
-            colono.atualizar()
+        if populacao is not None:
+            populacao.atualizar(rng)
+        else:
+            colonos_vivos = [c for c in self.__colonos if c.esta_vivo]
+            sorteios = rng.lote_uniforme(len(colonos_vivos))
+            for colono, sorteio in zip(colonos_vivos, sorteios):
+                colono.atualizar(sorteio=float(sorteio))
         
-        for edificio in self.__edificios:
-            edificio.atualizar()
+        # Só edifícios em manutenção mudam ao atualizar
+        atualizar_edificios = any(
+            totais.get('manutencao', 0) for totais in self.__totais_edificios.values()
+        )
+        if atualizar_edificios:
+            for edificio in self.__edificios:
+                edificio.atualizar(rng)
+        
+        # No modo vetorizado os agregados são refeitos em lote
+        if populacao is not None:
+            self._recalcular_agregados()
+        if medidor:
+            medidor.marcar('atualizacao', self.__agregados['vivos']
+                           + (len(self.__edificios) if atualizar_edificios else 0))
         
         # 7. VERIFICA MORTES
-        mortes = sum(1 for c in self.__colonos if not c.esta_vivo)
+        mortes = self.__agregados['mortos']
+        novos_mortos = 0
         if mortes > self.__total_colonos_mortos:
             novos_mortos = mortes - self.__total_colonos_mortos
             self.__total_colonos_mortos = mortes
             relatorio['alertas'].append(f"⚠️ {novos_mortos} colono(s) morreram!")
+        if medidor:
+            medidor.marcar('mortes', novos_mortos)
         
         # 8. EVENTO ALEATÓRIO
-        evento = EventoAleatorio.gerar_evento_aleatorio()
+        evento = EventoAleatorio.gerar_evento_aleatorio(rng)
         if evento:
             mensagem_evento = evento.aplicar(self)
-            self.__eventos_historico.append(evento)
+            self.__eventos.registrar(self.__dia, evento)
             relatorio['evento'] = {
                 'nome': evento.nome,
                 'descricao': mensagem_evento
             }
+        if medidor:
+            medidor.marcar('evento', 1 if evento else 0)
         
         # 9. ALERTAS DE RECURSOS
         for nome, recurso in self.__recursos.items():
             if recurso.percentual() < 20:
                 relatorio['alertas'].append(f"⚠️ {nome.capitalize()} está baixo!")
+        if medidor:
+            medidor.marcar('alertas', len(self.__recursos))
         
         # 10. AVANÇA DIA
         self.__dia += 1
+        self._alterada()
+        if medidor:
+            medidor.marcar('avanco_dia')
         
         # Salva automaticamente
-        self.salvar()
+        if salvar:
+            self.salvar()
+        
+        if medidor:
+            medidor.marcar('salvamento', 1 if salvar else 0)
+            relatorio['fases'] = medidor.fases
+            histograma_fases.registrar(medidor.fases)
         
         return relatorio
     
+    def processar_turnos(self, n: int, caminho: str = None, salvar: bool = True) -> dict:
+        """
+        Avança vários dias de uma vez, em memória, salvando só no final.
+        Para antes se todos os colonos morrerem.
+        
+        Args:
+            n: Número de turnos a processar
+            caminho: Caminho do save (usa padrão se não fornecido)
+            salvar: Se False, não salva ao final (ex.: ação registrada
+                    no diário de ações)
+            
+        Returns:
+            Dicionário com o resumo dos turnos processados
+        """
+        if n < 1:
+            raise ValueError("Número de turnos deve ser maior que 0")
+        
+        resumo = {
+            'dia_inicial': self.__dia,
+            'dia_final': self.__dia,
+            'turnos': 0,
+            'producao': {},
+            'consumo': {},
+            'eventos': [],
+            'mortes': 0,
+            'primeiro_alerta': None
+        }
+        mortos_inicio = self.__total_colonos_mortos
+        
+        for _ in range(n):
+            relatorio = self.processar_turno(salvar=False)
+            resumo['turnos'] += 1
+            
+            for chave in ('producao', 'consumo'):
+                for recurso, quantidade in relatorio[chave].items():
+                    resumo[chave][recurso] = resumo[chave].get(recurso, 0) + quantidade
+            
+            if relatorio['evento']:
+                resumo['eventos'].append({'dia': relatorio['dia'], **relatorio['evento']})
+            
+            if relatorio['alertas'] and resumo['primeiro_alerta'] is None:
+                resumo['primeiro_alerta'] = {
+                    'dia': relatorio['dia'],
+                    'alertas': relatorio['alertas']
+                }
+            
+            # Tempos das fases somados (só com instrumentação ativa)
+            for fase, medicao in relatorio.get('fases', {}).items():
+                total = resumo.setdefault('fases', {}).setdefault(fase, {'ms': 0, 'entidades': 0})
+                total['ms'] += medicao['ms']
+                total['entidades'] += medicao['entidades']
+            
+            if self.total_colonos_vivos == 0:
+                break
+        
+        resumo['dia_final'] = self.__dia
+        resumo['mortes'] = self.__total_colonos_mortos - mortos_inicio
+        for chave in ('producao', 'consumo'):
+            resumo[chave] = {r: round(q, 2) for r, q in resumo[chave].items()}
+        for total in resumo.get('fases', {}).values():
+            total['ms'] = round(total['ms'], 4)
+        
+        # Persiste uma única vez
+        if salvar:
+            self.salvar(caminho)
+        
+        return resumo
+    
     def verificar_condicoes(self) -> dict:
         """
         Verifica condições de vitória e derrota.
@@ -287,7 +892,8 @@ class Colonia:
         Returns:
             Dicionário com status do jogo
         """
-        colonos_vivos = self.total_colonos_vivos
+        agregados = self.agregados
+        colonos_vivos = agregados['vivos']
         
         # Derrota: todos os colonos morreram
         if colonos_vivos == 0:
@@ -298,7 +904,7 @@ class Colonia:
         
         # Vitória: 20+ colonos com felicidade média > 70
         if colonos_vivos >= 20:
-            felicidade_media = sum(c.felicidade for c in self.__colonos if c.esta_vivo) / colonos_vivos
+            felicidade_media = agregados['soma_felicidade'] / colonos_vivos
             if felicidade_media > 70:
                 return {
                     'status': 'vitoria',
@@ -307,61 +913,301 @@ class Colonia:
         
         return {'status': 'jogando', 'mensagem': ''}
     
-    def obter_estatisticas(self) -> dict:
+    def obter_estatisticas(self, expandir_pilhas: bool = False,
+                           limite_colonos: int = None, limite_edificios: int = None,
+                           resumo: bool = False, paineis: list = None) -> dict:
         """
         Retorna estatísticas completas da colônia.
         
+        Args:
+            expandir_pilhas: Se True, edifícios empilhados aparecem como
+                             uma linha por edifício
+            limite_colonos: Inclui só os primeiros colonos vivos (o total
+                            continua em 'colonos_vivos'); em colônias
+                            vetorizadas, só esses viram objetos
+            limite_edificios: Inclui só os primeiros grupos de edifícios (o
+                              total de grupos continua em 'grupos_edificios')
+            resumo: Se True, sem as listas de colonos e edifícios (ver
+                    pagina_colonos e pagina_edificios)
+            paineis: Se informado, só nome, dia e os campos desses painéis
+                     (CAMPOS_PAINEIS); as listas dos demais não são montadas
+        
         Returns:
             Dicionário com todas as estatísticas
         """
-        colonos_vivos = [c for c in self.__colonos if c.esta_vivo]
+        if paineis is None:
+            campos = None
+        else:
+            campos = {'nome', 'dia'}
+            for painel in paineis:
+                campos.update(self.CAMPOS_PAINEIS[painel])
+        
+        def incluir(campo):
+            return campos is None or campo in campos
+        
+        agregados = self.agregados
+        vivos = agregados['vivos']
+        if resumo:
+            limite_colonos = limite_edificios = 0
+        if not incluir('colonos'):
+            colonos_vivos = []
+        elif limite_colonos is None:
+            colonos_vivos = [c for c in self.colonos if c.esta_vivo]
+        elif self.__populacao is not None:
+            colonos_vivos = [self.__populacao.colono(int(i))
+                             for i in self.__populacao.indices_vivos()[:limite_colonos]]
+        else:
+            colonos_vivos = list(islice((c for c in self.__colonos if c.esta_vivo),
+                                        limite_colonos))
+        
+        grupos = self.__edificios if limite_edificios is None else self.__edificios[:limite_edificios]
+        if not incluir('edificios'):
+            edificios = []
+        elif expandir_pilhas:
+            edificios = [linha for e in grupos for linha in e.expandir()]
+        else:
+            edificios = [e.to_dict() for e in grupos]
         
-        if colonos_vivos:
-            saude_media = sum(c.saude for c in colonos_vivos) / len(colonos_vivos)
-            felicidade_media = sum(c.felicidade for c in colonos_vivos) / len(colonos_vivos)
+        if vivos:
+            saude_media = agregados['soma_saude'] / vivos
+            felicidade_media = agregados['soma_felicidade'] / vivos
         else:
             saude_media = 0
             felicidade_media = 0
         
-        return {
+        estatisticas = {
             'nome': self.__nome,
             'dia': self.__dia,
-            'colonos_vivos': len(colonos_vivos),
+            'colonos_vivos': vivos,
             'colonos_mortos': self.__total_colonos_mortos,
             'saude_media': round(saude_media, 1),
             'felicidade_media': round(felicidade_media, 1),
-            'total_edificios': len(self.__edificios),
-            'capacidade_habitacao': self.capacidade_habitacao,
+            'total_edificios': self.total_edificios,
+            'grupos_edificios': len(self.__edificios),
+            'capacidade_habitacao': agregados['capacidade_habitacao'],
             'recursos': {nome: rec.to_dict() for nome, rec in self.__recursos.items()},
-            'edificios': [e.to_dict() for e in self.__edificios],
+            'edificios': edificios,
             'colonos': [c.to_dict() for c in colonos_vivos],
-            'eventos_recentes': [e.to_dict() for e in self.__eventos_historico[-5:]]
+            'eventos_recentes': ([r.to_dict() for r in self.__eventos.ultimos(5)]
+                                 if incluir('eventos_recentes') else [])
         }
+        if resumo:
+            del estatisticas['edificios'], estatisticas['colonos']
+        if campos is not None:
+            estatisticas = {campo: valor for campo, valor in estatisticas.items() if campo in campos}
+        return estatisticas
+    
+    def pagina_colonos(self, inicio: int = 0, limite: int = 100, vivos: bool = True,
+                       profissao: str = None) -> tuple:
+        """
+        Colonos a partir da posição `inicio` (ordem de chegada à colônia,
+        que não muda), com filtros. Só os colonos da página viram
+        dicionários.
+        
+        Args:
+            inicio: Posição do primeiro colono considerado
+            limite: Máximo de colonos na página
+            vivos: True só vivos, False só mortos, None todos
+            profissao: Só colonos desta profissão (None: todas)
+            
+        Returns:
+            Tupla (lista de dicionários, posição do próximo colono que passa
+            nos filtros ou None se não há mais)
+            
+        Raises:
+            ValueError: Se a profissão não existir
+        """
+        if profissao is not None and profissao not in Colono.PROFISSOES:
+            raise ValueError(f"Profissão inválida. Escolha entre: {', '.join(Colono.PROFISSOES)}")
+        inicio = max(0, inicio)
+        
+        if self.__populacao is not None:
+            indices = self.__populacao.indices_filtrados(inicio, vivos=vivos, profissao=profissao)
+            itens = [self.__populacao.colono(int(i)).to_dict() for i in indices[:limite]]
+            return itens, (int(indices[limite]) if len(indices) > limite else None)
+        
+        posicoes = (i for i in range(inicio, len(self.__colonos))
+                    if (vivos is None or self.__colonos[i].esta_vivo == vivos)
+                    and (profissao is None or self.__colonos[i].profissao == profissao))
+        encontrados = list(islice(posicoes, limite + 1))
+        itens = [self.__colonos[i].to_dict() for i in encontrados[:limite]]
+        return itens, (encontrados[limite] if len(encontrados) > limite else None)
+    
+    def pagina_edificios(self, inicio: int = 0, limite: int = 100, tipo: str = None,
+                         status: str = None) -> tuple:
+        """
+        Grupos de edifícios a partir da posição `inicio` (ordem de
+        construção), com filtros.
+        
+        Args:
+            inicio: Posição do primeiro grupo considerado
+            limite: Máximo de grupos na página
+            tipo: Só edifícios deste tipo (ver TIPOS_EDIFICIOS)
+            status: Só edifícios com este status ('ativo', 'inativo', 'manutencao')
+            
+        Returns:
+            Tupla (lista de dicionários, posição do próximo grupo que passa
+            nos filtros ou None se não há mais)
+            
+        Raises:
+            ValueError: Se o tipo não existir
+        """
+        if tipo is not None and tipo not in TIPOS_EDIFICIOS:
+            raise ValueError(f"Tipo de edifício inválido: {tipo}")
+        inicio = max(0, inicio)
+        
+        posicoes = (i for i in range(inicio, len(self.__edificios))
+                    if (tipo is None or self.__edificios[i].tipo == tipo)
+                    and (status is None or self.__edificios[i].status == status))
+        encontrados = list(islice(posicoes, limite + 1))
+        itens = [self.__edificios[i].to_dict() for i in encontrados[:limite]]
+        return itens, (encontrados[limite] if len(encontrados) > limite else None)
+    
+    def colonia_no_dia(self, dia: int) -> 'Colonia':
+        """
+        Reconstrói a colônia como estava ao fim de um dia do histórico,
+        para inspeção (a colônia atual não muda).
+        
+        Args:
+            dia: Dia do histórico
+            
+        Returns:
+            Nova instância de Colonia, sem histórico próprio
+        """
+        estado = self.__historico.estado_em(dia)
+        estado['_Colonia__historico'] = HistoricoDias(0)
+        colonia = Colonia.__new__(Colonia)
+        colonia.__setstate__(estado)
+        return colonia
+    
+    def voltar_para_dia(self, dia: int) -> tuple:
+        """
+        Volta a colônia para o fim de um dia do histórico. Os dias
+        seguintes saem do histórico (a partida segue uma nova linha do
+        tempo a partir dali).
+        
+        Args:
+            dia: Dia do histórico
+            
+        Returns:
+            Tupla (sucesso: bool, mensagem: str)
+        """
+        try:
+            estado = self.__historico.estado_em(dia)
+        except ValueError as e:
+            return False, str(e)
+        
+        self.__historico.descartar_a_partir(dia)
+        estado['_Colonia__historico'] = self.__historico
+        if self.__eventos.arquivo is not None:
+            # Corta do arquivo os eventos posteriores ao dia
+            estado['_Colonia__eventos'].vincular(self.__eventos.arquivo)
+        estado['_seq_diario'] = self._seq_diario  # O diário de ações continua em frente
+        self.__setstate__(estado)
+        self._alterada()
+        return True, f"Colônia de volta ao dia {dia}"
+    
+    def serializar(self, formato: str = None, compressao: str = None) -> bytes:
+        """
+        Retorna o conteúdo do arquivo de save da colônia.
+        
+        Args:
+            formato: 'binario' ou 'pickle' (padrão: FORMATO_SAVE)
+            compressao: Compressão do formato binário (padrão: COMPRESSAO_SAVE)
+            
+        Returns:
+            Bytes do save
+        """
+        formato = formato or self.FORMATO_SAVE
+        if formato == 'pickle':
+            return pickle.dumps(self)
+        if formato != 'binario':
+            raise ValueError(f"Formato de save inválido: {formato}")
+        
+        compressao = compressao or self.COMPRESSAO_SAVE
+        if compressao == 'auto':
+            mapeavel = (self.__populacao is not None
+                        and len(self.__populacao) >= self.COLONOS_SAVE_MAPEADO)
+            compressao = 'nenhuma' if mapeavel else 'zlib'
+        return codificar_estado(self.__getstate__(), compressao)
+    
+    @staticmethod
+    def desserializar(dados, verificar: bool = True) -> 'Colonia':
+        """
+        Reconstrói a colônia a partir do conteúdo de um save.
+        O formato é detectado pelos bytes mágicos: saves antigos em
+        pickle continuam sendo aceitos.
+        
+        Args:
+            dados: Bytes do save (binário ou pickle) ou o mmap do arquivo
+                   (ver formato_binario.decodificar_estado)
+            verificar: Se True, confere o CRC de um save binário
+            
+        Returns:
+            Instância de Colonia
+        """
+        if not eh_formato_binario(dados):
+            return pickle.loads(dados)
+        
+        colonia = Colonia.__new__(Colonia)
+        colonia.__setstate__(decodificar_estado(dados, verificar))
+        return colonia
+    
+    def preparar_salvamento(self, caminho: str):
+        """
+        Captura o estado atual para o save e retorna a função que o grava.
+        Usado pelo SalvadorBackground para gravar fora da trava da colônia.
+        
+        Args:
+            caminho: Caminho do arquivo ou endereço 'sqlite:<banco>#<chave>'
+            
+        Returns:
+            Função sem argumentos que grava o save
+        """
+        # Eventos que saíram do anel e dias do histórico vão para os seus
+        # arquivos antes do snapshot (os do primeiro save ou carregamento)
+        if self.__eventos.arquivo is None:
+            self.__eventos.vincular(caminho_auxiliar(caminho, '.eventos'))
+        self.__eventos.arquivar_pendentes()
+        if self.__historico.arquivo is None:
+            self.__historico.vincular(caminho_auxiliar(caminho, '.historico'))
+        self.__historico.arquivar_pendentes()
+        
+        endereco = separar_endereco(caminho)
+        if endereco is not None:
+            banco, chave = endereco
+            return ArmazenamentoSQLite.abrir(banco).preparar_salvamento(self.__getstate__(), chave)
+        
+        dados = self.serializar()
+        return lambda: escrever_atomico(caminho, dados)
     
     def salvar(self, caminho: str = None):
         """
-        Salva o estado atual da colônia em um arquivo pickle.
+        Salva o estado atual da colônia em arquivo (formato FORMATO_SAVE)
+        ou, com um endereço 'sqlite:<banco>#<chave>', no banco SQLite
+        (gravando só as linhas alteradas).
         Demonstra persistência de dados.
         
+        A gravação é atômica: um save interrompido no meio não
+        corrompe o anterior.
+        
         Args:
-            caminho: Caminho do arquivo (usa padrão se não fornecido)
+            caminho: Caminho do arquivo ou endereço (usa padrão se não fornecido)
         """
         if caminho is None:
             caminho = 'saves/colonia_save.pkl'
         
-        os.makedirs(os.path.dirname(caminho), exist_ok=True)
-        
-        with open(caminho, 'wb') as f:
-            pickle.dump(self, f)
+        self.preparar_salvamento(caminho)()
     
     @staticmethod
     def carregar(caminho: str = None) -> 'Colonia':
         """
-        Carrega o estado da colônia do arquivo pickle.
+        Carrega o estado da colônia do arquivo (binário ou pickle) ou do
+        banco SQLite.
         Demonstra persistência de dados.
         
         Args:
-            caminho: Caminho do arquivo (usa padrão se não fornecido)
+            caminho: Caminho do arquivo ou endereço (usa padrão se não fornecido)
             
         Returns:
             Instância de Colonia carregada
@@ -369,11 +1215,111 @@ class Colonia:
         if caminho is None:
             caminho = 'saves/colonia_save.pkl'
         
-        if not os.path.exists(caminho):
-            return None
+        endereco = separar_endereco(caminho)
+        if endereco is not None:
+            banco, chave = endereco
+            estado = ArmazenamentoSQLite.abrir(banco).carregar_estado(chave)
+            if estado is None:
+                return None
+            colonia = Colonia.__new__(Colonia)
+            colonia.__setstate__(estado)
+        else:
+            if not os.path.exists(caminho):
+                return None
+            mapeado = False
+            with open(caminho, 'rb') as f:
+                if Colonia.MAPEAR_SAVES and os.fstat(f.fileno()).st_size > 0:
+                    # Cópia privada: o turno altera as páginas na memória e o
+                    # arquivo só muda no próximo save (atômico). Gravar de
+                    # volta no lugar (ACCESS_WRITE) deixaria o kernel levar ao
+                    # disco páginas de um turno pela metade, sem relação com
+                    # o diário de ações, e só as colunas de largura fixa dos
+                    # colonos caberiam no lugar
+                    dados = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+                    mapeado = True
+                else:
+                    dados = f.read()
+            # O CRC leria todas as páginas do save mapeado
+            colonia = Colonia.desserializar(
+                dados, verificar=not mapeado or Colonia.VERIFICAR_SAVES_MAPEADOS)
+        
+        colonia.eventos.vincular(caminho_auxiliar(caminho, '.eventos'))
+        colonia.historico.vincular(caminho_auxiliar(caminho, '.historico'))
+        return colonia
+    
+    @staticmethod
+    def existe_save(caminho: str) -> bool:
+        """
+        Verifica se há um save no caminho (arquivo ou endereço SQLite).
         
-        with open(caminho, 'rb') as f:
-            return pickle.load(f)
+        Args:
+            caminho: Caminho do arquivo ou endereço
+        """
+        endereco = separar_endereco(caminho)
+        if endereco is not None:
+            banco, chave = endereco
+            return ArmazenamentoSQLite.abrir(banco).existe(chave)
+        return os.path.exists(caminho)
+    
+    @staticmethod
+    def excluir_save(caminho: str) -> bool:
+        """
+        Remove o save do caminho (arquivo ou endereço SQLite) e os
+        arquivos de eventos e do histórico.
+        
+        Args:
+            caminho: Caminho do arquivo ou endereço
+            
+        Returns:
+            True se havia um save
+        """
+        for extensao in ('.eventos', '.historico'):
+            arquivo = caminho_auxiliar(caminho, extensao)
+            if os.path.exists(arquivo):
+                os.remove(arquivo)
+        
+        if not Colonia.existe_save(caminho):
+            return False
+        endereco = separar_endereco(caminho)
+        if endereco is not None:
+            banco, chave = endereco
+            ArmazenamentoSQLite.abrir(banco).excluir(chave)
+        else:
+            os.remove(caminho)
+        return True
+    
+    def __getstate__(self) -> dict:
+        """Estado salvo: os índices de edifícios e a versão são refeitos ao carregar."""
+        estado = self.__dict__.copy()
+        for chave in ('_Colonia__edificios_por_tipo', '_Colonia__totais_edificios',
+                      '_Colonia__capacidade_edificios', '_Colonia__versao',
+                      '_Colonia__versoes_paineis'):
+            estado.pop(chave, None)
+        return estado
+    
+    def __setstate__(self, estado: dict):
+        """Restaura a colônia, completando atributos de saves antigos."""
+        estado.setdefault('_Colonia__populacao', None)
+        estado.setdefault('_Colonia__rng', GeradorAleatorio())
+        estado.setdefault('_Colonia__empilhar', False)
+        estado.setdefault('_seq_diario', 0)
+        estado.setdefault('_Colonia__historico', HistoricoDias())
+        if '_Colonia__eventos_historico' in estado:
+            # Saves antigos: lista de EventoAleatorio completos
+            estado['_Colonia__eventos'] = HistoricoEventos.de_eventos(
+                estado.pop('_Colonia__eventos_historico')
+            )
+        self.__dict__.update(estado)
+        self.__versao = self._nova_versao()
+        self.__versoes_paineis = dict.fromkeys(self.PAINEIS, self.__versao)
+        self._indexar_edificios()
+        
+        # Reconecta os observadores e refaz os agregados
+        if self.__populacao is not None:
+            self.__populacao._observador = self
+        for colono in self.__colonos:
+            colono._observador = self
+        self._recalcular_agregados()
     
     def __str__(self) -> str:
         """Representação em string da colônia."""
@@ -17,6 +17,15 @@ class Colono(Entidade):
     CONSUMO_COMIDA = 5
     CONSUMO_AGUA = 3
     
+    # Bonus de produtividade por profissão
+    BONUS_PROFISSAO = {
+        'Agricultor': 1.2,
+        'Engenheiro': 1.3,
+        'Cientista': 1.1,
+        'Minerador': 1.25,
+        'Médico': 1.15
+    }
+    
     def __init__(self, nome: str, profissao: str = None):
         """
         Inicializa um colono.
@@ -33,6 +42,7 @@ class Colono(Entidade):
         self.__profissao = profissao or random.choice(self.PROFISSOES)
         self.__produtividade = 1.0
         self.__dias_trabalhados = 0
+        self._observador = None  # Colônia notificada sobre mudanças
     
     # Getters
     @property
@@ -69,12 +79,12 @@ class Colono(Entidade):
     @saude.setter
     def saude(self, valor: int):
         """Define a saúde do colono (0-100)."""
-        self.__saude = max(0, min(100, valor))
+        self._alterar(max(0, min(100, valor)), self.__felicidade)
     
     @felicidade.setter
     def felicidade(self, valor: int):
         """Define a felicidade do colono (0-100)."""
-        self.__felicidade = max(0, min(100, valor))
+        self._alterar(self.__saude, max(0, min(100, valor)))
     
     @profissao.setter
     def profissao(self, valor: str):
@@ -84,11 +94,34 @@ class Colono(Entidade):
         self.__profissao = valor
         self.descricao = f"Colono trabalhando como {valor}"
     
-    def trabalhar(self) -> float:
+    def _alterar(self, saude: int, felicidade: int):
+        """
+        Define saúde e felicidade (sem aplicar limites) e avisa o
+        observador, que mantém os agregados da colônia.
+        
+        Args:
+            saude: Nova saúde
+            felicidade: Nova felicidade
+        """
+        saude_anterior = self.__saude
+        felicidade_anterior = self.__felicidade
+        self.__saude = saude
+        self.__felicidade = felicidade
+        
+        observador = getattr(self, '_observador', None)
+        if observador is not None:
+            observador._colono_alterado(saude_anterior, felicidade_anterior, saude, felicidade)
+    
+    def trabalhar(self, rng=None, desgaste: tuple = None) -> float:
         """
         Colono trabalha e retorna sua produtividade.
         Demonstra polimorfismo - comportamento específico da subclasse.
         
+        Args:
+            rng: Gerador aleatório (usa o módulo random se não fornecido)
+            desgaste: Tupla (saude, felicidade) já sorteada em lote;
+                      se não fornecida, é sorteada com rng
+        
         Returns:
             Valor de produtividade do trabalho
         """
@@ -101,30 +134,31 @@ class Colono(Entidade):
         self.__produtividade = (self.__saude / 100) * (self.__felicidade / 100) * 1.5
         
         # Bonus por profissão
-        bonus_profissao = {
-            'Agricultor': 1.2,
-            'Engenheiro': 1.3,
-            'Cientista': 1.1,
-            'Minerador': 1.25,
-            'Médico': 1.15
-        }
-        self.__produtividade *= bonus_profissao.get(self.__profissao, 1.0)
+        self.__produtividade *= self.BONUS_PROFISSAO.get(self.__profissao, 1.0)
         
         # Trabalho causa pequeno desgaste
-        self.__saude -= random.randint(1, 3)
-        self.__felicidade -= random.randint(1, 2)
+        if desgaste is None:
+            rng = rng or random
+            desgaste = (rng.randint(1, 3), rng.randint(1, 2))
+        desgaste_saude, desgaste_felicidade = desgaste
+        self._alterar(self.__saude - desgaste_saude, self.__felicidade - desgaste_felicidade)
         
         return self.__produtividade
     
-    def descansar(self):
+    def descansar(self, rng=None):
         """
         Colono descansa e recupera saúde e felicidade.
+        
+        Args:
+            rng: Gerador aleatório (usa o módulo random se não fornecido)
         """
         if not self.esta_vivo:
             return
         
-        self.__saude = min(100, self.__saude + random.randint(5, 10))
-        self.__felicidade = min(100, self.__felicidade + random.randint(3, 7))
+        rng = rng or random
+        saude = min(100, self.__saude + rng.randint(5, 10))
+        felicidade = min(100, self.__felicidade + rng.randint(3, 7))
+        self._alterar(saude, felicidade)
     
     def consumir_recursos(self, comida_disponivel: float, agua_disponivel: float) -> tuple:
         """
@@ -145,32 +179,36 @@ class Colono(Entidade):
         
         # Penalidades por falta de recursos
         if comida_consumida < self.CONSUMO_COMIDA:
-            self.__saude -= 10
-            self.__felicidade -= 15
+            self._alterar(self.__saude - 10, self.__felicidade - 15)
         
         if agua_consumida < self.CONSUMO_AGUA:
-            self.__saude -= 15
-            self.__felicidade -= 10
+            self._alterar(self.__saude - 15, self.__felicidade - 10)
         
         return (comida_consumida, agua_consumida)
     
     def receber_cuidados_medicos(self):
         """Colono recebe cuidados médicos e recupera saúde."""
         if self.esta_vivo:
-            self.__saude = min(100, self.__saude + 20)
-            self.__felicidade = min(100, self.__felicidade + 5)
+            self._alterar(min(100, self.__saude + 20), min(100, self.__felicidade + 5))
     
-    def atualizar(self):
+    def atualizar(self, rng=None, sorteio: float = None):
         """
         Implementação do método abstrato da classe base.
         Demonstra polimorfismo.
+        
+        Args:
+            rng: Gerador aleatório (usa o módulo random se não fornecido)
+            sorteio: Valor em [0, 1) já sorteado em lote
         """
         if not self.esta_vivo:
             return
         
+        if sorteio is None:
+            sorteio = (rng or random).random()
+        
         # Degradação natural leve
-        if random.random() < 0.1:  # 10% de chance
-            self.__felicidade = max(0, self.__felicidade - 1)
+        if sorteio < 0.1:  # 10% de chance
+            self._alterar(self.__saude, max(0, self.__felicidade - 1))
     
     def to_dict(self) -> dict:
         """Converte o colono para dicionário."""
@@ -0,0 +1,281 @@
+"""
+Diário de ações da colônia: persistência incremental com snapshots.
+Demonstra: Encapsulamento, Composição
+"""
+from models.colonia import Colonia
+from models.armazenamento_sqlite import caminho_auxiliar
+from models.salvamento import escrever_atomico
+import json
+import os
+import threading
+
+
+class DiarioAcoes:
+    """
+    Registra cada ação do jogador em um arquivo JSONL (uma linha por ação)
+    em vez de salvar a colônia inteira a cada ação.
+
+    O snapshot completo (Colonia.salvar) é gravado só a cada
+    `intervalo_snapshot` ações ou quando solicitado (ex.: logout).
+    Para recuperar, carrega-se o snapshot e reaplicam-se as ações do
+    diário posteriores a ele, restaurando o estado do gerador aleatório
+    registrado em cada uma, o que reproduz a partida exatamente
+    (os IDs das entidades criadas depois do snapshot são novos).
+
+    As ações são gravadas com fsync antes de executar/executar_lote
+    retornarem (um fsync por chamada: um lote é um único commit), então
+    uma ação confirmada ao jogador não se perde se o processo cair.
+
+    Com um SalvadorBackground, o snapshot é gravado em segundo plano e o
+    diário só é compactado depois que a gravação chegou ao disco.
+
+    Cada diário tem a trava da sua colônia (`trava`), segurada ao executar
+    ações e ao serializar o snapshot; quem lê ou altera a colônia por fora
+    deve segurá-la também.
+    """
+
+    INTERVALO_SNAPSHOT_PADRAO = int(os.environ.get('COLONIA_SNAPSHOT_A_CADA', 50))
+
+    # Ações registráveis: nome -> função(colonia, argumentos)
+    ACOES = {
+        'construir': lambda colonia, args: colonia.construir_edificio(args['tipo']),
+        'contratar': lambda colonia, args: colonia.adicionar_colono(),
+        'proximo_turno': lambda colonia, args: colonia.processar_turnos(args['n'], salvar=False),
+        'voltar_dia': lambda colonia, args: colonia.voltar_para_dia(args['dia'])
+    }
+
+    def __init__(self, caminho_save: str, intervalo_snapshot: int = None, salvador=None):
+        """
+        Inicializa o diário de um save.
+
+        Args:
+            caminho_save: Caminho do snapshot (arquivo ou endereço 'sqlite:<banco>#<chave>')
+            intervalo_snapshot: Ações entre snapshots (1 = salva a cada ação)
+            salvador: SalvadorBackground para gravar os snapshots em
+                      segundo plano (opcional; sem ele a gravação é imediata)
+        """
+        if intervalo_snapshot is None:
+            intervalo_snapshot = self.INTERVALO_SNAPSHOT_PADRAO
+        if intervalo_snapshot < 1:
+            raise ValueError("Intervalo de snapshot deve ser maior que 0")
+
+        self.__caminho_save = caminho_save
+        self.__caminho = caminho_auxiliar(caminho_save, '.diario')
+        self.__intervalo = intervalo_snapshot
+        self.__salvador = salvador
+        self.__trava = threading.RLock()  # Trava da colônia deste save
+        self.__pendentes = len(self._ler_registros())
+        self.__seq_gravado = None  # Última ação incluída em um snapshot no disco
+        self.__seq_compactado = None
+
+    @property
+    def caminho(self) -> str:
+        """Retorna o caminho do arquivo do diário."""
+        return self.__caminho
+
+    @property
+    def trava(self) -> threading.RLock:
+        """Retorna a trava da colônia deste save."""
+        return self.__trava
+
+    @property
+    def pendentes(self) -> int:
+        """Retorna quantas ações estão no diário desde o último snapshot."""
+        return self.__pendentes
+
+    @property
+    def seq_gravado(self):
+        """Retorna a última ação incluída em um snapshot no disco (None se nenhum)."""
+        return self.__seq_gravado
+
+    def executar(self, colonia: Colonia, acao: str, **argumentos):
+        """
+        Executa uma ação na colônia e a registra no diário.
+
+        Args:
+            colonia: Colônia ativa
+            acao: Nome da ação (ver ACOES)
+            **argumentos: Argumentos da ação (serializáveis em JSON)
+
+        Returns:
+            Retorno da ação na colônia
+        """
+        return self.executar_lote(colonia, [(acao, argumentos)])[0]
+
+    def executar_lote(self, colonia: Colonia, comandos: list) -> list:
+        """
+        Executa várias ações em ordem e as registra no diário com uma única
+        escrita (e um único fsync); o intervalo de snapshot é verificado
+        uma vez, no fim. Ao retornar, as ações estão no disco.
+
+        Se uma ação falhar com exceção, ela e as anteriores são registradas
+        (a que falhou marcada com 'falhou', pois pode ter alterado a colônia
+        antes do erro; a recuperação a refaz e ignora o mesmo erro) e a
+        exceção é propagada; as seguintes não são executadas.
+
+        Args:
+            colonia: Colônia ativa
+            comandos: Lista de tuplas (ação, argumentos)
+
+        Returns:
+            Lista com o retorno de cada ação na colônia
+        """
+        for acao, _ in comandos:
+            if acao not in self.ACOES:
+                raise ValueError(f"Ação desconhecida: {acao}")
+
+        resultados = []
+        with self.__trava:
+            self._compactar()
+
+            linhas = []
+            try:
+                for acao, argumentos in comandos:
+                    registro = {
+                        'seq': colonia._seq_diario + 1,
+                        'acao': acao,
+                        'args': argumentos,
+                        'rng': list(colonia.rng.estado)
+                    }
+                    try:
+                        resultados.append(self.ACOES[acao](colonia, argumentos))
+                    except Exception:
+                        registro['falhou'] = True
+                        raise
+                    finally:
+                        colonia._seq_diario = registro['seq']
+                        linhas.append(json.dumps(registro, ensure_ascii=False) + '\n')
+            finally:
+                if linhas:
+                    self._acrescentar(linhas)
+
+        if self.__pendentes >= self.__intervalo:
+            self.snapshot(colonia)
+
+        return resultados
+
+    def _acrescentar(self, linhas: list):
+        """Acrescenta registros ao diário e espera chegarem ao disco (fsync)."""
+        with open(self.__caminho, 'a', encoding='utf-8') as f:
+            f.write(''.join(linhas))
+            f.flush()
+            os.fsync(f.fileno())
+        self.__pendentes += len(linhas)
+
+    def snapshot(self, colonia: Colonia, aguardar: bool = False) -> bool:
+        """
+        Grava a colônia inteira e esvazia o diário.
+
+        Args:
+            colonia: Colônia ativa
+            aguardar: Com salvador, espera a gravação chegar ao disco
+                      (barreira usada no logout)
+
+        Returns:
+            True se o snapshot já está no disco
+        """
+        if self.__salvador is None:
+            with self.__trava:
+                colonia.salvar(self.__caminho_save)
+                self.__seq_gravado = colonia._seq_diario
+                self._compactar()
+            return True
+
+        self.__salvador.marcar_sujo(
+            colonia, self.__caminho_save,
+            marcador=lambda: colonia._seq_diario,
+            ao_concluir=self._snapshot_gravado,
+            trava=self.__trava
+        )
+        if not aguardar:
+            return False
+
+        gravado = self.__salvador.aguardar(self.__caminho_save)
+        with self.__trava:
+            self._compactar()
+        return gravado
+
+    def _snapshot_gravado(self, seq: int):
+        """Chamado pelo salvador quando o snapshot com a ação `seq` está no disco."""
+        self.__seq_gravado = seq
+
+    def _compactar(self):
+        """
+        Remove do diário as ações já incluídas no último snapshot gravado.
+        Se o processo cair antes disso, os registros antigos são ignorados
+        na recuperação pelo número de sequência.
+        """
+        seq_gravado = self.__seq_gravado
+        if seq_gravado is None or seq_gravado == self.__seq_compactado:
+            return
+
+        restantes = [r for r in self._ler_registros() if r['seq'] > seq_gravado]
+        if restantes:
+            conteudo = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in restantes)
+            escrever_atomico(self.__caminho, conteudo.encode('utf-8'))
+        elif os.path.exists(self.__caminho):
+            open(self.__caminho, 'w').close()
+        self.__pendentes = len(restantes)
+        self.__seq_compactado = seq_gravado
+
+    def recuperar(self) -> Colonia:
+        """
+        Carrega o snapshot e reaplica as ações registradas depois dele.
+
+        Returns:
+            Colônia recuperada, ou None se não houver snapshot
+        """
+        if self.__salvador is not None:
+            self.__salvador.aguardar(self.__caminho_save)
+
+        colonia = Colonia.carregar(self.__caminho_save)
+        if colonia is None:
+            return None
+        self.__seq_gravado = colonia._seq_diario
+
+        for registro in self._ler_registros():
+            if registro['seq'] <= colonia._seq_diario:
+                continue  # Já incluído no snapshot
+            if registro['seq'] != colonia._seq_diario + 1:
+                raise ValueError(f"Diário com lacuna: esperado {colonia._seq_diario + 1}, "
+                                 f"encontrado {registro['seq']}")
+
+            colonia.rng.restaurar(*registro['rng'])
+            try:
+                self.ACOES[registro['acao']](colonia, registro['args'])
+            except Exception:
+                if not registro.get('falhou'):
+                    raise
+            colonia._seq_diario = registro['seq']
+
+        return colonia
+
+    def descartar(self):
+        """
+        Remove o diário e cancela um snapshot pendente
+        (ex.: ao reiniciar ou criar um novo jogo).
+        """
+        if self.__salvador is not None:
+            self.__salvador.descartar(self.__caminho_save)
+        if os.path.exists(self.__caminho):
+            os.remove(self.__caminho)
+        self.__pendentes = 0
+        self.__seq_gravado = None
+        self.__seq_compactado = None
+
+    def _ler_registros(self) -> list:
+        """
+        Lê os registros do diário.
+        Uma última linha incompleta (gravação interrompida) é ignorada.
+        """
+        if not os.path.exists(self.__caminho):
+            return []
+
+        registros = []
+        with open(self.__caminho, 'r', encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    registros.append(json.loads(linha))
+                except json.JSONDecodeError:
+                    break
+        return registros
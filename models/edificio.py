@@ -28,6 +28,8 @@ class Edificio(Entidade):
         self.__capacidade = 10
         self.__status = 'ativo'
         self.__producao_total = 0
+        self.__quantidade = 1  # > 1 quando empilhado (grupo de edifícios idênticos)
+        self._observador = None  # Colônia notificada sobre mudanças
     
     @property
     def nivel(self) -> int:
@@ -54,12 +56,86 @@ class Edificio(Entidade):
         """Retorna a produção total acumulada."""
         return self.__producao_total
     
+    @property
+    def tipo(self) -> str:
+        """Retorna o tipo (nome da classe) do edifício."""
+        return self.__class__.__name__
+    
+    @property
+    def quantidade(self) -> int:
+        """Retorna quantos edifícios idênticos este objeto representa."""
+        return getattr(self, '_Edificio__quantidade', 1)
+    
     @status.setter
     def status(self, valor: str):
         """Define o status do edifício."""
         if valor not in ['ativo', 'inativo', 'manutencao']:
             raise ValueError("Status inválido")
+        anterior = self.__status
         self.__status = valor
+        self._notificar(anterior, self.__capacidade, self.quantidade)
+    
+    def _notificar(self, status_anterior: str, capacidade_anterior: int,
+                   quantidade_anterior: int):
+        """
+        Avisa o observador (a colônia) que status, capacidade ou
+        quantidade mudaram.
+        
+        Args:
+            status_anterior: Status antes da mudança
+            capacidade_anterior: Capacidade antes da mudança
+            quantidade_anterior: Quantidade antes da mudança
+        """
+        observador = getattr(self, '_observador', None)
+        if observador is not None:
+            observador._edificio_alterado(self, status_anterior, capacidade_anterior,
+                                          quantidade_anterior)
+    
+    def pode_empilhar(self, outro: 'Edificio') -> bool:
+        """Verifica se outro edifício é idêntico (tipo, nível e status)."""
+        return (type(outro) is type(self) and outro.nivel == self.__nivel
+                and outro.status == self.__status and outro.capacidade == self.__capacidade)
+    
+    def empilhar(self, outro: 'Edificio'):
+        """
+        Absorve um edifício idêntico, passando a representá-lo também.
+        
+        Args:
+            outro: Edifício do mesmo tipo, nível e status
+        """
+        if not self.pode_empilhar(outro):
+            raise ValueError("Só é possível empilhar edifícios do mesmo tipo, nível e status")
+        
+        quantidade_anterior = self.quantidade
+        self.__quantidade = quantidade_anterior + outro.quantidade
+        self.__producao_total += outro.producao_total
+        self._notificar(self.__status, self.__capacidade, quantidade_anterior)
+    
+    def desempilhar(self, quantidade: int) -> 'Edificio':
+        """
+        Separa `quantidade` edifícios deste grupo em um novo objeto.
+        
+        Args:
+            quantidade: Número de edifícios a separar (menor que o total)
+            
+        Returns:
+            Novo edifício (grupo) com a quantidade separada
+        """
+        quantidade_anterior = self.quantidade
+        if not 0 < quantidade < quantidade_anterior:
+            raise ValueError("Quantidade inválida para desempilhar")
+        
+        novo = self.__class__()
+        novo._Edificio__nivel = self.__nivel
+        novo._Edificio__capacidade = self.__capacidade
+        novo._Edificio__status = self.__status
+        novo._Edificio__quantidade = quantidade
+        novo._Edificio__producao_total = self.__producao_total * quantidade / quantidade_anterior
+        
+        self.__producao_total -= novo.producao_total
+        self.__quantidade = quantidade_anterior - quantidade
+        self._notificar(self.__status, self.__capacidade, quantidade_anterior)
+        return novo
     
     def melhorar(self) -> dict:
         """
@@ -72,8 +148,10 @@ class Edificio(Entidade):
             recurso: valor * self.__nivel * 1.5
             for recurso, valor in self.__custo_construcao.items()
         }
+        capacidade_anterior = self.__capacidade
         self.__nivel += 1
         self.__capacidade = int(self.__capacidade * 1.3)
+        self._notificar(self.__status, capacidade_anterior, self.quantidade)
         return custo_melhoria
     
     @abstractmethod
@@ -90,12 +168,30 @@ class Edificio(Entidade):
         """
         pass
     
-    def atualizar(self):
-        """Implementação do método abstrato da classe base."""
+    def atualizar(self, rng=None):
+        """
+        Implementação do método abstrato da classe base.
+        Em um grupo, cada edifício tem sua chance; os que voltam a
+        funcionar são separados em um novo grupo, repassado ao observador.
+        
+        Args:
+            rng: Gerador aleatório (usa o módulo random se não fornecido)
+        """
         if self.__status == 'manutencao':
             # Chance de voltar a funcionar
-            if random.random() < 0.3:
+            rng = rng or random
+            quantidade = self.quantidade
+            recuperados = sum(1 for _ in range(quantidade) if rng.random() < 0.3)
+            
+            if recuperados == quantidade:
                 self.__status = 'ativo'
+                self._notificar('manutencao', self.__capacidade, quantidade)
+            elif recuperados:
+                novo = self.desempilhar(recuperados)
+                novo.status = 'ativo'
+                observador = getattr(self, '_observador', None)
+                if observador is not None:
+                    observador._edificio_desempilhado(self, novo)
     
     def _calcular_producao_base(self, base: float, energia_disponivel: float, 
                                  consumo_energia: float) -> float:
@@ -113,25 +209,70 @@ class Edificio(Entidade):
         if self.__status != 'ativo':
             return 0
         
-        if energia_disponivel < consumo_energia:
-            # Produção reduzida se não houver energia suficiente
-            return base * self.__nivel * (energia_disponivel / consumo_energia) * 0.5
+        # Calculado uma vez para o grupo: os edifícios recebem energia em
+        # sequência; os que recebem tudo produzem o máximo, o próximo
+        # produz com a sobra e os demais ficam sem energia
+        quantidade = self.quantidade
+        producao_unitaria = base * self.__nivel
+        completos = min(quantidade, int(energia_disponivel // consumo_energia))
         
-        producao = base * self.__nivel
+        producao = producao_unitaria * completos
         self.__producao_total += producao
+        
+        if completos < quantidade:
+            # Produção reduzida se não houver energia suficiente
+            sobra = energia_disponivel - completos * consumo_energia
+            producao += producao_unitaria * (sobra / consumo_energia) * 0.5
+        
         return producao
     
+    def _calcular_energia_consumida(self, energia_disponivel: float,
+                                    consumo_energia: float) -> float:
+        """
+        Método protegido para calcular a energia consumida pelo grupo.
+        
+        Args:
+            energia_disponivel: Energia disponível
+            consumo_energia: Energia necessária por edifício
+            
+        Returns:
+            Energia consumida
+        """
+        return min(energia_disponivel, consumo_energia * self.quantidade)
+    
+    def _contar_alimentados(self, energia_disponivel: float, consumo_energia: float) -> int:
+        """Retorna quantos edifícios do grupo recebem a energia completa."""
+        return min(self.quantidade, int(energia_disponivel // consumo_energia))
+    
     def to_dict(self) -> dict:
         """Converte o edifício para dicionário."""
         return {
             'id': self.id,
-            'tipo': self.__class__.__name__,
+            'tipo': self.tipo,
             'nome': self.nome,
             'nivel': self.__nivel,
             'capacidade': self.__capacidade,
             'status': self.__status,
-            'producao_total': round(self.__producao_total, 2)
+            'producao_total': round(self.__producao_total, 2),
+            'quantidade': self.quantidade
         }
+    
+    def expandir(self) -> list:
+        """
+        Converte o grupo em uma linha por edifício (como se não estivesse
+        empilhado). A produção total é dividida igualmente.
+        
+        Returns:
+            Lista de dicionários, um por edifício
+        """
+        quantidade = self.quantidade
+        if quantidade == 1:
+            return [self.to_dict()]
+        
+        linha = self.to_dict()
+        linha['quantidade'] = 1
+        linha['producao_total'] = round(self.__producao_total / quantidade, 2)
+        return [dict(linha, id=f"{self.id}:{i}") for i in range(quantidade)]
 
 
 class Fazenda(Edificio):
@@ -140,11 +281,13 @@ class Fazenda(Edificio):
     Demonstra herança e polimorfismo.
     """
     
+    CUSTO_CONSTRUCAO = {'metal': 20, 'energia': 10}
+    
     def __init__(self):
         super().__init__(
             "Fazenda",
             "Produz comida para os colonos",
-            {'metal': 20, 'energia': 10}
+            self.CUSTO_CONSTRUCAO.copy()
         )
     
     def produzir(self, energia_disponivel: float) -> dict:
@@ -155,7 +298,7 @@ class Fazenda(Edificio):
         producao = self._calcular_producao_base(15, energia_disponivel, 5)
         return {
             'comida': producao,
-            'energia_consumida': 5 if energia_disponivel >= 5 else energia_disponivel
+            'energia_consumida': self._calcular_energia_consumida(energia_disponivel, 5)
         }
 
 
@@ -165,11 +308,13 @@ class Purificador(Edificio):
     Demonstra herança e polimorfismo.
     """
     
+    CUSTO_CONSTRUCAO = {'metal': 25, 'energia': 15}
+    
     def __init__(self):
         super().__init__(
             "Purificador de Água",
             "Purifica e produz água potável",
-            {'metal': 25, 'energia': 15}
+            self.CUSTO_CONSTRUCAO.copy()
         )
     
     def produzir(self, energia_disponivel: float) -> dict:
@@ -177,7 +322,7 @@ class Purificador(Edificio):
         producao = self._calcular_producao_base(12, energia_disponivel, 8)
         return {
             'agua': producao,
-            'energia_consumida': 8 if energia_disponivel >= 8 else energia_disponivel
+            'energia_consumida': self._calcular_energia_consumida(energia_disponivel, 8)
         }
 
 
@@ -187,11 +332,13 @@ class GeradorEnergia(Edificio):
     Demonstra herança e polimorfismo.
     """
     
+    CUSTO_CONSTRUCAO = {'metal': 40}
+    
     def __init__(self):
         super().__init__(
             "Gerador de Energia",
             "Gera energia para a colônia",
-            {'metal': 40}
+            self.CUSTO_CONSTRUCAO.copy()
         )
     
     def produzir(self, energia_disponivel: float = 0) -> dict:
@@ -202,7 +349,7 @@ class GeradorEnergia(Edificio):
         if self.status != 'ativo':
             return {'energia': 0, 'energia_consumida': 0}
         
-        producao = 30 * self.nivel
+        producao = 30 * self.nivel * self.quantidade
         return {
             'energia': producao,
             'energia_consumida': 0
@@ -215,11 +362,13 @@ class Mina(Edificio):
     Demonstra herança e polimorfismo.
     """
     
+    CUSTO_CONSTRUCAO = {'metal': 15, 'energia': 5}
+    
     def __init__(self):
         super().__init__(
             "Mina",
             "Extrai metal do solo",
-            {'metal': 15, 'energia': 5}
+            self.CUSTO_CONSTRUCAO.copy()
         )
     
     def produzir(self, energia_disponivel: float) -> dict:
@@ -227,7 +376,7 @@ class Mina(Edificio):
         producao = self._calcular_producao_base(8, energia_disponivel, 6)
         return {
             'metal': producao,
-            'energia_consumida': 6 if energia_disponivel >= 6 else energia_disponivel
+            'energia_consumida': self._calcular_energia_consumida(energia_disponivel, 6)
         }
 
 
@@ -237,11 +386,13 @@ class Habitacao(Edificio):
     Demonstra herança e polimorfismo.
     """
     
+    CUSTO_CONSTRUCAO = {'metal': 30, 'energia': 5}
+    
     def __init__(self):
         super().__init__(
             "Habitação",
             "Fornece moradia para os colonos",
-            {'metal': 30, 'energia': 5}
+            self.CUSTO_CONSTRUCAO.copy()
         )
         # Sobrescreve capacidade para representar número de colonos
         self._Edificio__capacidade = 5
@@ -249,12 +400,12 @@ class Habitacao(Edificio):
     def produzir(self, energia_disponivel: float) -> dict:
         """
         Habitação não produz recursos, mas melhora felicidade.
-        Implementação polimórfica.
+        Implementação polimórfica. O bônus é por edifício.
         """
         if self.status == 'ativo' and energia_disponivel >= 3:
             return {
                 'bonus_felicidade': 2 * self.nivel,
-                'energia_consumida': 3
+                'energia_consumida': 3 * self._contar_alimentados(energia_disponivel, 3)
             }
         return {'bonus_felicidade': 0, 'energia_consumida': 0}
 
@@ -265,19 +416,21 @@ class Hospital(Edificio):
     Demonstra herança e polimorfismo.
     """
     
+    CUSTO_CONSTRUCAO = {'metal': 35, 'energia': 10}
+    
     def __init__(self):
         super().__init__(
             "Hospital",
             "Cuida da saúde dos colonos",
-            {'metal': 35, 'energia': 10}
+            self.CUSTO_CONSTRUCAO.copy()
         )
     
     def produzir(self, energia_disponivel: float) -> dict:
-        """Hospital melhora a saúde dos colonos."""
+        """Hospital melhora a saúde dos colonos. O bônus é por edifício."""
         if self.status == 'ativo' and energia_disponivel >= 5:
             return {
                 'bonus_saude': 3 * self.nivel,
-                'energia_consumida': 5
+                'energia_consumida': 5 * self._contar_alimentados(energia_disponivel, 5)
             }
         return {'bonus_saude': 0, 'energia_consumida': 0}
 
@@ -11,6 +11,9 @@ class EventoAleatorio:
     Demonstra encapsulamento e composição.
     """
     
+    # Chance de algum evento ocorrer em um turno
+    CHANCE_EVENTO = 0.3
+    
     # Tipos de eventos possíveis
     EVENTOS = [
         {
@@ -71,6 +74,19 @@ class EventoAleatorio:
         }
     ]
     
+    # Identificadores estáveis dos tipos, usados nos registros compactos
+    # do histórico (novos tipos devem ser acrescentados no fim)
+    TIPOS = (
+        'tempestade_solar',
+        'descoberta_recursos',
+        'colheita_abundante',
+        'contaminacao_agua',
+        'moral_alta',
+        'epidemia',
+        'novo_colono',
+        'avanco_tecnologico'
+    )
+    
     def __init__(self, tipo: str = None, nome: str = None, descricao: str = None, efeitos: dict = None):
         """
         Inicializa um evento.
@@ -113,14 +129,18 @@ class EventoAleatorio:
         return self.__aplicado
     
     @classmethod
-    def gerar_evento_aleatorio(cls) -> 'EventoAleatorio':
+    def gerar_evento_aleatorio(cls, rng=None) -> 'EventoAleatorio':
         """
         Gera um evento aleatório baseado nas probabilidades.
         
+        Args:
+            rng: Gerador aleatório (usa o módulo random se não fornecido)
+        
         Returns:
             Instância de EventoAleatorio ou None
         """
-        if random.random() > 0.3:  # 30% de chance de evento ocorrer
+        rng = rng or random
+        if rng.random() > cls.CHANCE_EVENTO:  # Por padrão, 30% de chance
             return None
         
         # Seleciona evento baseado em probabilidades
@@ -131,7 +151,7 @@ class EventoAleatorio:
             eventos_possiveis.append(evento_data)
             pesos.append(evento_data['probabilidade'])
         
-        evento_selecionado = random.choices(eventos_possiveis, weights=pesos, k=1)[0]
+        evento_selecionado = rng.choices(eventos_possiveis, weights=pesos, k=1)[0]
         
         return cls(
             tipo=evento_selecionado['tipo'],
@@ -140,6 +160,22 @@ class EventoAleatorio:
             efeitos=evento_selecionado['efeitos'].copy()
         )
     
+    @classmethod
+    def dados_do_tipo(cls, tipo: str) -> dict:
+        """
+        Retorna os dados de catálogo (nome, descrição, efeitos) de um tipo.
+        
+        Args:
+            tipo: Tipo do evento
+            
+        Returns:
+            Dicionário do catálogo, ou vazio se o tipo não existir
+        """
+        for evento_data in cls.EVENTOS:
+            if evento_data['tipo'] == tipo:
+                return evento_data
+        return {}
+    
     def aplicar(self, colonia) -> str:
         """
         Aplica os efeitos do evento na colônia.
@@ -170,16 +206,12 @@ class EventoAleatorio:
         # Aplica efeitos em colonos
         if 'felicidade_bonus' in self.__efeitos:
             bonus = self.__efeitos['felicidade_bonus']
-            for colono in colonia.colonos:
-                if colono.esta_vivo:
-                    colono.felicidade = colono.felicidade + bonus
+            colonia.ajustar_colonos(felicidade=bonus)
             mensagens.append(f"Felicidade dos colonos: {bonus:+d}")
         
         if 'saude_bonus' in self.__efeitos:
             bonus = self.__efeitos['saude_bonus']
-            for colono in colonia.colonos:
-                if colono.esta_vivo:
-                    colono.saude = colono.saude + bonus
+            colonia.ajustar_colonos(saude=bonus)
             mensagens.append(f"Saúde dos colonos: {bonus:+d}")
         
         # Adiciona novo colono
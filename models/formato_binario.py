@@ -0,0 +1,592 @@
+"""
+Formato binário colunar dos saves da colônia.
+Demonstra: Encapsulamento, Persistência
+
+Layout (inteiros little-endian):
+
+    cabeçalho   MAGIC (8 bytes) | versão u16 | compressão u8 | reservado u8 |
+                tamanho do conteúdo u64 | CRC32 do conteúdo u32
+    conteúdo    seções (possivelmente comprimidas), cada uma:
+                [preenchimento] | etiqueta (4 bytes) | tamanho u64 | dados
+                (os dados de cada seção começam em um deslocamento
+                múltiplo de 8 do conteúdo)
+
+Seções:
+
+    META  JSON com os dados escalares da colônia (nome, dia, gerador
+          aleatório, contadores e recursos)
+    STRS  tabela de strings: quantidade u32, deslocamentos u32[n + 1], UTF-8
+    COLN  colonos em colunas de largura fixa
+    EDIF  edifícios em colunas de largura fixa
+    EVTS  eventos ainda não arquivados (ver models.registro_eventos) em
+          colunas de largura fixa: seq, dia, id do tipo e efeitos (JSON)
+    HIST  histórico de dias (opcional): limite u32, intervalo u32,
+          geração u32, arquivadas u32, descartadas u32 (posição no arquivo
+          do histórico), quantidade u32, colunas dia/keyframe/tamanho e os
+          dias ainda não arquivados (ver models.historico)
+
+Textos repetidos (descrições, custos, efeitos) aparecem uma única vez
+na tabela de strings; IDs uuid4 são guardados como 16 bytes.
+
+Sem compressão, as colunas numéricas dos colonos ficam alinhadas em 8
+bytes dentro do arquivo: um save mapeado na memória (mmap) é usado
+diretamente como as colunas de PopulacaoColonos, sem cópia.
+"""
+from models.aleatorio import GeradorAleatorio, NUMPY_DISPONIVEL
+from models.colono import Colono
+from models.edificio import TIPOS_EDIFICIOS
+from models.historico import HistoricoDias
+from models.populacao import ListaPreguicosa, PopulacaoColonos
+from models.recurso import Recurso
+from models.registro_eventos import HistoricoEventos, RegistroEvento
+from array import array
+import json
+import lzma
+import struct
+import sys
+import uuid
+import zlib
+
+if NUMPY_DISPONIVEL:
+    import numpy as np
+
+
+MAGIC = b'\x89COL\r\n\x1a\n'
+VERSAO_FORMATO = 1
+
+# Códigos de compressão gravados no cabeçalho
+COMPRESSOES = {'nenhuma': 0, 'zlib': 1, 'lzma': 2}
+
+_CABECALHO = struct.Struct('<8sHBBQI')
+_SECAO = struct.Struct('<4sQ')
+_CONTAGEM = struct.Struct('<IB')  # linhas | opções da seção
+
+# Opções das seções de colonos e edifícios
+_IDS_UUID = 1  # IDs guardados como 16 bytes (senão, índices da tabela de strings)
+_COM_DESCRICAO = 2  # Coluna de descrição presente (colonos como objetos)
+
+# Tipos das colunas: código -> (typecode de array, dtype NumPy)
+_TIPOS = {
+    'u1': ('B', '<u1'),
+    'i1': ('b', '<i1'),
+    'i2': ('h', '<i2'),
+    'i4': ('i', '<i4'),
+    'u4': ('I', '<u4'),
+    'f8': ('d', '<f8')
+}
+
+_STATUS = ['ativo', 'inativo', 'manutencao']
+
+_CLASSES_EDIFICIOS = {classe.__name__: classe for classe in TIPOS_EDIFICIOS.values()}
+
+
+def eh_formato_binario(dados: bytes) -> bool:
+    """Verifica pelos bytes mágicos se os dados estão neste formato."""
+    return dados[:len(MAGIC)] == MAGIC
+
+
+# ----------------------------------------------------------------------
+# Colunas e tabela de strings
+# ----------------------------------------------------------------------
+
+def _empacotar_coluna(valores, tipo: str) -> bytes:
+    """Converte uma coluna (lista ou array NumPy) em bytes little-endian."""
+    typecode, dtype = _TIPOS[tipo]
+    if NUMPY_DISPONIVEL:
+        return np.asarray(valores, dtype=dtype).tobytes()
+    coluna = array(typecode, valores)
+    if sys.byteorder == 'big':
+        coluna.byteswap()
+    return coluna.tobytes()
+
+
+def _ler_coluna(dados: memoryview, inicio: int, tipo: str, n: int, como_array: bool = False):
+    """
+    Lê uma coluna de n valores.
+
+    Returns:
+        Tupla (coluna, próxima posição); a coluna é um array NumPy
+        gravável se como_array e NumPy disponível (sem cópia se `dados`
+        for gravável, como um mmap com ACCESS_COPY), senão uma lista
+    """
+    typecode, dtype = _TIPOS[tipo]
+    fim = inicio + n * struct.calcsize('<' + typecode)
+    if NUMPY_DISPONIVEL:
+        coluna = np.frombuffer(dados[inicio:fim], dtype=dtype)
+        if como_array:
+            return coluna.astype(dtype[1:], copy=dados.readonly), fim
+        return coluna.tolist(), fim
+
+    coluna = array(typecode)
+    coluna.frombytes(dados[inicio:fim])
+    if sys.byteorder == 'big':
+        coluna.byteswap()
+    return coluna.tolist(), fim
+
+
+class _TabelaStrings:
+    """Tabela de strings sem repetição, referenciadas por índice."""
+
+    def __init__(self):
+        self.__indices = {}
+        self.__strings = []
+
+    def indice(self, texto: str) -> int:
+        """Retorna o índice do texto, adicionando-o se necessário."""
+        indice = self.__indices.get(texto)
+        if indice is None:
+            indice = self.__indices[texto] = len(self.__strings)
+            self.__strings.append(texto)
+        return indice
+
+    def empacotar(self) -> bytes:
+        """Converte a tabela em bytes (seção STRS)."""
+        codificadas = [texto.encode('utf-8') for texto in self.__strings]
+        deslocamentos = [0]
+        for texto in codificadas:
+            deslocamentos.append(deslocamentos[-1] + len(texto))
+        return (struct.pack('<I', len(codificadas))
+                + _empacotar_coluna(deslocamentos, 'u4')
+                + b''.join(codificadas))
+
+    @staticmethod
+    def ler(dados: memoryview, preguicosa: bool = False):
+        """
+        Lê a seção STRS e retorna a lista de strings (ListaPreguicosa,
+        decodificando cada string só quando usada, se `preguicosa`).
+        """
+        quantidade, = struct.unpack_from('<I', dados, 0)
+        if not preguicosa:
+            deslocamentos, inicio = _ler_coluna(dados, 4, 'u4', quantidade + 1)
+            texto = bytes(dados[inicio:])
+            return [texto[a:b].decode('utf-8') for a, b in zip(deslocamentos, deslocamentos[1:])]
+
+        deslocamentos, inicio = _ler_coluna(dados, 4, 'u4', quantidade + 1, como_array=True)
+        texto = dados[inicio:]
+        return ListaPreguicosa(
+            quantidade,
+            lambda i: str(texto[deslocamentos[i]:deslocamentos[i + 1]], 'utf-8'),
+            lambda: _TabelaStrings.ler(dados)
+        )
+
+
+def _alinhar(pos: int) -> int:
+    """Próximo deslocamento múltiplo de 8."""
+    return pos + (-pos) % 8
+
+
+def _juntar_alinhado(cabecalho: bytes, colunas: list) -> bytes:
+    """Junta as colunas após o cabeçalho, cada uma alinhada em 8 bytes."""
+    partes = [cabecalho]
+    pos = len(cabecalho)
+    for coluna in colunas:
+        preenchimento = _alinhar(pos) - pos
+        partes.append(b'\0' * preenchimento)
+        partes.append(coluna)
+        pos += preenchimento + len(coluna)
+    return b''.join(partes)
+
+
+def _empacotar_ids(ids: list, strings: _TabelaStrings) -> tuple:
+    """Retorna (opção, bytes) com os IDs como uuid de 16 bytes ou índices de string."""
+    try:
+        return _IDS_UUID, b''.join(uuid.UUID(i).bytes for i in ids)
+    except (ValueError, AttributeError, TypeError):
+        return 0, _empacotar_coluna([strings.indice(i) for i in ids], 'u4')
+
+
+def _ler_ids(dados: memoryview, inicio: int, n: int, opcoes: int, strings: list,
+             preguicoso: bool = False) -> tuple:
+    """
+    Lê a coluna de IDs. Retorna (lista de IDs, próxima posição); com
+    `preguicoso`, uma ListaPreguicosa que formata cada ID só quando lido.
+    """
+    if opcoes & _IDS_UUID:
+        fim = inicio + 16 * n
+        bloco = dados[inicio:fim]
+
+        def todos():
+            hexa = bytes(bloco).hex()
+            # Mesmo texto de str(uuid.UUID(...)), sem criar os objetos
+            return [f"{hexa[k:k + 8]}-{hexa[k + 8:k + 12]}-{hexa[k + 12:k + 16]}-"
+                    f"{hexa[k + 16:k + 20]}-{hexa[k + 20:k + 32]}"
+                    for k in range(0, 32 * n, 32)]
+
+        if preguicoso:
+            return ListaPreguicosa(n, lambda i: str(uuid.UUID(bytes=bytes(bloco[16 * i:16 * i + 16]))),
+                                   todos), fim
+        return todos(), fim
+
+    indices, fim = _ler_coluna(dados, inicio, 'u4', n, como_array=preguicoso)
+    if preguicoso:
+        return ListaPreguicosa(n, lambda i: strings[indices[i]],
+                               lambda: [strings[i] for i in indices.tolist()]), fim
+    return [strings[i] for i in indices], fim
+
+
+# ----------------------------------------------------------------------
+# Seções
+# ----------------------------------------------------------------------
+
+def _secao_meta(estado: dict) -> bytes:
+    """Dados escalares da colônia (JSON: preserva int/float e sementes grandes)."""
+    rng = estado['_Colonia__rng']
+    meta = {
+        'nome': estado['_Colonia__nome'],
+        'dia': estado['_Colonia__dia'],
+        'rng': list(rng.estado),
+        'empilhar': estado.get('_Colonia__empilhar', False),
+        'vetorizado': estado.get('_Colonia__populacao') is not None,
+        'bonus_eficiencia': estado.get('_bonus_eficiencia', 1.0),
+        'seq_diario': estado.get('_seq_diario', 0),
+        'total_colonos_mortos': estado['_Colonia__total_colonos_mortos'],
+        'total_edificios_construidos': estado['_Colonia__total_edificios_construidos'],
+        'recursos': [
+            [nome, r.tipo, r.quantidade, r.capacidade_maxima]
+            for nome, r in estado['_Colonia__recursos'].items()
+        ]
+    }
+    return json.dumps(meta, ensure_ascii=False).encode('utf-8')
+
+
+def _secao_colonos(estado: dict, strings: _TabelaStrings) -> bytes:
+    """Colonos em colunas: id, nome, [descrição], profissão, saúde, felicidade,
+    produtividade, dias trabalhados."""
+    populacao = estado.get('_Colonia__populacao')
+    profissoes = {p: i for i, p in enumerate(Colono.PROFISSOES)}
+
+    if populacao is not None:
+        n = len(populacao)
+        opcoes, ids = _empacotar_ids(populacao.ids, strings)
+        colunas = [
+            ids,
+            _empacotar_coluna([strings.indice(nome) for nome in populacao.nomes], 'u4'),
+            _empacotar_coluna(populacao.profissao, 'i1'),
+            _empacotar_coluna(populacao.saude, 'i2'),
+            _empacotar_coluna(populacao.felicidade, 'i2'),
+            _empacotar_coluna(populacao.produtividade, 'f8'),
+            _empacotar_coluna(populacao.dias_trabalhados, 'i4')
+        ]
+    else:
+        atributos = [vars(c) for c in estado['_Colonia__colonos']]
+        n = len(atributos)
+        opcoes, ids = _empacotar_ids([a['_Entidade__id'] for a in atributos], strings)
+        opcoes |= _COM_DESCRICAO
+        colunas = [
+            ids,
+            _empacotar_coluna([strings.indice(a['_Entidade__nome']) for a in atributos], 'u4'),
+            _empacotar_coluna([strings.indice(a['_Entidade__descricao']) for a in atributos], 'u4'),
+            _empacotar_coluna([profissoes[a['_Colono__profissao']] for a in atributos], 'i1'),
+            _empacotar_coluna([a['_Colono__saude'] for a in atributos], 'i2'),
+            _empacotar_coluna([a['_Colono__felicidade'] for a in atributos], 'i2'),
+            _empacotar_coluna([a['_Colono__produtividade'] for a in atributos], 'f8'),
+            _empacotar_coluna([a['_Colono__dias_trabalhados'] for a in atributos], 'i4')
+        ]
+
+    return _juntar_alinhado(_CONTAGEM.pack(n, opcoes), colunas)
+
+
+def _secao_edificios(estado: dict, strings: _TabelaStrings) -> bytes:
+    """Edifícios em colunas: tipo, id, nome, descrição, custo (JSON), nível,
+    capacidade, status, quantidade, produção total."""
+    atributos = [vars(e) for e in estado['_Colonia__edificios']]
+    tipos = [type(e).__name__ for e in estado['_Colonia__edificios']]
+    opcoes, ids = _empacotar_ids([a['_Entidade__id'] for a in atributos], strings)
+    colunas = [
+        _empacotar_coluna([strings.indice(t) for t in tipos], 'u4'),
+        ids,
+        _empacotar_coluna([strings.indice(a['_Entidade__nome']) for a in atributos], 'u4'),
+        _empacotar_coluna([strings.indice(a['_Entidade__descricao']) for a in atributos], 'u4'),
+        _empacotar_coluna([strings.indice(json.dumps(a['_Edificio__custo_construcao'],
+                                                     sort_keys=True))
+                           for a in atributos], 'u4'),
+        _empacotar_coluna([a['_Edificio__nivel'] for a in atributos], 'i4'),
+        _empacotar_coluna([a['_Edificio__capacidade'] for a in atributos], 'i4'),
+        _empacotar_coluna([_STATUS.index(a['_Edificio__status']) for a in atributos], 'u1'),
+        _empacotar_coluna([a.get('_Edificio__quantidade', 1) for a in atributos], 'u4'),
+        _empacotar_coluna([a['_Edificio__producao_total'] for a in atributos], 'f8')
+    ]
+    return _CONTAGEM.pack(len(atributos), opcoes) + b''.join(colunas)
+
+
+def _secao_eventos(estado: dict, strings: _TabelaStrings) -> bytes:
+    """Eventos não arquivados em colunas: seq, dia, id do tipo, efeitos (JSON)."""
+    registros = estado['_Colonia__eventos'].registros()
+    colunas = [
+        _empacotar_coluna([r.seq for r in registros], 'u4'),
+        _empacotar_coluna([r.dia for r in registros], 'i4'),
+        _empacotar_coluna([r.tipo for r in registros], 'u1'),
+        _empacotar_coluna([strings.indice(json.dumps(dict(r.efeitos), sort_keys=True))
+                           for r in registros], 'u4')
+    ]
+    return _CONTAGEM.pack(len(registros), 0) + b''.join(colunas)
+
+
+def _secao_historico(estado: dict) -> bytes:
+    """
+    Histórico de dias: configuração, posição no arquivo do histórico e os
+    dias pendentes (colunas dia/keyframe/tamanho e os dados).
+    """
+    historico = estado['_Colonia__historico']
+    pendentes = historico.pendentes
+    return (struct.pack('<IIIIII', historico.limite, historico.intervalo_keyframe,
+                        historico.geracao, historico.arquivadas, historico.descartadas,
+                        len(pendentes))
+            + _empacotar_coluna([dia for dia, _, _ in pendentes], 'i4')
+            + _empacotar_coluna([1 if keyframe else 0 for _, keyframe, _ in pendentes], 'u1')
+            + _empacotar_coluna([len(dados) for _, _, dados in pendentes], 'u4')
+            + b''.join(dados for _, _, dados in pendentes))
+
+
+def _ler_colonos(dados: memoryview, strings: list, vetorizado: bool) -> tuple:
+    """
+    Lê a seção COLN. Retorna (lista de colonos, população ou None).
+    Em um save mapeado (`dados` gravável), as colunas da população
+    apontam para o mapeamento e IDs e nomes são lidos sob demanda.
+    """
+    n, opcoes = _CONTAGEM.unpack_from(dados, 0)
+    mapeado = vetorizado and not dados.readonly
+
+    # Cada coluna começa em um deslocamento múltiplo de 8 da seção
+    ids, pos = _ler_ids(dados, _alinhar(_CONTAGEM.size), n, opcoes, strings, preguicoso=mapeado)
+    indices_nomes, pos = _ler_coluna(dados, _alinhar(pos), 'u4', n, como_array=mapeado)
+    if mapeado:
+        nomes = ListaPreguicosa(n, lambda i: strings[indices_nomes[i]],
+                                lambda: [strings[i] for i in indices_nomes.tolist()])
+    else:
+        nomes = [strings[i] for i in indices_nomes]
+    descricoes = None
+    if opcoes & _COM_DESCRICAO:
+        descricoes, pos = _ler_coluna(dados, _alinhar(pos), 'u4', n)
+
+    colunas = {}
+    for nome, tipo in (('profissao', 'i1'), ('saude', 'i2'), ('felicidade', 'i2'),
+                       ('produtividade', 'f8'), ('dias_trabalhados', 'i4')):
+        colunas[nome], pos = _ler_coluna(dados, _alinhar(pos), tipo, n, como_array=vetorizado)
+
+    if vetorizado:
+        populacao = PopulacaoColonos()
+        populacao.__setstate__({
+            '_PopulacaoColonos__total': n,
+            '_PopulacaoColonos__ids': ids,
+            '_PopulacaoColonos__nomes': nomes,
+            '_PopulacaoColonos__colunas': colunas
+        })
+        return [], populacao
+
+    colonos = []
+    for i in range(n):
+        colono = Colono.__new__(Colono)
+        colono.__dict__.update({
+            '_Entidade__id': ids[i],
+            '_Entidade__nome': nomes[i],
+            '_Entidade__descricao': strings[descricoes[i]] if descricoes else
+            f"Colono trabalhando como {Colono.PROFISSOES[colunas['profissao'][i]]}",
+            '_Colono__saude': colunas['saude'][i],
+            '_Colono__felicidade': colunas['felicidade'][i],
+            '_Colono__profissao': Colono.PROFISSOES[colunas['profissao'][i]],
+            '_Colono__produtividade': colunas['produtividade'][i],
+            '_Colono__dias_trabalhados': colunas['dias_trabalhados'][i],
+            '_observador': None
+        })
+        colonos.append(colono)
+    return colonos, None
+
+
+def _ler_edificios(dados: memoryview, strings: list) -> list:
+    """Lê a seção EDIF."""
+    n, opcoes = _CONTAGEM.unpack_from(dados, 0)
+    tipos, pos = _ler_coluna(dados, _CONTAGEM.size, 'u4', n)
+    ids, pos = _ler_ids(dados, pos, n, opcoes, strings)
+    colunas = {}
+    for nome, tipo in (('nome', 'u4'), ('descricao', 'u4'), ('custo', 'u4'), ('nivel', 'i4'),
+                       ('capacidade', 'i4'), ('status', 'u1'), ('quantidade', 'u4'),
+                       ('producao_total', 'f8')):
+        colunas[nome], pos = _ler_coluna(dados, pos, tipo, n)
+
+    custos = {}
+    edificios = []
+    for i in range(n):
+        indice_custo = colunas['custo'][i]
+        if indice_custo not in custos:
+            custos[indice_custo] = json.loads(strings[indice_custo])
+
+        edificio = _CLASSES_EDIFICIOS[strings[tipos[i]]].__new__(_CLASSES_EDIFICIOS[strings[tipos[i]]])
+        edificio.__dict__.update({
+            '_Entidade__id': ids[i],
+            '_Entidade__nome': strings[colunas['nome'][i]],
+            '_Entidade__descricao': strings[colunas['descricao'][i]],
+            '_Edificio__nivel': colunas['nivel'][i],
+            '_Edificio__custo_construcao': dict(custos[indice_custo]),
+            '_Edificio__capacidade': colunas['capacidade'][i],
+            '_Edificio__status': _STATUS[colunas['status'][i]],
+            '_Edificio__producao_total': colunas['producao_total'][i],
+            '_Edificio__quantidade': colunas['quantidade'][i],
+            '_observador': None
+        })
+        edificios.append(edificio)
+    return edificios
+
+
+def _ler_eventos(dados: memoryview, strings: list) -> HistoricoEventos:
+    """Lê a seção EVTS."""
+    n, _ = _CONTAGEM.unpack_from(dados, 0)
+    colunas = {}
+    pos = _CONTAGEM.size
+    for nome, tipo in (('seq', 'u4'), ('dia', 'i4'), ('tipo', 'u1'), ('efeitos', 'u4')):
+        colunas[nome], pos = _ler_coluna(dados, pos, tipo, n)
+
+    efeitos = {}
+    registros = []
+    for i in range(n):
+        indice = colunas['efeitos'][i]
+        if indice not in efeitos:
+            efeitos[indice] = tuple(sorted(json.loads(strings[indice]).items()))
+        registros.append(RegistroEvento(colunas['seq'][i], colunas['dia'][i],
+                                        colunas['tipo'][i], efeitos[indice]))
+    return HistoricoEventos(registros=registros,
+                            arquivados=registros[0].seq if registros else 0)
+
+
+def _ler_historico(dados: memoryview) -> HistoricoDias:
+    """Lê a seção HIST."""
+    limite, intervalo, geracao, arquivadas, descartadas, n = struct.unpack_from('<IIIIII', dados, 0)
+    dias, pos = _ler_coluna(dados, 24, 'i4', n)
+    keyframes, pos = _ler_coluna(dados, pos, 'u1', n)
+    tamanhos, pos = _ler_coluna(dados, pos, 'u4', n)
+    pendentes = []
+    for dia, keyframe, tamanho in zip(dias, keyframes, tamanhos):
+        pendentes.append((dia, bool(keyframe), bytes(dados[pos:pos + tamanho])))
+        pos += tamanho
+    return HistoricoDias(limite, intervalo, pendentes, arquivadas, descartadas, geracao)
+
+
+# ----------------------------------------------------------------------
+# Codificação do estado completo
+# ----------------------------------------------------------------------
+
+def codificar_estado(estado: dict, compressao: str = 'zlib') -> bytes:
+    """
+    Codifica o estado de uma colônia (Colonia.__getstate__) no formato binário.
+
+    Args:
+        estado: Estado da colônia
+        compressao: 'nenhuma', 'zlib' ou 'lzma'
+
+    Returns:
+        Conteúdo do arquivo de save
+    """
+    if compressao not in COMPRESSOES:
+        raise ValueError(f"Compressão inválida: {compressao}. "
+                         f"Escolha entre: {', '.join(COMPRESSOES)}")
+
+    strings = _TabelaStrings()
+    secoes = [
+        (b'META', _secao_meta(estado)),
+        (b'COLN', _secao_colonos(estado, strings)),
+        (b'EDIF', _secao_edificios(estado, strings)),
+        (b'EVTS', _secao_eventos(estado, strings))
+    ]
+    if estado.get('_Colonia__historico') is not None:
+        secoes.append((b'HIST', _secao_historico(estado)))
+    # A tabela de strings é lida antes das seções que a referenciam
+    secoes.insert(1, (b'STRS', strings.empacotar()))
+
+    partes = []
+    pos = 0
+    for etiqueta, dados in secoes:
+        # Os dados de cada seção começam alinhados em 8 bytes
+        preenchimento = _alinhar(pos + _SECAO.size) - _SECAO.size - pos
+        partes += [b'\0' * preenchimento, _SECAO.pack(etiqueta, len(dados)), dados]
+        pos += preenchimento + _SECAO.size + len(dados)
+    conteudo = b''.join(partes)
+    crc = zlib.crc32(conteudo)
+    tamanho = len(conteudo)
+
+    if compressao == 'zlib':
+        conteudo = zlib.compress(conteudo, 6)
+    elif compressao == 'lzma':
+        conteudo = lzma.compress(conteudo)
+
+    return _CABECALHO.pack(MAGIC, VERSAO_FORMATO, COMPRESSOES[compressao], 0,
+                           tamanho, crc) + conteudo
+
+
+def decodificar_estado(dados, verificar: bool = True) -> dict:
+    """
+    Decodifica um save binário no estado aceito por Colonia.__setstate__.
+
+    Se `dados` for um buffer gravável (um mmap com ACCESS_COPY) e o save
+    não for comprimido, a população usa o buffer diretamente: nada é
+    copiado e só as páginas lidas saem do disco (desde que `verificar`
+    seja False: o CRC lê o conteúdo inteiro). As alterações do turno
+    ficam na memória do processo; o arquivo só muda no próximo save.
+
+    Args:
+        dados: Conteúdo do arquivo de save (bytes ou buffer)
+        verificar: Se True, confere o CRC do conteúdo (o tamanho é sempre
+                   conferido; zlib e lzma têm também a sua própria soma)
+
+    Returns:
+        Dicionário de estado da colônia
+    """
+    if not eh_formato_binario(dados):
+        raise ValueError("Não é um save no formato binário")
+
+    _, versao, compressao, _, tamanho, crc = _CABECALHO.unpack_from(dados, 0)
+    if versao != VERSAO_FORMATO:
+        raise ValueError(f"Versão do save ({versao}) não suportada (esperada {VERSAO_FORMATO})")
+
+    conteudo = memoryview(dados)[_CABECALHO.size:]
+    if compressao == COMPRESSOES['zlib']:
+        conteudo = zlib.decompress(conteudo)
+    elif compressao == COMPRESSOES['lzma']:
+        conteudo = lzma.decompress(conteudo)
+    elif compressao != COMPRESSOES['nenhuma']:
+        raise ValueError(f"Compressão desconhecida no save: {compressao}")
+
+    if len(conteudo) != tamanho or (verificar and zlib.crc32(conteudo) != crc):
+        raise ValueError("Save corrompido (tamanho ou CRC não conferem)")
+
+    # Separa as seções
+    visao = memoryview(conteudo)
+    secoes = {}
+    pos = 0
+    while pos < len(visao):
+        pos = _alinhar(pos + _SECAO.size) - _SECAO.size
+        etiqueta, comprimento = _SECAO.unpack_from(visao, pos)
+        pos += _SECAO.size
+        secoes[etiqueta] = visao[pos:pos + comprimento]
+        pos += comprimento
+
+    meta = json.loads(bytes(secoes[b'META']).decode('utf-8'))
+    strings = _TabelaStrings.ler(secoes[b'STRS'], preguicosa=not visao.readonly)
+    # Sem NumPy, uma colônia vetorizada é carregada com colonos comuns
+    colonos, populacao = _ler_colonos(secoes[b'COLN'], strings,
+                                      meta['vetorizado'] and NUMPY_DISPONIVEL)
+
+    rng = GeradorAleatorio(meta['rng'][0])
+    rng.restaurar(*meta['rng'])
+
+    estado = {
+        '_Colonia__nome': meta['nome'],
+        '_Colonia__dia': meta['dia'],
+        '_Colonia__rng': rng,
+        '_Colonia__colonos': colonos,
+        '_Colonia__populacao': populacao,
+        '_Colonia__agregados': {},  # Refeitos por Colonia.__setstate__
+        '_Colonia__edificios': _ler_edificios(secoes[b'EDIF'], strings),
+        '_Colonia__empilhar': meta['empilhar'],
+        '_Colonia__eventos': _ler_eventos(secoes[b'EVTS'], strings),
+        '_Colonia__recursos': {
+            nome: Recurso(tipo, quantidade, capacidade)
+            for nome, tipo, quantidade, capacidade in meta['recursos']
+        },
+        '_Colonia__total_colonos_mortos': meta['total_colonos_mortos'],
+        '_Colonia__total_edificios_construidos': meta['total_edificios_construidos'],
+        '_bonus_eficiencia': meta['bonus_eficiencia'],
+        '_seq_diario': meta['seq_diario']
+    }
+    if b'HIST' in secoes:
+        estado['_Colonia__historico'] = _ler_historico(secoes[b'HIST'])
+    return estado
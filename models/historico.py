@@ -0,0 +1,768 @@
+"""
+Histórico de dias da colônia (viagem no tempo) com deltas e keyframes.
+Demonstra: Encapsulamento, Persistência
+"""
+from models.aleatorio import NUMPY_DISPONIVEL
+from models.colono import Colono
+from models.linhas import (COLUNAS, COLUNAS_META, extrair_meta, linhas_colonos,
+                           linhas_edificios, linhas_eventos, montar_estado)
+from models.salvamento import escrever_atomico
+from array import array
+from bisect import bisect_left
+import json
+import os
+import struct
+import sys
+import zlib
+
+if NUMPY_DISPONIVEL:
+    import numpy as np
+
+
+# Arquivo do histórico: cabeçalho (mágico, geração) e registros
+# (dia, keyframe, tamanho) seguidos dos dados comprimidos
+_MAGICO = b'HDIA'
+_CABECALHO = struct.Struct('<4sI')
+_REGISTRO = struct.Struct('<iBI')
+
+# Colunas de texto (JSON) e numéricas (binárias) de cada tabela
+_TEXTOS = {
+    'colonos': ('id', 'nome', 'descricao'),
+    'edificios': ('id', 'tipo', 'nome', 'descricao', 'custo', 'status')
+}
+_NUMERICAS = {
+    'colonos': {'profissao': 'i1', 'saude': 'i2', 'felicidade': 'i2',
+                'produtividade': 'f8', 'dias_trabalhados': 'i4'},
+    'edificios': {'nivel': 'i4', 'capacidade': 'i4', 'quantidade': 'i4',
+                  'producao_total': 'f8'}
+}
+
+# Tipos das colunas: código -> (typecode de array, dtype NumPy)
+_TIPOS = {
+    'i1': ('b', '<i1'),
+    'i2': ('h', '<i2'),
+    'i4': ('i', '<i4'),
+    'u4': ('I', '<u4'),
+    'f8': ('d', '<f8')
+}
+
+
+class HistoricoDias:
+    """
+    Guarda o estado da colônia ao fim de cada dia, limitado aos últimos
+    `limite` dias (1000 por padrão: COLONIA_HISTORICO_DIAS; 0 desativa).
+
+    Cada dia é gravado como um delta em relação ao dia anterior e, a cada
+    `intervalo_keyframe` dias, como um keyframe completo. Reconstruir um
+    dia custa no máximo um keyframe mais `intervalo_keyframe - 1` deltas.
+    Colonos e edifícios são gravados por coluna: as numéricas em binário,
+    só as posições que mudaram (ou a coluna inteira, se for menor); as de
+    texto só para as linhas novas ou alteradas.
+
+    Os dias registrados ficam em `pendentes` até o próximo save, que os
+    acrescenta ao arquivo do histórico (ao lado do save) e os remove do
+    estado salvo: o save guarda só quantos registros do arquivo pertencem
+    a ele (`arquivadas`, dos quais os `descartadas` primeiros já saíram
+    do limite) e a geração do arquivo. Registros além de `arquivadas` (de
+    um save que não chegou ao disco) são sobrescritos; o arquivo é
+    reescrito, com nova geração, ao voltar no tempo sobre dias já
+    arquivados ou quando os descartados passam dos dias guardados.
+
+    Depois de uma queda o save no disco e o arquivo continuam coerentes:
+    os registros chegam ao disco (fsync) antes do save que os conta, e os
+    que sobram de um save que não foi gravado são ignorados e depois
+    sobrescritos. Se a queda vem entre uma reescrita e o save seguinte, a
+    geração não confere e ficam só os dias pendentes do save.
+
+    Ao passar do limite, os dias mais antigos saem junto com os deltas
+    que dependiam do keyframe removido, então o histórico mantém entre
+    `limite - intervalo_keyframe + 1` e `limite` dias.
+    """
+
+    LIMITE_PADRAO = int(os.environ.get('COLONIA_HISTORICO_DIAS', 1000))
+    INTERVALO_KEYFRAME_PADRAO = int(os.environ.get('COLONIA_HISTORICO_KEYFRAME', 30))
+
+    def __init__(self, limite: int = None, intervalo_keyframe: int = None,
+                 pendentes: list = (), arquivadas: int = 0, descartadas: int = 0,
+                 geracao: int = 0):
+        """
+        Inicializa o histórico.
+
+        Args:
+            limite: Máximo de dias guardados (0 desativa o histórico)
+            intervalo_keyframe: Dias entre keyframes completos
+            pendentes: Entradas (dia, keyframe, dados) ainda não arquivadas (ao carregar um save)
+            arquivadas: Quantos registros do arquivo pertencem ao histórico
+            descartadas: Quantos desses registros, do início, já saíram do limite
+            geracao: Geração do arquivo em que os registros foram gravados
+        """
+        if limite is None:
+            limite = self.LIMITE_PADRAO
+        if intervalo_keyframe is None:
+            intervalo_keyframe = self.INTERVALO_KEYFRAME_PADRAO
+        if limite < 0 or intervalo_keyframe < 1:
+            raise ValueError("Limite deve ser >= 0 e intervalo de keyframe >= 1")
+
+        self.__limite = limite
+        self.__intervalo = intervalo_keyframe
+        self.__pendentes = list(pendentes)  # (dia, keyframe, dados comprimidos)
+        self.__arquivadas = arquivadas
+        self.__descartadas = descartadas
+        self.__geracao = geracao
+        self.__arquivo = None
+        self.__indice = []  # (dia, keyframe, posição dos dados, tamanho) dos registros no limite
+        self.__fim = None  # Fim do último registro arquivado (None: reescrever o arquivo)
+        self.__ultimo = None  # Colunas do último dia, para calcular o próximo delta
+
+    @property
+    def ativo(self) -> bool:
+        """Indica se o histórico registra dias."""
+        return self.__limite > 0
+
+    @property
+    def limite(self) -> int:
+        """Retorna o máximo de dias guardados."""
+        return self.__limite
+
+    @property
+    def intervalo_keyframe(self) -> int:
+        """Retorna o número de dias entre keyframes."""
+        return self.__intervalo
+
+    @property
+    def pendentes(self) -> list:
+        """Retorna as entradas (dia, keyframe, dados) ainda não arquivadas."""
+        return list(self.__pendentes)
+
+    @property
+    def arquivadas(self) -> int:
+        """Retorna quantos registros do arquivo pertencem ao histórico."""
+        return self.__arquivadas
+
+    @property
+    def descartadas(self) -> int:
+        """Retorna quantos registros do início do arquivo já saíram do limite."""
+        return self.__descartadas
+
+    @property
+    def geracao(self) -> int:
+        """Retorna a geração do arquivo do histórico."""
+        return self.__geracao
+
+    @property
+    def arquivo(self) -> str:
+        """Retorna o caminho do arquivo do histórico (None se não vinculado)."""
+        return self.__arquivo
+
+    @property
+    def dias(self) -> list:
+        """Retorna os dias disponíveis."""
+        return [dia for dia, _ in self._chaves()]
+
+    def __len__(self) -> int:
+        """Retorna o número de dias guardados."""
+        return len(self.__indice) + len(self.__pendentes)
+
+    def __contains__(self, dia: int) -> bool:
+        """Verifica se o dia está no histórico."""
+        return self._posicao(dia) is not None
+
+    def resumo(self) -> dict:
+        """Retorna dias disponíveis, keyframes e bytes ocupados (total e em memória)."""
+        chaves = self._chaves()
+        em_memoria = sum(len(dados) for _, _, dados in self.__pendentes)
+        if self.__ultimo is not None:
+            em_memoria += sum(getattr(coluna, 'nbytes', 0)
+                              for colunas in self.__ultimo.values() if isinstance(colunas, dict)
+                              for coluna in colunas.values())
+        return {
+            'dias': len(chaves),
+            'primeiro_dia': chaves[0][0] if chaves else None,
+            'ultimo_dia': chaves[-1][0] if chaves else None,
+            'keyframes': sum(1 for _, keyframe in chaves if keyframe),
+            'bytes': (sum(tamanho for _, _, _, tamanho in self.__indice)
+                      + sum(len(dados) for _, _, dados in self.__pendentes)),
+            'bytes_em_memoria': em_memoria,
+            'limite': self.__limite,
+            'intervalo_keyframe': self.__intervalo
+        }
+
+    def registrar(self, dia: int, estado: dict):
+        """
+        Registra o estado da colônia ao fim de um dia. Dias a partir deste
+        já registrados (linha do tempo reescrita após voltar no tempo) são
+        descartados.
+
+        Args:
+            dia: Dia do estado
+            estado: Estado da colônia (Colonia.__getstate__)
+        """
+        if not self.ativo:
+            return
+
+        self.descartar_a_partir(dia)
+        colunas = _extrair_colunas(estado)
+
+        desde_keyframe = 0
+        for _, keyframe in reversed(self._chaves()):
+            if keyframe:
+                break
+            desde_keyframe += 1
+        anterior = self._ultimo_estado()
+        keyframe = anterior is None or desde_keyframe + 1 >= self.__intervalo
+
+        dados = _codificar(extrair_meta(estado), colunas, None if keyframe else anterior)
+        self.__pendentes.append((dia, keyframe, dados))
+        self.__ultimo = _copiar_colunas(colunas)
+        self._aparar()
+
+    def descartar_a_partir(self, dia: int):
+        """Remove os dias a partir de `dia` (inclusive)."""
+        corte = bisect_left(self.dias, dia)
+        if corte >= len(self):
+            return
+        arquivados = len(self.__indice)
+        if corte < arquivados:
+            # Registros já arquivados: o arquivo é reescrito no próximo save
+            del self.__indice[corte:]
+            self.__pendentes = []
+            self.__arquivadas = self.__descartadas + corte
+            self.__fim = None
+        else:
+            del self.__pendentes[corte - arquivados:]
+        self.__ultimo = None
+
+    def estado_em(self, dia: int) -> dict:
+        """
+        Reconstrói o estado da colônia ao fim de um dia.
+
+        Args:
+            dia: Dia desejado
+
+        Returns:
+            Estado aceito por Colonia.__setstate__ (sem o histórico)
+        """
+        meta, colunas = self._reconstruir(self._exigir_posicao(dia))
+        return montar_estado(meta, {tabela: _linhas(tabela, colunas[tabela])
+                                    for tabela in COLUNAS})
+
+    def comparar(self, dia_a: int, dia_b: int) -> dict:
+        """
+        Compara dois dias do histórico.
+
+        Args:
+            dia_a: Dia de referência
+            dia_b: Dia comparado
+
+        Returns:
+            Dicionário com os campos da colônia que mudaram ({campo: [a, b]};
+            recursos por quantidade) e, por tabela, quantas linhas foram
+            inseridas, alteradas e removidas
+        """
+        meta_a, colunas_a = self._reconstruir(self._exigir_posicao(dia_a))
+        meta_b, colunas_b = self._reconstruir(self._exigir_posicao(dia_b))
+
+        campos_a, campos_b = dict(zip(COLUNAS_META, meta_a)), dict(zip(COLUNAS_META, meta_b))
+        for campos in (campos_a, campos_b):
+            campos['recursos'] = {nome: quantidade for nome, _, quantidade, _
+                                  in json.loads(campos['recursos'])}
+        diferenca = {
+            'colonia': {campo: [campos_a[campo], campos_b[campo]]
+                        for campo in COLUNAS_META if campos_a[campo] != campos_b[campo]}
+        }
+
+        for tabela in COLUNAS:
+            linhas_a = {linha[0]: linha for linha in _linhas(tabela, colunas_a[tabela])}
+            linhas_b = {linha[0]: linha for linha in _linhas(tabela, colunas_b[tabela])}
+            diferenca[tabela] = {
+                'inseridas': len(linhas_b.keys() - linhas_a.keys()),
+                'alteradas': sum(1 for chave, linha in linhas_b.items()
+                                 if chave in linhas_a and linhas_a[chave] != linha),
+                'removidas': len(linhas_a.keys() - linhas_b.keys())
+            }
+        return diferenca
+
+    def _chaves(self) -> list:
+        """(dia, keyframe) de cada dia guardado, em ordem."""
+        return ([(dia, keyframe) for dia, keyframe, _, _ in self.__indice]
+                + [(dia, keyframe) for dia, keyframe, _ in self.__pendentes])
+
+    def _posicao(self, dia: int):
+        """Índice da entrada do dia, ou None."""
+        dias = self.dias
+        posicao = bisect_left(dias, dia)
+        if posicao < len(dias) and dias[posicao] == dia:
+            return posicao
+        return None
+
+    def _exigir_posicao(self, dia: int) -> int:
+        """Índice da entrada do dia (ValueError se não estiver no histórico)."""
+        posicao = self._posicao(dia)
+        if posicao is None:
+            dias = self.dias
+            if not dias:
+                raise ValueError("Histórico vazio")
+            raise ValueError(f"Dia {dia} fora do histórico ({dias[0]} a {dias[-1]})")
+        return posicao
+
+    def _aparar(self):
+        """Remove os dias além do limite e os deltas sem o keyframe anterior."""
+        chaves = self._chaves()
+        remover = max(0, len(chaves) - self.__limite)
+        while remover < len(chaves) and not chaves[remover][1]:
+            remover += 1
+        do_arquivo = min(remover, len(self.__indice))
+        del self.__indice[:do_arquivo]
+        self.__descartadas += do_arquivo
+        del self.__pendentes[:remover - do_arquivo]
+        if remover == len(chaves):
+            self.__ultimo = None
+
+    def _ultimo_estado(self):
+        """
+        Colunas do último dia registrado, reconstruídas se necessário (None
+        se não há dias ou o keyframe está no arquivo, ainda não vinculado).
+        """
+        if self.__ultimo is None and len(self):
+            try:
+                self.__ultimo = _copiar_colunas(self._reconstruir(len(self) - 1)[1])
+            except ValueError:
+                return None
+        return self.__ultimo
+
+    def _reconstruir(self, posicao: int) -> tuple:
+        """Aplica, a partir do keyframe anterior, os deltas até a posição."""
+        chaves = self._chaves()
+        inicio = posicao
+        while inicio >= 0 and not chaves[inicio][1]:
+            inicio -= 1
+        if inicio < 0:
+            raise ValueError(f"Dia {chaves[posicao][0]} sem keyframe (histórico não vinculado)")
+
+        meta, colunas = None, None
+        arquivo = None
+        try:
+            for i in range(inicio, posicao + 1):
+                if i < len(self.__indice):
+                    if arquivo is None:
+                        arquivo = open(self.__arquivo, 'rb')
+                    _, _, inicio_dados, tamanho = self.__indice[i]
+                    arquivo.seek(inicio_dados)
+                    dados = arquivo.read(tamanho)
+                else:
+                    dados = self.__pendentes[i - len(self.__indice)][2]
+                meta, colunas = _decodificar(dados, colunas)
+        finally:
+            if arquivo is not None:
+                arquivo.close()
+        return meta, colunas
+
+    # ------------------------------------------------------------------
+    # Arquivo
+    # ------------------------------------------------------------------
+
+    def vincular(self, arquivo: str):
+        """
+        Associa o histórico ao arquivo do save, indexando os registros que
+        pertencem a este estado. Se o arquivo não tem esses registros (save
+        de outra geração, arquivo ausente ou cortado), os dias arquivados
+        se perdem e ficam só os pendentes.
+
+        Args:
+            arquivo: Caminho do arquivo do histórico
+        """
+        self.__arquivo = arquivo
+        self.__indice = []
+        self.__fim = None
+        self.__ultimo = None
+        if self.__arquivadas == 0:
+            return
+
+        indice = []
+        try:
+            with open(arquivo, 'rb') as f:
+                tamanho_arquivo = os.fstat(f.fileno()).st_size
+                magico, geracao = _CABECALHO.unpack(f.read(_CABECALHO.size))
+                if magico != _MAGICO or geracao != self.__geracao:
+                    raise ValueError("Arquivo do histórico de outra geração")
+                posicao = _CABECALHO.size
+                for i in range(self.__arquivadas):
+                    dia, keyframe, tamanho = _REGISTRO.unpack(f.read(_REGISTRO.size))
+                    posicao += _REGISTRO.size
+                    if i >= self.__descartadas:
+                        indice.append((dia, bool(keyframe), posicao, tamanho))
+                    posicao += tamanho
+                    f.seek(posicao)
+                if posicao > tamanho_arquivo:
+                    raise ValueError("Arquivo do histórico cortado")
+        except (OSError, ValueError, struct.error):
+            self.__arquivadas = self.__descartadas = 0
+        else:
+            self.__indice = indice
+            self.__fim = posicao
+        self._aparar()
+
+    def arquivar_pendentes(self):
+        """
+        Acrescenta os pendentes ao arquivo (com fsync) e os remove da
+        memória, reescrevendo o arquivo se preciso. Chamado antes de
+        capturar o estado para um save.
+        """
+        if self.__arquivo is None:
+            return
+        compactar = (self.__descartadas >= self.__intervalo
+                     and self.__descartadas > len(self.__indice))
+        if self.__fim is None or compactar:
+            if self.__indice or self.__pendentes:
+                self._reescrever()
+            return
+        if not self.__pendentes:
+            return
+
+        posicao = self.__fim
+        with open(self.__arquivo, 'r+b') as f:
+            f.truncate(posicao)
+            f.seek(posicao)
+            for dia, keyframe, dados in self.__pendentes:
+                f.write(_REGISTRO.pack(dia, keyframe, len(dados)))
+                f.write(dados)
+                posicao += _REGISTRO.size
+                self.__indice.append((dia, keyframe, posicao, len(dados)))
+                posicao += len(dados)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.__fim = posicao
+        self.__arquivadas += len(self.__pendentes)
+        self.__pendentes = []
+
+    def _reescrever(self):
+        """Grava um arquivo novo, de outra geração, só com os dias guardados."""
+        geracao = self.__geracao
+        registros = []
+        if os.path.exists(self.__arquivo):
+            with open(self.__arquivo, 'rb') as f:
+                cabecalho = f.read(_CABECALHO.size)
+                if len(cabecalho) == _CABECALHO.size:
+                    magico, geracao_arquivo = _CABECALHO.unpack(cabecalho)
+                    if magico == _MAGICO:
+                        geracao = max(geracao, geracao_arquivo)
+                for dia, keyframe, inicio, tamanho in self.__indice:
+                    f.seek(inicio)
+                    registros.append((dia, keyframe, f.read(tamanho)))
+        registros.extend(self.__pendentes)
+        geracao += 1
+
+        partes = [_CABECALHO.pack(_MAGICO, geracao)]
+        indice = []
+        posicao = _CABECALHO.size
+        for dia, keyframe, dados in registros:
+            partes += [_REGISTRO.pack(dia, keyframe, len(dados)), dados]
+            posicao += _REGISTRO.size
+            indice.append((dia, keyframe, posicao, len(dados)))
+            posicao += len(dados)
+        escrever_atomico(self.__arquivo, b''.join(partes))
+
+        self.__geracao = geracao
+        self.__indice = indice
+        self.__fim = posicao
+        self.__arquivadas = len(registros)
+        self.__descartadas = 0
+        self.__pendentes = []
+
+    def __getstate__(self) -> dict:
+        """Estado salvo: o vínculo com o arquivo e o último dia são refeitos sob demanda."""
+        estado = self.__dict__.copy()
+        estado['_HistoricoDias__arquivo'] = None
+        estado['_HistoricoDias__indice'] = []
+        estado['_HistoricoDias__fim'] = None
+        estado['_HistoricoDias__ultimo'] = None
+        return estado
+
+
+# ----------------------------------------------------------------------
+# Codificação dos dias
+# ----------------------------------------------------------------------
+
+def _extrair_colunas(estado: dict) -> dict:
+    """
+    Colunas de colonos e edifícios e linhas de eventos do estado. Com a
+    população vetorizada, as colunas numéricas são as da população (sem
+    cópia) e a descrição é None (não guardada).
+    """
+    populacao = estado.get('_Colonia__populacao')
+    if populacao is not None:
+        colonos = {'id': populacao.ids, 'nome': populacao.nomes, 'descricao': None}
+        colonos.update((nome, populacao.coluna(nome)) for nome in _NUMERICAS['colonos'])
+    else:
+        colonos = _transpor('colonos', linhas_colonos(estado))
+        codigos = {p: i for i, p in enumerate(Colono.PROFISSOES)}
+        colonos['profissao'] = [codigos[p] for p in colonos['profissao']]
+    return {
+        'colonos': colonos,
+        'edificios': _transpor('edificios', linhas_edificios(estado)),
+        'eventos': list(linhas_eventos(estado))
+    }
+
+
+def _transpor(tabela: str, linhas) -> dict:
+    """Converte linhas da tabela em colunas (listas)."""
+    colunas = list(map(list, zip(*linhas))) or [[] for _ in COLUNAS[tabela]]
+    return dict(zip(COLUNAS[tabela], colunas))
+
+
+def _linhas(tabela: str, colunas) -> list:
+    """Converte as colunas de uma tabela (ver _decodificar) em linhas na ordem original."""
+    if tabela == 'eventos':
+        return sorted(colunas)
+    n = len(colunas['id'])
+    valores = []
+    for nome in COLUNAS[tabela]:
+        if nome == 'ordem':
+            valores.append(range(n))
+        elif nome == 'profissao' and tabela == 'colonos':
+            valores.append([Colono.PROFISSOES[p] for p in _lista(colunas[nome])])
+        elif colunas[nome] is None:
+            valores.append([None] * n)
+        else:
+            valores.append(_lista(colunas[nome]))
+    return list(zip(*valores))
+
+
+def _copiar_colunas(colunas: dict) -> dict:
+    """
+    Base do próximo delta: número de linhas, último id, colunas numéricas
+    copiadas (a população muda no turno) e, nos edifícios, os textos.
+    A descrição é None se a tabela não a guarda.
+    """
+    copia = {'eventos': list(colunas['eventos'])}
+    for tabela, numericas in _NUMERICAS.items():
+        atuais = colunas[tabela]
+        n = len(atuais['id'])
+        copia[tabela] = {'n': n, 'id_final': atuais['id'][n - 1] if n else None,
+                         'descricao': None if atuais['descricao'] is None else []}
+        if tabela == 'edificios':
+            copia[tabela].update((nome, list(atuais[nome])) for nome in _TEXTOS[tabela])
+        copia[tabela].update((nome, _coluna_numerica(atuais[nome], tipo))
+                             for nome, tipo in numericas.items())
+    return copia
+
+
+def _codificar(meta: tuple, colunas: dict, anterior) -> bytes:
+    """
+    Codifica um dia: cabeçalho JSON (meta, textos e como ler cada coluna
+    numérica) seguido das colunas numéricas em binário, tudo com zlib.
+
+    Args:
+        meta: Linha de COLUNAS_META
+        colunas: Saída de _extrair_colunas
+        anterior: Colunas do dia anterior (_copiar_colunas), ou None para um keyframe
+    """
+    partes = []
+    cabecalho = {'meta': list(meta)}
+    for tabela in _NUMERICAS:
+        cabecalho[tabela] = _delta_tabela(tabela, colunas[tabela],
+                                          anterior[tabela] if anterior else None, partes)
+    cabecalho['eventos'] = _delta_eventos(colunas['eventos'],
+                                          anterior['eventos'] if anterior else [])
+    texto = json.dumps(cabecalho, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return zlib.compress(struct.pack('<I', len(texto)) + texto + b''.join(partes), 1)
+
+
+def _base(tabela: str, atuais: dict, anteriores) -> int:
+    """
+    Quantas linhas do dia anterior continuam nas mesmas posições (0 se a
+    tabela foi reordenada ou encolheu). Colonos só são acrescentados:
+    basta conferir o último id do dia anterior.
+    """
+    if anteriores is None:
+        return 0
+    n, m = len(atuais['id']), anteriores['n']
+    if n < m or (atuais['descricao'] is None) != (anteriores['descricao'] is None):
+        return 0
+    if tabela == 'colonos':
+        return m if m == 0 or atuais['id'][m - 1] == anteriores['id_final'] else 0
+    return m if list(atuais['id'][:m]) == anteriores['id'] else 0
+
+
+def _delta_tabela(tabela: str, atuais: dict, anteriores, partes: list) -> dict:
+    """
+    Delta de colonos ou edifícios em relação ao dia anterior: textos das
+    linhas novas (e, nos edifícios, os alterados [[posição, valor], ...])
+    e, para cada coluna numérica, a coluna inteira ('c') ou as posições
+    alteradas e os valores ('i'), acrescentadas a `partes` em binário.
+    """
+    n = len(atuais['id'])
+    base = _base(tabela, atuais, anteriores)
+    delta = {'n': n, 'base': base, 'novos': {}, 'alterados': {}, 'colunas': []}
+    for nome in _TEXTOS[tabela]:
+        valores = atuais[nome]
+        if valores is None:
+            delta['novos'][nome] = None
+            continue
+        delta['novos'][nome] = [valores[i] for i in range(base, n)]
+        if tabela == 'edificios' and base:
+            # IDs, nomes e descrições dos colonos não mudam
+            antigos = anteriores[nome]
+            alterados = [[i, valores[i]] for i in range(base) if valores[i] != antigos[i]]
+            if alterados:
+                delta['alterados'][nome] = alterados
+    for nome, tipo in _NUMERICAS[tabela].items():
+        valores = atuais[nome]
+        posicoes = _posicoes_alteradas(anteriores[nome] if base else None, valores, base, n)
+        tamanho = struct.calcsize(_TIPOS[tipo][0])
+        if len(posicoes) * (4 + tamanho) >= n * tamanho:
+            delta['colunas'].append([nome, 'c', n])
+            partes.append(_empacotar(valores, tipo))
+        else:
+            delta['colunas'].append([nome, 'i', len(posicoes)])
+            partes += [_empacotar(posicoes, 'u4'), _empacotar(_selecionar(valores, posicoes), tipo)]
+    return delta
+
+
+def _delta_eventos(atuais: list, anteriores: list) -> dict:
+    """
+    Eventos não arquivados: se as linhas que já existiam não mudaram, só o
+    primeiro seq mantido e as linhas novas; senão, todas.
+    """
+    ultimo = anteriores[-1][0] if anteriores else -1
+    antigos = {linha[0]: linha for linha in anteriores}
+    if all(antigos.get(linha[0]) == linha for linha in atuais if linha[0] <= ultimo):
+        return {'primeiro': atuais[0][0] if atuais else None,
+                'novas': [linha for linha in atuais if linha[0] > ultimo]}
+    return {'linhas': atuais}
+
+
+def _decodificar(dados: bytes, anterior) -> tuple:
+    """
+    Decodifica um dia sobre as colunas do dia anterior (alteradas no lugar).
+
+    Args:
+        dados: Entrada gravada por _codificar
+        anterior: Colunas do dia anterior (de _decodificar), ou None para um keyframe
+
+    Returns:
+        Tupla (meta, colunas)
+    """
+    conteudo = zlib.decompress(dados)
+    tamanho, = struct.unpack_from('<I', conteudo, 0)
+    cabecalho = json.loads(conteudo[4:4 + tamanho].decode('utf-8'))
+    posicao = [4 + tamanho]
+
+    def ler(tipo: str, n: int):
+        inicio = posicao[0]
+        posicao[0] += n * struct.calcsize(_TIPOS[tipo][0])
+        return _desempacotar(conteudo[inicio:posicao[0]], tipo)
+
+    colunas = {tabela: _aplicar_tabela(tabela, anterior[tabela] if anterior else None,
+                                       cabecalho[tabela], ler)
+               for tabela in _NUMERICAS}
+    colunas['eventos'] = _aplicar_eventos(anterior['eventos'] if anterior else [],
+                                          cabecalho['eventos'])
+    return tuple(cabecalho['meta']), colunas
+
+
+def _aplicar_tabela(tabela: str, colunas, delta: dict, ler) -> dict:
+    """Aplica o delta de uma tabela (ver _delta_tabela) às colunas do dia anterior."""
+    base, n = delta['base'], delta['n']
+    resultado = {}
+    for nome in _TEXTOS[tabela]:
+        novos = delta['novos'][nome]
+        if novos is None:
+            resultado[nome] = None
+            continue
+        valores = colunas[nome] if base else []
+        del valores[base:]
+        for i, valor in delta['alterados'].get(nome, ()):
+            valores[i] = valor
+        valores.extend(novos)
+        resultado[nome] = valores
+    for nome, modo, quantidade in delta['colunas']:
+        tipo = _NUMERICAS[tabela][nome]
+        if modo == 'c':
+            resultado[nome] = ler(tipo, quantidade)
+        else:
+            posicoes = ler('u4', quantidade)
+            resultado[nome] = _atribuir(colunas[nome] if base else None, base, n,
+                                        posicoes, ler(tipo, quantidade))
+    return resultado
+
+
+def _aplicar_eventos(anteriores: list, delta: dict) -> list:
+    """Aplica o delta de eventos (ver _delta_eventos) às linhas do dia anterior."""
+    if 'linhas' in delta:
+        return [tuple(linha) for linha in delta['linhas']]
+    primeiro = delta['primeiro']
+    mantidas = [] if primeiro is None else [linha for linha in anteriores if linha[0] >= primeiro]
+    return mantidas + [tuple(linha) for linha in delta['novas']]
+
+
+# ----------------------------------------------------------------------
+# Colunas numéricas (NumPy, ou array sem ele)
+# ----------------------------------------------------------------------
+
+def _coluna_numerica(valores, tipo: str):
+    """Cópia da coluna (array NumPy, ou array do módulo array)."""
+    typecode, dtype = _TIPOS[tipo]
+    if NUMPY_DISPONIVEL:
+        return np.array(valores, dtype=dtype[1:])
+    return array(typecode, valores)
+
+
+def _lista(valores) -> list:
+    """Valores da coluna como lista de números Python."""
+    return valores.tolist() if hasattr(valores, 'tolist') else list(valores)
+
+
+def _posicoes_alteradas(antigos, atuais, base: int, n: int):
+    """Posições < base com valor diferente do dia anterior, mais as linhas novas."""
+    if NUMPY_DISPONIVEL:
+        atuais = np.asarray(atuais)
+        alteradas = (np.flatnonzero(antigos[:base] != atuais[:base]) if base
+                     else np.empty(0, dtype=np.intp))
+        return np.concatenate([alteradas, np.arange(base, n)])
+    return [i for i in range(base) if antigos[i] != atuais[i]] + list(range(base, n))
+
+
+def _selecionar(valores, posicoes):
+    """Valores da coluna nas posições."""
+    if NUMPY_DISPONIVEL:
+        return np.asarray(valores)[posicoes]
+    return [valores[i] for i in posicoes]
+
+
+def _atribuir(coluna, base: int, n: int, posicoes, valores):
+    """Coluna do dia: as `base` primeiras posições da anterior, com os valores nas posições."""
+    if NUMPY_DISPONIVEL:
+        resultado = np.zeros(n, dtype=valores.dtype)
+        if base:
+            resultado[:base] = coluna[:base]
+        resultado[posicoes] = valores
+        return resultado
+    resultado = list(coluna[:base]) + [0] * (n - base) if base else [0] * n
+    for i, valor in zip(posicoes, valores):
+        resultado[i] = valor
+    return resultado
+
+
+def _empacotar(valores, tipo: str) -> bytes:
+    """Converte uma coluna em bytes little-endian."""
+    typecode, dtype = _TIPOS[tipo]
+    if NUMPY_DISPONIVEL:
+        return np.asarray(valores, dtype=dtype).tobytes()
+    coluna = array(typecode, valores)
+    if sys.byteorder == 'big':
+        coluna.byteswap()
+    return coluna.tobytes()
+
+
+def _desempacotar(dados: bytes, tipo: str):
+    """Converte bytes little-endian em coluna (array NumPy, ou lista)."""
+    typecode, dtype = _TIPOS[tipo]
+    if NUMPY_DISPONIVEL:
+        return np.frombuffer(dados, dtype=dtype).astype(dtype[1:])
+    coluna = array(typecode)
+    coluna.frombytes(dados)
+    if sys.byteorder == 'big':
+        coluna.byteswap()
+    return coluna.tolist()
@@ -0,0 +1,156 @@
+"""
+Medição do tempo de cada fase do turno.
+Demonstra: Encapsulamento, Composição
+"""
+from collections import deque
+import threading
+import time
+
+
+# Fases de Colonia.processar_turno, na ordem em que são executadas
+FASES_TURNO = (
+    'historico',
+    'producao_energia',
+    'producao_recursos',
+    'trabalho',
+    'consumo',
+    'beneficios',
+    'atualizacao',
+    'mortes',
+    'evento',
+    'alertas',
+    'avanco_dia',
+    'salvamento'
+)
+
+
+class MedidorFases:
+    """
+    Cronômetro de um turno: cada chamada a marcar() fecha a fase atual
+    com o tempo decorrido desde a marcação anterior.
+    """
+
+    def __init__(self):
+        """Inicia a medição."""
+        self.__fases = {}
+        self.__marco = time.perf_counter()
+
+    @property
+    def fases(self) -> dict:
+        """Retorna {fase: {'ms': tempo, 'entidades': contagem}}."""
+        return self.__fases
+
+    def marcar(self, fase: str, entidades: int = 0):
+        """
+        Fecha uma fase.
+
+        Args:
+            fase: Nome da fase (ver FASES_TURNO)
+            entidades: Número de entidades processadas na fase
+        """
+        agora = time.perf_counter()
+        self.__fases[fase] = {
+            'ms': round((agora - self.__marco) * 1000, 4),
+            'entidades': int(entidades)
+        }
+        self.__marco = agora
+
+
+class HistogramaFases:
+    """
+    Janela deslizante com os tempos das últimas fases medidas,
+    resumida em percentis e histograma sob demanda.
+    Compartilhada por todas as colônias do processo.
+    """
+
+    JANELA_PADRAO = 1000
+
+    # Limites superiores (ms) das faixas do histograma
+    FAIXAS_MS = (0.01, 0.1, 1, 10, 100, 1000)
+
+    def __init__(self, janela: int = JANELA_PADRAO):
+        """
+        Inicializa o histograma.
+
+        Args:
+            janela: Número de turnos mantidos por fase
+        """
+        self.__janela = janela
+        self.__amostras = {fase: deque(maxlen=janela) for fase in FASES_TURNO}
+        self.__turnos = 0
+        self.__trava = threading.Lock()
+
+    @property
+    def turnos(self) -> int:
+        """Retorna o total de turnos registrados desde o início."""
+        return self.__turnos
+
+    def registrar(self, fases: dict):
+        """
+        Registra as fases de um turno.
+
+        Args:
+            fases: Dicionário produzido por MedidorFases.fases
+        """
+        with self.__trava:
+            self.__turnos += 1
+            for fase, medicao in fases.items():
+                self.__amostras.setdefault(fase, deque(maxlen=self.__janela)).append(
+                    (medicao['ms'], medicao['entidades'])
+                )
+
+    def limpar(self):
+        """Descarta todas as amostras."""
+        with self.__trava:
+            self.__turnos = 0
+            for amostras in self.__amostras.values():
+                amostras.clear()
+
+    def resumo(self) -> dict:
+        """
+        Resume a janela de cada fase.
+
+        Returns:
+            Dicionário {fase: {amostras, media_ms, p50_ms, p95_ms, p99_ms,
+            max_ms, media_entidades, histograma}}
+        """
+        with self.__trava:
+            copias = {fase: list(amostras) for fase, amostras in self.__amostras.items()}
+            turnos = self.__turnos
+
+        rotulos = [f"<{limite}ms" for limite in self.FAIXAS_MS] + [f">={self.FAIXAS_MS[-1]}ms"]
+        fases = {}
+        for fase, amostras in copias.items():
+            if not amostras:
+                continue
+
+            tempos = sorted(ms for ms, _ in amostras)
+            contagens = [0] * len(rotulos)
+            for ms in tempos:
+                faixa = 0
+                while faixa < len(self.FAIXAS_MS) and ms >= self.FAIXAS_MS[faixa]:
+                    faixa += 1
+                contagens[faixa] += 1
+
+            fases[fase] = {
+                'amostras': len(tempos),
+                'media_ms': round(sum(tempos) / len(tempos), 4),
+                'p50_ms': self._percentil(tempos, 50),
+                'p95_ms': self._percentil(tempos, 95),
+                'p99_ms': self._percentil(tempos, 99),
+                'max_ms': tempos[-1],
+                'media_entidades': round(sum(n for _, n in amostras) / len(amostras), 1),
+                'histograma': dict(zip(rotulos, contagens))
+            }
+
+        return {'turnos': turnos, 'janela': self.__janela, 'fases': fases}
+
+    @staticmethod
+    def _percentil(ordenados: list, p: float) -> float:
+        """Percentil pelo posto mais próximo."""
+        indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+        return ordenados[indice]
+
+
+# Histograma global do processo (lido pelo endpoint de administração)
+histograma_fases = HistogramaFases()
@@ -0,0 +1,224 @@
+"""
+Representação da colônia em linhas de tabela (tuplas de valores simples),
+usada pelo banco SQLite e pelo histórico de dias.
+Demonstra: Encapsulamento, Persistência
+"""
+from models.aleatorio import GeradorAleatorio, NUMPY_DISPONIVEL
+from models.colono import Colono
+from models.edificio import TIPOS_EDIFICIOS
+from models.populacao import PopulacaoColonos
+from models.recurso import Recurso
+from models.registro_eventos import HistoricoEventos, RegistroEvento, codigo_tipo
+import json
+
+if NUMPY_DISPONIVEL:
+    import numpy as np
+
+
+# Dados escalares da colônia (uma linha)
+COLUNAS_META = ('nome', 'dia', 'vetorizado', 'empilhar', 'rng_semente', 'rng_passo',
+                'bonus_eficiencia', 'seq_diario', 'total_colonos_mortos',
+                'total_edificios_construidos', 'recursos')
+
+# Tabelas de entidades; a primeira coluna é a chave da linha
+COLUNAS = {
+    'colonos': ('id', 'ordem', 'nome', 'descricao', 'profissao', 'saude', 'felicidade',
+                'produtividade', 'dias_trabalhados'),
+    'edificios': ('id', 'ordem', 'tipo', 'nome', 'descricao', 'custo', 'nivel', 'capacidade',
+                  'status', 'quantidade', 'producao_total'),
+    'eventos': ('seq', 'dia', 'tipo', 'efeitos')  # Só os eventos ainda não arquivados
+}
+
+_CLASSES_EDIFICIOS = {classe.__name__: classe for classe in TIPOS_EDIFICIOS.values()}
+
+
+def extrair_linhas(estado: dict) -> tuple:
+    """
+    Converte o estado da colônia em linhas.
+
+    Args:
+        estado: Estado da colônia (Colonia.__getstate__)
+
+    Returns:
+        Tupla (linha de COLUNAS_META, {tabela: {chave da linha: linha}})
+    """
+    return extrair_meta(estado), {
+        'colonos': {linha[0]: linha for linha in linhas_colonos(estado)},
+        'edificios': {linha[0]: linha for linha in linhas_edificios(estado)},
+        'eventos': {linha[0]: linha for linha in linhas_eventos(estado)}
+    }
+
+
+def extrair_meta(estado: dict) -> tuple:
+    """Linha de COLUNAS_META do estado da colônia."""
+    semente, passo = estado['_Colonia__rng'].estado
+    return (
+        estado['_Colonia__nome'], estado['_Colonia__dia'],
+        int(estado.get('_Colonia__populacao') is not None),
+        int(estado.get('_Colonia__empilhar', False)),
+        str(semente), passo, estado.get('_bonus_eficiencia', 1.0),
+        estado.get('_seq_diario', 0), estado['_Colonia__total_colonos_mortos'],
+        estado['_Colonia__total_edificios_construidos'],
+        json.dumps([[nome, r.tipo, r.quantidade, r.capacidade_maxima]
+                    for nome, r in estado['_Colonia__recursos'].items()],
+                   ensure_ascii=False)
+    )
+
+
+def linhas_colonos(estado: dict):
+    """Linhas da tabela de colonos, na ordem da colônia (iterável)."""
+    populacao = estado.get('_Colonia__populacao')
+    if populacao is not None:
+        return zip(
+            populacao.ids, range(len(populacao)), populacao.nomes, [None] * len(populacao),
+            [Colono.PROFISSOES[p] for p in populacao.profissao.tolist()],
+            populacao.saude.tolist(), populacao.felicidade.tolist(),
+            populacao.produtividade.tolist(), populacao.dias_trabalhados.tolist()
+        )
+    return (
+        (a['_Entidade__id'], ordem, a['_Entidade__nome'], a['_Entidade__descricao'],
+         a['_Colono__profissao'], a['_Colono__saude'], a['_Colono__felicidade'],
+         a['_Colono__produtividade'], a['_Colono__dias_trabalhados'])
+        for ordem, a in enumerate(vars(c) for c in estado['_Colonia__colonos'])
+    )
+
+
+def linhas_edificios(estado: dict):
+    """Linhas da tabela de edifícios, na ordem da colônia (iterável)."""
+    custos = {}  # Os edifícios do mesmo tipo têm o mesmo custo: JSON feito uma vez
+
+    def custo(valores: dict) -> str:
+        chave = tuple(valores.items())
+        if chave not in custos:
+            custos[chave] = json.dumps(valores, sort_keys=True)
+        return custos[chave]
+
+    return (
+        (a['_Entidade__id'], ordem, type(e).__name__, a['_Entidade__nome'],
+         a['_Entidade__descricao'], custo(a['_Edificio__custo_construcao']),
+         a['_Edificio__nivel'], a['_Edificio__capacidade'], a['_Edificio__status'],
+         a.get('_Edificio__quantidade', 1), a['_Edificio__producao_total'])
+        for ordem, (e, a) in enumerate((e, vars(e)) for e in estado['_Colonia__edificios'])
+    )
+
+
+def linhas_eventos(estado: dict):
+    """Linhas da tabela de eventos não arquivados, em ordem (iterável)."""
+    return (
+        (r.seq, r.dia, r.nome_tipo, json.dumps(dict(r.efeitos), sort_keys=True))
+        for r in estado['_Colonia__eventos'].registros()
+    )
+
+
+def montar_estado(meta: tuple, tabelas: dict) -> dict:
+    """
+    Reconstrói o estado da colônia a partir das linhas.
+
+    Args:
+        meta: Linha de COLUNAS_META
+        tabelas: {tabela: lista de linhas na ordem original}
+
+    Returns:
+        Estado aceito por Colonia.__setstate__
+    """
+    meta = dict(zip(COLUNAS_META, meta))
+    vetorizado = bool(meta['vetorizado']) and NUMPY_DISPONIVEL
+    colonos, populacao = _montar_colonos(tabelas['colonos'], vetorizado)
+
+    semente = int(meta['rng_semente'])
+    rng = GeradorAleatorio(semente)
+    rng.restaurar(semente, meta['rng_passo'])
+
+    return {
+        '_Colonia__nome': meta['nome'],
+        '_Colonia__dia': meta['dia'],
+        '_Colonia__rng': rng,
+        '_Colonia__colonos': colonos,
+        '_Colonia__populacao': populacao,
+        '_Colonia__agregados': {},  # Refeitos por Colonia.__setstate__
+        '_Colonia__edificios': _montar_edificios(tabelas['edificios']),
+        '_Colonia__empilhar': bool(meta['empilhar']),
+        '_Colonia__eventos': _montar_eventos(tabelas['eventos']),
+        '_Colonia__recursos': {
+            nome: Recurso(tipo, quantidade, capacidade)
+            for nome, tipo, quantidade, capacidade in json.loads(meta['recursos'])
+        },
+        '_Colonia__total_colonos_mortos': meta['total_colonos_mortos'],
+        '_Colonia__total_edificios_construidos': meta['total_edificios_construidos'],
+        '_bonus_eficiencia': meta['bonus_eficiencia'],
+        '_seq_diario': meta['seq_diario']
+    }
+
+
+def _montar_colonos(linhas: list, vetorizado: bool) -> tuple:
+    """Reconstrói os colonos. Retorna (lista de colonos, população ou None)."""
+    if vetorizado:
+        codigos = {p: i for i, p in enumerate(Colono.PROFISSOES)}
+        colunas = list(zip(*linhas)) or [()] * len(COLUNAS['colonos'])
+        valores = dict(zip(COLUNAS['colonos'], colunas))
+        valores['profissao'] = [codigos[p] for p in valores['profissao']]
+
+        populacao = PopulacaoColonos()
+        populacao.__setstate__({
+            '_PopulacaoColonos__total': len(linhas),
+            '_PopulacaoColonos__ids': list(valores['id']),
+            '_PopulacaoColonos__nomes': list(valores['nome']),
+            '_PopulacaoColonos__colunas': {
+                nome: np.array(valores[nome], dtype=tipo)
+                for nome, tipo in PopulacaoColonos.COLUNAS.items()
+            }
+        })
+        return [], populacao
+
+    colonos = []
+    for (id_, _, nome, descricao, profissao, saude, felicidade,
+         produtividade, dias) in linhas:
+        colono = Colono.__new__(Colono)
+        colono.__dict__.update({
+            '_Entidade__id': id_,
+            '_Entidade__nome': nome,
+            '_Entidade__descricao': descricao or f"Colono trabalhando como {profissao}",
+            '_Colono__saude': saude,
+            '_Colono__felicidade': felicidade,
+            '_Colono__profissao': profissao,
+            '_Colono__produtividade': produtividade,
+            '_Colono__dias_trabalhados': dias,
+            '_observador': None
+        })
+        colonos.append(colono)
+    return colonos, None
+
+
+def _montar_edificios(linhas: list) -> list:
+    """Reconstrói os edifícios na ordem original."""
+    edificios = []
+    for (id_, _, tipo, nome, descricao, custo, nivel, capacidade, status,
+         quantidade, producao_total) in linhas:
+        classe = _CLASSES_EDIFICIOS[tipo]
+        edificio = classe.__new__(classe)
+        edificio.__dict__.update({
+            '_Entidade__id': id_,
+            '_Entidade__nome': nome,
+            '_Entidade__descricao': descricao,
+            '_Edificio__nivel': nivel,
+            '_Edificio__custo_construcao': json.loads(custo),
+            '_Edificio__capacidade': capacidade,
+            '_Edificio__status': status,
+            '_Edificio__producao_total': producao_total,
+            '_Edificio__quantidade': quantidade,
+            '_observador': None
+        })
+        edificios.append(edificio)
+    return edificios
+
+
+def _montar_eventos(linhas: list) -> HistoricoEventos:
+    """
+    Reconstrói o histórico de eventos (os anteriores à primeira linha
+    estão no arquivo de eventos).
+    """
+    registros = [RegistroEvento(seq, dia, codigo_tipo(tipo),
+                                tuple(sorted(json.loads(efeitos).items())))
+                 for seq, dia, tipo, efeitos in linhas]
+    return HistoricoEventos(registros=registros,
+                            arquivados=registros[0].seq if registros else 0)
@@ -0,0 +1,447 @@
+"""
+Armazenamento vetorizado dos colonos da colônia.
+Demonstra: Encapsulamento, Composição
+"""
+from models.colono import Colono
+from models.aleatorio import GeradorAleatorio
+import uuid
+
+try:
+    import numpy as np
+    NUMPY_DISPONIVEL = True
+except ImportError:
+    np = None
+    NUMPY_DISPONIVEL = False
+
+
+# Gerador padrão usado quando a colônia não fornece o seu
+_rng_padrao = GeradorAleatorio()
+
+
+class ListaPreguicosa:
+    """
+    Lista cujos itens são decodificados só quando lidos (ex.: IDs e nomes
+    de colonos em um save mapeado na memória). Iterar, fatiar, alterar ou
+    acrescentar decodifica a lista inteira de uma vez. Ao ser copiada ou
+    serializada com pickle vira uma lista comum.
+    """
+
+    def __init__(self, n: int, obter_item, obter_todos):
+        """
+        Args:
+            n: Número de itens
+            obter_item: Função (índice) -> item
+            obter_todos: Função () -> lista com todos os itens
+        """
+        self.__n = n
+        self.__obter_item = obter_item
+        self.__obter_todos = obter_todos
+        self.__lidos = {}
+        self.__lista = None
+
+    def materializar(self) -> list:
+        """Decodifica todos os itens (uma vez) e retorna a lista."""
+        if self.__lista is None:
+            self.__lista = self.__obter_todos()
+            self.__lidos = None
+        return self.__lista
+
+    def __len__(self) -> int:
+        """Retorna o número de itens."""
+        return self.__n if self.__lista is None else len(self.__lista)
+
+    def __getitem__(self, indice):
+        """Lê um item (decodificado na primeira leitura) ou uma fatia."""
+        if self.__lista is not None or isinstance(indice, slice):
+            return self.materializar()[indice]
+        if indice < 0:
+            indice += self.__n
+        if not 0 <= indice < self.__n:
+            raise IndexError("Índice fora da lista")
+        if indice not in self.__lidos:
+            self.__lidos[indice] = self.__obter_item(indice)
+        return self.__lidos[indice]
+
+    def __setitem__(self, indice, valor):
+        """Altera um item."""
+        self.materializar()[indice] = valor
+
+    def __iter__(self):
+        """Itera sobre todos os itens."""
+        return iter(self.materializar())
+
+    def __eq__(self, outra) -> bool:
+        """Compara os itens com outra sequência."""
+        return list(self) == list(outra)
+
+    def append(self, item):
+        """Acrescenta um item."""
+        self.materializar().append(item)
+
+    def __reduce__(self):
+        """Copiada ou serializada como lista comum."""
+        return (list, (self.materializar(),))
+
+
+class PopulacaoColonos:
+    """
+    Guarda os colonos em colunas NumPy, uma linha por colono.
+    Cada fase do turno é executada como uma única operação em lote.
+    """
+
+    CAPACIDADE_INICIAL = 16
+
+    # Colunas numéricas e seus tipos
+    COLUNAS = {
+        'saude': 'int16',
+        'felicidade': 'int16',
+        'produtividade': 'float64',
+        'dias_trabalhados': 'int32',
+        'profissao': 'int8'
+    }
+
+    def __init__(self):
+        """Inicializa uma população vazia."""
+        if not NUMPY_DISPONIVEL:
+            raise RuntimeError("O motor vetorizado de colonos requer NumPy")
+
+        self.__total = 0
+        self._observador = None  # Repassado às vistas ColonoVista
+        self.__ids = []
+        self.__nomes = []
+        self.__colunas = {
+            nome: np.zeros(self.CAPACIDADE_INICIAL, dtype=tipo)
+            for nome, tipo in self.COLUNAS.items()
+        }
+        self.__bonus_profissao = np.array(
+            [Colono.BONUS_PROFISSAO.get(p, 1.0) for p in Colono.PROFISSOES]
+        )
+
+    def __len__(self) -> int:
+        """Retorna o número de colonos (vivos e mortos)."""
+        return self.__total
+
+    # Colunas (fatias ativas, sem cópia)
+    def coluna(self, nome: str):
+        """Retorna a coluna ativa com o nome dado."""
+        return self.__colunas[nome][:self.__total]
+
+    @property
+    def saude(self):
+        """Coluna de saúde."""
+        return self.coluna('saude')
+
+    @property
+    def felicidade(self):
+        """Coluna de felicidade."""
+        return self.coluna('felicidade')
+
+    @property
+    def produtividade(self):
+        """Coluna de produtividade."""
+        return self.coluna('produtividade')
+
+    @property
+    def dias_trabalhados(self):
+        """Coluna de dias trabalhados."""
+        return self.coluna('dias_trabalhados')
+
+    @property
+    def profissao(self):
+        """Coluna com o código da profissão (índice em Colono.PROFISSOES)."""
+        return self.coluna('profissao')
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes ocupados pelas colunas numéricas (capacidade alocada)."""
+        return sum(coluna.nbytes for coluna in self.__colunas.values())
+
+    @property
+    def ids(self) -> list:
+        """Retorna os IDs dos colonos."""
+        return self.__ids
+
+    @property
+    def nomes(self) -> list:
+        """Retorna os nomes dos colonos."""
+        return self.__nomes
+
+    def _garantir_capacidade(self, necessario: int):
+        """Aumenta as colunas (dobrando) se necessário."""
+        capacidade = len(self.__colunas['saude'])
+        if necessario <= capacidade:
+            return
+
+        while capacidade < necessario:
+            capacidade *= 2
+
+        for nome, antiga in self.__colunas.items():
+            nova = np.zeros(capacidade, dtype=antiga.dtype)
+            nova[:self.__total] = antiga[:self.__total]
+            self.__colunas[nome] = nova
+
+    def adicionar(self, nome: str, profissao: str = None, rng=None) -> int:
+        """
+        Adiciona um colono com os valores iniciais de Colono.
+
+        Args:
+            nome: Nome do colono
+            profissao: Profissão do colono (aleatória se não especificada)
+            rng: Gerador usado para sortear a profissão
+
+        Returns:
+            Índice da linha do novo colono
+        """
+        profissao = profissao or (rng or _rng_padrao).choice(Colono.PROFISSOES)
+        if profissao not in Colono.PROFISSOES:
+            raise ValueError(f"Profissão inválida. Escolha entre: {', '.join(Colono.PROFISSOES)}")
+
+        indice = self.__total
+        self._garantir_capacidade(indice + 1)
+
+        self.__colunas['saude'][indice] = 100
+        self.__colunas['felicidade'][indice] = 80
+        self.__colunas['produtividade'][indice] = 1.0
+        self.__colunas['dias_trabalhados'][indice] = 0
+        self.__colunas['profissao'][indice] = Colono.PROFISSOES.index(profissao)
+        self.__ids.append(str(uuid.uuid4()))
+        self.__nomes.append(nome)
+        self.__total += 1
+        return indice
+
+    def colono(self, indice: int) -> 'ColonoVista':
+        """Retorna um Colono que lê e escreve diretamente na linha dada."""
+        if not 0 <= indice < self.__total:
+            raise IndexError("Índice de colono fora do intervalo")
+        return ColonoVista(self, indice)
+
+    def colonos(self) -> list:
+        """Retorna uma vista Colono para cada linha."""
+        return [ColonoVista(self, i) for i in range(self.__total)]
+
+    # Consultas
+    def mascara_vivos(self):
+        """Retorna máscara booleana dos colonos vivos."""
+        return self.saude > 0
+
+    def indices_vivos(self):
+        """Retorna os índices dos colonos vivos, em ordem."""
+        return np.flatnonzero(self.mascara_vivos())
+
+    def indices_filtrados(self, inicio: int = 0, vivos: bool = None, profissao: str = None):
+        """
+        Retorna, em ordem, os índices a partir de `inicio` dos colonos que
+        passam nos filtros.
+
+        Args:
+            inicio: Primeiro índice considerado
+            vivos: True só vivos, False só mortos, None todos
+            profissao: Só colonos desta profissão (None: todas)
+        """
+        mascara = np.ones(max(0, self.__total - inicio), dtype=bool)
+        if vivos is not None:
+            mascara &= (self.saude[inicio:] > 0) == vivos
+        if profissao is not None:
+            mascara &= self.profissao[inicio:] == Colono.PROFISSOES.index(profissao)
+        return np.flatnonzero(mascara) + inicio
+
+    def total_vivos(self) -> int:
+        """Retorna o número de colonos vivos."""
+        return int(np.count_nonzero(self.mascara_vivos()))
+
+    def total_mortos(self) -> int:
+        """Retorna o número de colonos mortos."""
+        return self.__total - self.total_vivos()
+
+    def somas_vivos(self) -> tuple:
+        """Retorna (soma_saude, soma_felicidade) dos colonos vivos."""
+        vivos = self.mascara_vivos()
+        return (int(self.saude[vivos].sum(dtype=np.int64)),
+                int(self.felicidade[vivos].sum(dtype=np.int64)))
+
+    # Fases do turno (equivalentes aos métodos de Colono)
+    def trabalhar(self, rng: GeradorAleatorio = None):
+        """Equivalente vetorizado de Colono.trabalhar para todos os vivos."""
+        rng = rng or _rng_padrao
+        vivos = self.indices_vivos()
+        if len(vivos) == 0:
+            return
+
+        saude = self.saude
+        felicidade = self.felicidade
+
+        self.dias_trabalhados[vivos] += 1
+        self.produtividade[vivos] = (
+            (saude[vivos] / 100) * (felicidade[vivos] / 100) * 1.5
+            * self.__bonus_profissao[self.profissao[vivos]]
+        )
+
+        # Trabalho causa pequeno desgaste
+        saude[vivos] -= rng.lote_inteiros(1, 3, len(vivos))
+        felicidade[vivos] -= rng.lote_inteiros(1, 2, len(vivos))
+
+    def consumir_recursos(self, indices, comida_disponivel: float,
+                          agua_disponivel: float) -> tuple:
+        """
+        Equivalente vetorizado de Colono.consumir_recursos.
+        Os colonos são servidos na ordem dos índices até o recurso acabar.
+
+        Args:
+            indices: Índices dos colonos que consomem
+            comida_disponivel: Quantidade de comida disponível
+            agua_disponivel: Quantidade de água disponível
+
+        Returns:
+            Tupla (comida_consumida, agua_consumida) totais
+        """
+        n = len(indices)
+        if n == 0:
+            return (0, 0)
+
+        comida_consumida, servidos_comida = self._racionar(
+            n, comida_disponivel, Colono.CONSUMO_COMIDA)
+        agua_consumida, servidos_agua = self._racionar(
+            n, agua_disponivel, Colono.CONSUMO_AGUA)
+
+        # Penalidades por falta de recursos
+        if servidos_comida < n:
+            faltou = indices[servidos_comida:]
+            self.saude[faltou] -= 10
+            self.felicidade[faltou] -= 15
+
+        if servidos_agua < n:
+            faltou = indices[servidos_agua:]
+            self.saude[faltou] -= 15
+            self.felicidade[faltou] -= 10
+
+        return (comida_consumida, agua_consumida)
+
+    @staticmethod
+    def _racionar(n: int, disponivel: float, consumo: float) -> tuple:
+        """
+        Divide um recurso entre n colonos servidos em sequência.
+
+        Returns:
+            Tupla (total_consumido, quantos_receberam_tudo)
+        """
+        atendidos = min(n, int(disponivel // consumo))
+        return (min(disponivel, n * consumo), atendidos)
+
+    def receber_cuidados_medicos(self, indices, vezes: int = 1):
+        """
+        Equivalente vetorizado de Colono.receber_cuidados_medicos,
+        aplicado `vezes` vezes seguidas.
+        """
+        if vezes <= 0 or len(indices) == 0:
+            return
+
+        indices = indices[self.saude[indices] > 0]
+        saude = self.saude[indices].astype(np.int64)
+        felicidade = self.felicidade[indices].astype(np.int64)
+        self.saude[indices] = np.minimum(100, saude + 20 * vezes)
+        self.felicidade[indices] = np.minimum(100, felicidade + 5 * vezes)
+
+    def ajustar(self, indices, saude: int = 0, felicidade: int = 0):
+        """
+        Soma valores às colunas aplicando o mesmo limite (0-100)
+        dos setters de Colono.
+        """
+        # Soma em int64: bônus acumulados podem passar do limite de int16
+        if saude:
+            self.saude[indices] = np.clip(self.saude[indices].astype(np.int64) + saude, 0, 100)
+        if felicidade:
+            self.felicidade[indices] = np.clip(
+                self.felicidade[indices].astype(np.int64) + felicidade, 0, 100)
+
+    def atualizar(self, rng: GeradorAleatorio = None):
+        """Equivalente vetorizado de Colono.atualizar para todos os vivos."""
+        rng = rng or _rng_padrao
+        vivos = self.indices_vivos()
+        if len(vivos) == 0:
+            return
+
+        # Degradação natural leve (10% de chance)
+        sorteados = vivos[rng.lote_uniforme(len(vivos)) < 0.1]
+        self.felicidade[sorteados] = np.maximum(0, self.felicidade[sorteados] - 1)
+
+    # Persistência
+    def __getstate__(self) -> dict:
+        """Salva apenas as linhas ocupadas das colunas."""
+        estado = self.__dict__.copy()
+        estado['_PopulacaoColonos__colunas'] = {
+            nome: coluna[:self.__total].copy()
+            for nome, coluna in self.__colunas.items()
+        }
+        return estado
+
+    def __setstate__(self, estado: dict):
+        """Restaura a população a partir do estado salvo."""
+        self.__dict__.update(estado)
+        self._garantir_capacidade(max(self.__total, self.CAPACIDADE_INICIAL))
+
+
+def _coluna_vista(nome: str, conversor):
+    """Cria uma property que lê/escreve uma coluna da população."""
+    def obter(self):
+        return conversor(self._populacao.coluna(nome)[self._indice])
+
+    def definir(self, valor):
+        self._populacao.coluna(nome)[self._indice] = valor
+
+    return property(obter, definir)
+
+
+def _lista_vista(nome: str):
+    """Cria uma property que lê/escreve uma lista da população."""
+    def obter(self):
+        return getattr(self._populacao, nome)[self._indice]
+
+    def definir(self, valor):
+        getattr(self._populacao, nome)[self._indice] = valor
+
+    return property(obter, definir)
+
+
+def _obter_profissao(self) -> str:
+    return Colono.PROFISSOES[int(self._populacao.profissao[self._indice])]
+
+
+def _definir_profissao(self, valor: str):
+    self._populacao.profissao[self._indice] = Colono.PROFISSOES.index(valor)
+
+
+class ColonoVista(Colono):
+    """
+    Colono cujo estado fica em uma linha de PopulacaoColonos.
+    Os atributos privados de Colono e Entidade são redirecionados
+    para as colunas, então todos os métodos de Colono funcionam sem cópia.
+    """
+
+    _Colono__saude = _coluna_vista('saude', int)
+    _Colono__felicidade = _coluna_vista('felicidade', int)
+    _Colono__produtividade = _coluna_vista('produtividade', float)
+    _Colono__dias_trabalhados = _coluna_vista('dias_trabalhados', int)
+    _Colono__profissao = property(_obter_profissao, _definir_profissao)
+    _Entidade__id = _lista_vista('ids')
+    _Entidade__nome = _lista_vista('nomes')
+    # A descrição é derivada da profissão
+    _Entidade__descricao = property(
+        lambda self: f"Colono trabalhando como {self.profissao}",
+        lambda self, valor: None
+    )
+
+    @property
+    def _observador(self):
+        """O observador é o da população."""
+        return self._populacao._observador
+
+    def __init__(self, populacao: PopulacaoColonos, indice: int):
+        """
+        Cria a vista sobre uma linha.
+
+        Args:
+            populacao: População que guarda os dados
+            indice: Linha do colono
+        """
+        self._populacao = populacao
+        self._indice = indice
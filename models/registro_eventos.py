@@ -0,0 +1,292 @@
+"""
+Histórico compacto de eventos: anel de eventos recentes em memória e
+arquivo em disco, somente de acréscimo, para os mais antigos.
+Demonstra: Encapsulamento, Composição
+"""
+from models.evento import EventoAleatorio
+from collections import deque
+from typing import NamedTuple
+import json
+import os
+
+
+_CODIGOS_TIPOS = {tipo: codigo for codigo, tipo in enumerate(EventoAleatorio.TIPOS)}
+
+
+class RegistroEvento(NamedTuple):
+    """Evento ocorrido: sequência, dia, id do tipo e efeitos aplicados."""
+    seq: int
+    dia: int
+    tipo: int  # Índice em EventoAleatorio.TIPOS
+    efeitos: tuple  # Pares (efeito, valor)
+
+    @property
+    def nome_tipo(self) -> str:
+        """Retorna o nome do tipo do evento."""
+        return EventoAleatorio.TIPOS[self.tipo]
+
+    def to_dict(self) -> dict:
+        """Converte o registro para dicionário (nome e descrição vêm do catálogo)."""
+        dados = EventoAleatorio.dados_do_tipo(self.nome_tipo)
+        return {
+            'seq': self.seq,
+            'dia': self.dia,
+            'tipo': self.nome_tipo,
+            'nome': dados.get('nome', self.nome_tipo),
+            'descricao': dados.get('descricao', ''),
+            'efeitos': dict(self.efeitos)
+        }
+
+
+def codigo_tipo(tipo: str) -> int:
+    """
+    Retorna o id estável de um tipo de evento.
+
+    Args:
+        tipo: Nome do tipo (ver EventoAleatorio.TIPOS)
+    """
+    if tipo not in _CODIGOS_TIPOS:
+        raise ValueError(f"Tipo de evento sem id estável: {tipo}")
+    return _CODIGOS_TIPOS[tipo]
+
+
+class HistoricoEventos:
+    """
+    Histórico de eventos da colônia com memória limitada.
+
+    Os `capacidade` eventos mais recentes ficam em um anel na memória.
+    Os que saem do anel aguardam em `pendentes` até o próximo save, que
+    os acrescenta ao arquivo de eventos (uma linha JSON
+    [seq, dia, tipo, efeitos] por evento, em ordem) e os remove do
+    estado salvo. Assim o tamanho do save não cresce com a idade da
+    colônia.
+
+    Os eventos antes de `arquivados` estão no arquivo. Ao vincular um
+    arquivo, linhas a partir de `arquivados` (de um save que não chegou
+    ao disco, de uma linha do tempo abandonada ou de outra colônia) são
+    cortadas: ou estão nos pendentes, ou serão refeitas pelo diário.
+    """
+
+    CAPACIDADE_PADRAO = int(os.environ.get('COLONIA_EVENTOS_RECENTES', 50))
+
+    def __init__(self, capacidade: int = None, registros: list = (), arquivados: int = 0):
+        """
+        Inicializa o histórico.
+
+        Args:
+            capacidade: Tamanho do anel de eventos recentes
+            registros: Registros ainda não arquivados, em ordem (ao carregar um save)
+            arquivados: Quantos eventos já estão no arquivo
+        """
+        if capacidade is None:
+            capacidade = self.CAPACIDADE_PADRAO
+        if capacidade < 1:
+            raise ValueError("Capacidade deve ser maior que 0")
+
+        self.__capacidade = capacidade
+        self.__recentes = deque(maxlen=capacidade)
+        self.__pendentes = []  # Saíram do anel e ainda não foram arquivados
+        self.__arquivados = arquivados
+        self.__total = arquivados
+        self.__arquivo = None
+        for registro in registros:
+            self._adicionar(registro)
+
+    @classmethod
+    def de_eventos(cls, eventos: list) -> 'HistoricoEventos':
+        """
+        Converte uma lista de EventoAleatorio (saves antigos, sem o dia
+        de cada evento: dia 0).
+
+        Args:
+            eventos: Eventos em ordem
+        """
+        historico = cls()
+        for evento in eventos:
+            historico.registrar(0, evento)
+        return historico
+
+    @property
+    def capacidade(self) -> int:
+        """Retorna o tamanho do anel de eventos recentes."""
+        return self.__capacidade
+
+    @property
+    def total(self) -> int:
+        """Retorna o total de eventos desde o início da colônia."""
+        return self.__total
+
+    @property
+    def arquivados(self) -> int:
+        """Retorna quantos eventos estão no arquivo."""
+        return self.__arquivados
+
+    @property
+    def arquivo(self) -> str:
+        """Retorna o caminho do arquivo de eventos (None se não vinculado)."""
+        return self.__arquivo
+
+    def __len__(self) -> int:
+        """Retorna o total de eventos."""
+        return self.__total
+
+    def registros(self) -> list:
+        """Retorna os registros ainda não arquivados (pendentes e recentes), em ordem."""
+        return self.__pendentes + list(self.__recentes)
+
+    def ultimos(self, n: int) -> list:
+        """Retorna os `n` registros mais recentes, do mais antigo ao mais novo."""
+        if n <= 0:
+            return []
+        inicio = max(0, len(self.__recentes) - n)
+        return [self.__recentes[i] for i in range(inicio, len(self.__recentes))]
+
+    def registrar(self, dia: int, evento: EventoAleatorio) -> RegistroEvento:
+        """
+        Registra um evento aplicado.
+
+        Args:
+            dia: Dia em que ocorreu
+            evento: Evento aplicado
+
+        Returns:
+            Registro criado
+        """
+        registro = RegistroEvento(self.__total, dia, codigo_tipo(evento.tipo),
+                                  tuple(sorted(evento.efeitos.items())))
+        self._adicionar(registro)
+        return registro
+
+    def _adicionar(self, registro: RegistroEvento):
+        """Põe o registro no anel; o mais antigo passa para os pendentes."""
+        if len(self.__recentes) == self.__capacidade:
+            self.__pendentes.append(self.__recentes[0])
+        self.__recentes.append(registro)
+        self.__total = registro.seq + 1
+
+    # ------------------------------------------------------------------
+    # Arquivo
+    # ------------------------------------------------------------------
+
+    def vincular(self, arquivo: str):
+        """
+        Associa o histórico ao arquivo de eventos do save, cortando as
+        linhas que não pertencem a este estado (seq >= arquivados).
+
+        Args:
+            arquivo: Caminho do arquivo de eventos
+        """
+        self.__arquivo = arquivo
+        if not os.path.exists(arquivo):
+            return
+
+        with open(arquivo, 'r+b') as f:
+            tamanho = os.fstat(f.fileno()).st_size
+            corte = self._buscar(f, tamanho, lambda r: r.seq >= self.__arquivados)
+            if corte < tamanho:
+                f.truncate(corte)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def arquivar_pendentes(self):
+        """
+        Acrescenta os pendentes ao arquivo (com fsync) e os remove da
+        memória. Chamado antes de capturar o estado para um save.
+        """
+        if not self.__pendentes or self.__arquivo is None:
+            return
+
+        conteudo = ''.join(
+            json.dumps([r.seq, r.dia, r.tipo, dict(r.efeitos)], separators=(',', ':')) + '\n'
+            for r in self.__pendentes
+        )
+        diretorio = os.path.dirname(self.__arquivo)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        with open(self.__arquivo, 'ab') as f:
+            f.write(conteudo.encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.__arquivados = self.__pendentes[-1].seq + 1
+        self.__pendentes = []
+
+    def consultar(self, dia_inicial: int = None, dia_final: int = None) -> list:
+        """
+        Retorna os eventos de um intervalo de dias (arquivo e memória).
+        A busca no arquivo é binária pelo dia, sem lê-lo inteiro.
+
+        Args:
+            dia_inicial: Primeiro dia (inclusive; padrão: desde o início)
+            dia_final: Último dia (inclusive; padrão: até hoje)
+
+        Returns:
+            Lista de RegistroEvento em ordem
+        """
+        def no_intervalo(registro):
+            return ((dia_inicial is None or registro.dia >= dia_inicial)
+                    and (dia_final is None or registro.dia <= dia_final))
+
+        registros = []
+        if self.__arquivo is not None and os.path.exists(self.__arquivo):
+            with open(self.__arquivo, 'rb') as f:
+                tamanho = os.fstat(f.fileno()).st_size
+                inicio = 0
+                if dia_inicial is not None:
+                    inicio = self._buscar(f, tamanho, lambda r: r.dia >= dia_inicial)
+                f.seek(inicio)
+                for linha in f:
+                    registro = self._decodificar(linha)
+                    if registro is None or registro.seq >= self.__arquivados:
+                        break
+                    if dia_final is not None and registro.dia > dia_final:
+                        break
+                    registros.append(registro)
+
+        registros.extend(r for r in self.registros() if no_intervalo(r))
+        return registros
+
+    @staticmethod
+    def _decodificar(linha: bytes):
+        """Converte uma linha do arquivo em registro (None se incompleta)."""
+        if not linha.endswith(b'\n'):
+            return None  # Gravação interrompida
+        try:
+            seq, dia, tipo, efeitos = json.loads(linha)
+        except ValueError:
+            return None
+        return RegistroEvento(seq, dia, tipo, tuple(sorted(efeitos.items())))
+
+    @classmethod
+    def _buscar(cls, f, tamanho: int, condicao) -> int:
+        """
+        Busca binária no arquivo: posição da primeira linha que satisfaz
+        `condicao` (monotônica ao longo do arquivo) ou é inválida.
+        Retorna `tamanho` se nenhuma linha satisfizer.
+        """
+        def linha_em(posicao):
+            # Primeira linha que começa em `posicao` ou depois
+            if posicao > 0:
+                f.seek(posicao - 1)
+                f.readline()
+            else:
+                f.seek(0)
+            inicio = f.tell()
+            return inicio, f.readline()
+
+        baixo, alto = 0, tamanho
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            _, linha = linha_em(meio)
+            registro = cls._decodificar(linha) if linha else None
+            if registro is None or condicao(registro):
+                alto = meio
+            else:
+                baixo = meio + 1
+        return linha_em(baixo)[0]
+
+    def __getstate__(self) -> dict:
+        """Estado salvo: o vínculo com o arquivo é refeito ao carregar."""
+        estado = self.__dict__.copy()
+        estado['_HistoricoEventos__arquivo'] = None
+        return estado
@@ -0,0 +1,311 @@
+"""
+Gravação segura e em segundo plano dos saves.
+Demonstra: Encapsulamento, Composição
+"""
+import atexit
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+    TRAVAS_DISPONIVEIS = True
+except ImportError:
+    fcntl = None
+    TRAVAS_DISPONIVEIS = False
+
+
+# A umask só pode ser lida trocando-a; lida uma vez, antes das threads de gravação
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _modo_arquivo(caminho: str) -> int:
+    """Modo de permissão do arquivo existente, ou o padrão para um novo."""
+    try:
+        return os.stat(caminho).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def escrever_atomico(caminho: str, dados: bytes):
+    """
+    Grava um arquivo sem risco de deixá-lo pela metade: escreve em um
+    temporário no mesmo diretório, força o disco (fsync) e substitui o
+    original com os.replace (atômico).
+
+    Args:
+        caminho: Caminho final do arquivo
+        dados: Conteúdo completo
+    """
+    diretorio = os.path.dirname(caminho) or '.'
+    os.makedirs(diretorio, exist_ok=True)
+
+    descritor, temporario = tempfile.mkstemp(
+        dir=diretorio, prefix=f".{os.path.basename(caminho)}.", suffix='.tmp'
+    )
+    try:
+        # mkstemp cria com modo 0600: mantém o modo do arquivo substituído
+        # (ou o padrão de open(), 0666 menos a umask)
+        if hasattr(os, 'fchmod'):
+            os.fchmod(descritor, _modo_arquivo(caminho))
+        with os.fdopen(descritor, 'wb') as f:
+            f.write(dados)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+    # Persiste a entrada do diretório (nem todo sistema permite abrir diretórios)
+    try:
+        descritor_dir = os.open(diretorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descritor_dir)
+    except OSError:
+        pass
+    finally:
+        os.close(descritor_dir)
+
+
+class TravaArquivo:
+    """
+    Trava exclusiva entre processos sobre um arquivo (flock), para que
+    dois processos do servidor nunca gravem a mesma colônia. A trava é
+    liberada pelo sistema se o processo terminar.
+
+    Sem fcntl (ex.: Windows) a trava sempre é obtida: vale só para um
+    processo.
+    """
+
+    def __init__(self, caminho: str):
+        """
+        Prepara a trava (ainda não adquirida).
+
+        Args:
+            caminho: Arquivo da trava (criado se não existir)
+        """
+        self.__caminho = caminho
+        self.__descritor = None
+
+    @property
+    def caminho(self) -> str:
+        """Retorna o caminho do arquivo da trava."""
+        return self.__caminho
+
+    @property
+    def adquirida(self) -> bool:
+        """Indica se este objeto detém a trava."""
+        return self.__descritor is not None
+
+    def adquirir(self) -> bool:
+        """
+        Tenta adquirir a trava sem esperar.
+
+        Returns:
+            True se adquirida (ou já detida), False se outro processo a detém
+        """
+        if self.__descritor is not None:
+            return True
+
+        diretorio = os.path.dirname(self.__caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        descritor = os.open(self.__caminho, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(descritor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(descritor)
+                return False
+        self.__descritor = descritor
+        return True
+
+    def liberar(self):
+        """Libera a trava (o arquivo fica, vazio, para a próxima vez)."""
+        if self.__descritor is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self.__descritor, fcntl.LOCK_UN)
+        os.close(self.__descritor)
+        self.__descritor = None
+
+
+class SalvadorBackground:
+    """
+    Salva colônias em uma thread separada (write-behind).
+
+    marcar_sujo() apenas anota que a colônia precisa ser gravada; a thread
+    espera `janela` segundos para juntar uma rajada de ações e grava o
+    estado mais recente uma única vez. aguardar() é a barreira usada no
+    logout e no encerramento para garantir que tudo foi para o disco.
+
+    O estado é capturado (colonia.preparar_salvamento) com a trava da
+    colônia adquirida (a do seu diário de ações, passada a marcar_sujo):
+    quem altera a colônia deve segurar a mesma trava. Colônias diferentes
+    têm travas diferentes e não esperam umas pelas outras.
+    """
+
+    JANELA_PADRAO = 0.5  # Segundos para agrupar ações antes de gravar
+
+    def __init__(self, janela: float = JANELA_PADRAO):
+        """
+        Inicializa o salvador (a thread é criada no primeiro uso).
+
+        Args:
+            janela: Tempo de espera para agrupar rajadas de ações
+        """
+        self.__janela = janela
+        self.__trava = threading.RLock()  # Para colônias sem trava própria
+        self.__condicao = threading.Condition()
+        self.__pendentes = {}  # caminho -> (colonia, marcador, ao_concluir, trava)
+        self.__gravando = None  # Caminho em gravação no momento
+        self.__urgente = False  # Pula a janela de agrupamento (barreira)
+        self.__falhas = {}  # caminho -> última exceção ao gravar
+        self.__thread = None
+        self.__encerrado = False
+        self.__estatisticas = {'gravacoes': 0, 'agrupadas': 0, 'erros': 0}
+        atexit.register(self.encerrar)
+
+    @property
+    def trava(self) -> threading.RLock:
+        """Trava usada na serialização das colônias marcadas sem trava própria."""
+        return self.__trava
+
+    @property
+    def estatisticas(self) -> dict:
+        """Retorna contadores de gravações, pedidos agrupados e erros."""
+        with self.__condicao:
+            return dict(self.__estatisticas, pendentes=len(self.__pendentes),
+                        falhas={c: repr(e) for c, e in self.__falhas.items()})
+
+    def marcar_sujo(self, colonia, caminho: str, marcador=None, ao_concluir=None, trava=None):
+        """
+        Agenda a gravação da colônia. Pedidos para o mesmo caminho ainda
+        não gravados são agrupados (vale o último).
+
+        Args:
+            colonia: Colônia a gravar (com colonia.preparar_salvamento())
+            caminho: Caminho do save
+            marcador: Função chamada junto com a serialização, com a trava
+                      adquirida; seu retorno é repassado a ao_concluir
+            ao_concluir: Função chamada (na thread) após a gravação durável
+            trava: Trava da colônia, segurada durante a serialização
+                   (padrão: a trava do salvador)
+        """
+        with self.__condicao:
+            if self.__encerrado:
+                raise RuntimeError("Salvador encerrado")
+            if caminho in self.__pendentes:
+                self.__estatisticas['agrupadas'] += 1
+            self.__pendentes[caminho] = (colonia, marcador, ao_concluir, trava or self.__trava)
+            self._iniciar_thread()
+            self.__condicao.notify_all()
+
+    def aguardar(self, caminho: str = None, timeout: float = None) -> bool:
+        """
+        Barreira: grava imediatamente o que estiver pendente e espera.
+
+        Args:
+            caminho: Espera só por este save (padrão: todos)
+            timeout: Tempo máximo de espera em segundos
+
+        Returns:
+            True se tudo foi gravado; False se o tempo acabou ou se a
+            última gravação falhou
+        """
+        def concluido():
+            if caminho is None:
+                return not self.__pendentes and self.__gravando is None
+            return caminho not in self.__pendentes and self.__gravando != caminho
+
+        with self.__condicao:
+            if self.__pendentes:
+                self.__urgente = True  # Não espera o fim da janela
+                self.__condicao.notify_all()
+            if not self.__condicao.wait_for(concluido, timeout):
+                return False
+            if caminho is None:
+                return not self.__falhas
+            return caminho not in self.__falhas
+
+    def descartar(self, caminho: str):
+        """
+        Cancela a gravação pendente de um save e espera uma gravação em
+        andamento terminar (ex.: antes de apagar o arquivo).
+
+        Args:
+            caminho: Caminho do save
+        """
+        with self.__condicao:
+            self.__pendentes.pop(caminho, None)
+            self.__condicao.wait_for(lambda: self.__gravando != caminho)
+            self.__falhas.pop(caminho, None)
+
+    def encerrar(self, timeout: float = None):
+        """
+        Grava tudo o que estiver pendente e para a thread.
+
+        Args:
+            timeout: Tempo máximo de espera em segundos
+        """
+        with self.__condicao:
+            if self.__encerrado:
+                return
+            self.__encerrado = True
+            self.__condicao.notify_all()
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+
+    def _iniciar_thread(self):
+        """Cria a thread de gravação se ainda não existir."""
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self._trabalhar, name='SalvadorBackground',
+                                             daemon=True)
+            self.__thread.start()
+
+    def _trabalhar(self):
+        """Laço da thread: agrupa pedidos e grava um por vez."""
+        while True:
+            with self.__condicao:
+                self.__condicao.wait_for(lambda: self.__pendentes or self.__encerrado)
+                if not self.__pendentes:
+                    return  # Encerrado sem nada pendente
+
+                # Janela de agrupamento (interrompida por aguardar/encerrar)
+                self.__condicao.wait_for(lambda: self.__urgente or self.__encerrado,
+                                         self.__janela)
+                if not self.__pendentes:
+                    self.__urgente = False
+                    continue  # Descartado durante a janela
+
+                caminho = next(iter(self.__pendentes))
+                colonia, marcador, ao_concluir, trava = self.__pendentes.pop(caminho)
+                if not self.__pendentes:
+                    self.__urgente = False
+                self.__gravando = caminho
+
+            erro = None
+            try:
+                with trava:
+                    gravar = colonia.preparar_salvamento(caminho)
+                    marca = marcador() if marcador else None
+                gravar()
+                if ao_concluir:
+                    ao_concluir(marca)
+            except Exception as e:
+                erro = e
+
+            with self.__condicao:
+                self.__gravando = None
+                if erro is None:
+                    self.__falhas.pop(caminho, None)
+                    self.__estatisticas['gravacoes'] += 1
+                else:
+                    self.__falhas[caminho] = erro
+                    self.__estatisticas['erros'] += 1
+                self.__condicao.notify_all()
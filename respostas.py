@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+Respostas HTTP mais leves: arquivos estáticos com impressão digital no
+nome (cache longo no navegador), compressão gzip, pré-calculada para os
+estáticos e feita na hora para as páginas e o JSON maiores, e JSON
+gerado em partes para as listagens grandes.
+"""
+from bottle import HTTPResponse, request, response
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import types
+import zlib
+
+
+# Corpos dinâmicos menores que isso vão sem compressão (não compensa)
+GZIP_MINIMO = int(os.environ.get('COLONIA_GZIP_MINIMO', 1024))
+GZIP_NIVEL = 6
+
+# Tipos de conteúdo comprimidos (em stream, só JSON: o SSE precisa chegar na hora)
+TIPOS_COMPRIMIVEIS = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+TIPOS_STREAM_COMPRIMIVEIS = ('application/json',)
+
+# Bytes de JSON acumulados antes de enviar uma parte
+TAMANHO_PARTE = 16 * 1024
+
+# Um ano: o nome muda quando o conteúdo muda
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+
+
+def aceita_gzip(accept_encoding: str) -> bool:
+    """
+    Verifica se o cabeçalho Accept-Encoding aceita gzip (sem 'q=0').
+
+    Args:
+        accept_encoding: Valor do cabeçalho (pode ser None)
+    """
+    for item in (accept_encoding or '').split(','):
+        partes = [parte.strip() for parte in item.split(';')]
+        if partes[0].lower() not in ('gzip', '*'):
+            continue
+        for parametro in partes[1:]:
+            nome, _, valor = parametro.partition('=')
+            if nome.strip().lower() == 'q':
+                try:
+                    return float(valor) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def etag_corresponde(if_none_match: str, etag: str) -> bool:
+    """
+    Verifica se o cabeçalho If-None-Match inclui a ETag (comparação fraca).
+
+    Args:
+        if_none_match: Valor do cabeçalho (pode ser None)
+        etag: ETag atual, com aspas
+    """
+    if not if_none_match:
+        return False
+    for etiqueta in if_none_match.split(','):
+        etiqueta = etiqueta.strip()
+        if etiqueta.startswith('W/'):
+            etiqueta = etiqueta[2:]
+        if etiqueta in ('*', etag):
+            return True
+    return False
+
+
+def comprimivel(tipo_conteudo: str) -> bool:
+    """Verifica se o tipo de conteúdo vale a pena comprimir."""
+    return (tipo_conteudo or 'text/html').startswith(TIPOS_COMPRIMIVEIS)
+
+
+def comprimir(dados: bytes, nivel: int = GZIP_NIVEL) -> bytes:
+    """Comprime com gzip (sem data no cabeçalho, para saída reprodutível)."""
+    return gzip.compress(dados, compresslevel=nivel, mtime=0)
+
+
+def comprimir_partes(partes, nivel: int = GZIP_NIVEL):
+    """
+    Comprime com gzip um corpo gerado em partes, sem juntá-lo na memória.
+
+    Args:
+        partes: Iterável de partes (bytes ou str UTF-8)
+        nivel: Nível de compressão gzip (1-9)
+
+    Yields:
+        Partes comprimidas
+    """
+    compressor = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # Formato gzip
+    for parte in partes:
+        if isinstance(parte, str):
+            parte = parte.encode('utf-8')
+        comprimido = compressor.compress(parte)
+        if comprimido:
+            yield comprimido
+    yield compressor.flush()
+
+
+def json_em_partes(itens, chave: str, antes: dict = None, depois=None,
+                   tamanho_parte: int = TAMANHO_PARTE):
+    """
+    Codifica em JSON um objeto com uma lista grande à medida que os itens
+    são produzidos, sem montar a lista nem o texto inteiro na memória:
+    {<antes...>, "<chave>": [<itens...>], <depois...>}.
+
+    Args:
+        itens: Iterável (ex.: gerador) com os itens da lista
+        chave: Chave da lista no objeto
+        antes: Campos escritos antes da lista
+        depois: Função chamada depois de consumir os itens que retorna os
+                campos escritos depois da lista (ex.: o cursor da próxima página)
+        tamanho_parte: Bytes acumulados antes de gerar uma parte
+
+    Yields:
+        Partes do texto JSON (bytes UTF-8)
+    """
+    codificar = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    buffer = ['{']
+    for campo, valor in (antes or {}).items():
+        buffer.append(f'{codificar(campo)}:{codificar(valor)},')
+    buffer.append(f'{codificar(chave)}:[')
+    tamanho = 0
+    separador = ''
+    for item in itens:
+        texto = codificar(item)
+        buffer.append(separador + texto)
+        separador = ','
+        tamanho += len(texto)
+        if tamanho >= tamanho_parte:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+            tamanho = 0
+    buffer.append(']')
+    for campo, valor in (depois() if depois else {}).items():
+        buffer.append(f',{codificar(campo)}:{codificar(valor)}')
+    buffer.append('}')
+    yield ''.join(buffer).encode('utf-8')
+
+
+class ArquivoEstatico:
+    """Conteúdo de um arquivo estático, com a versão gzip e a impressão digital."""
+
+    def __init__(self, nome: str, dados: bytes):
+        """
+        Prepara o arquivo.
+
+        Args:
+            nome: Caminho relativo à pasta de estáticos (ex.: 'style.css')
+            dados: Conteúdo do arquivo
+        """
+        tipo, _ = mimetypes.guess_type(nome)
+        tipo = tipo or 'application/octet-stream'
+        if tipo.startswith('text/') or tipo == 'application/javascript':
+            tipo += '; charset=UTF-8'
+
+        self.nome = nome
+        self.tipo = tipo
+        self.dados = dados
+        self.impressao = hashlib.sha256(dados).hexdigest()[:12]
+        base, extensao = os.path.splitext(nome)
+        self.nome_versionado = f"{base}.{self.impressao}{extensao}"
+
+        # Variante .gz, guardada só se for menor
+        self.dados_gzip = None
+        if comprimivel(tipo):
+            dados_gzip = comprimir(dados, nivel=9)
+            if len(dados_gzip) < len(dados):
+                self.dados_gzip = dados_gzip
+
+
+class ArquivosEstaticos:
+    """
+    Arquivos da pasta de estáticos, lidos e comprimidos uma vez na
+    inicialização. Os templates apontam para o nome com a impressão digital
+    do conteúdo (url('style.css') -> '/static/style.<hash>.css'), servido com
+    cache de um ano; o nome original continua funcionando, com revalidação.
+    """
+
+    def __init__(self, pasta: str = 'static', prefixo: str = '/static/'):
+        """
+        Lê os arquivos da pasta (e subpastas).
+
+        Args:
+            pasta: Pasta dos arquivos estáticos
+            prefixo: Prefixo das URLs dos estáticos
+        """
+        self.__prefixo = prefixo
+        self.__arquivos = {}  # nome (original ou versionado) -> (ArquivoEstatico, versionado?)
+        for raiz, _, arquivos in os.walk(pasta):
+            for arquivo in sorted(arquivos):
+                caminho = os.path.join(raiz, arquivo)
+                nome = os.path.relpath(caminho, pasta).replace(os.sep, '/')
+                with open(caminho, 'rb') as f:
+                    estatico = ArquivoEstatico(nome, f.read())
+                self.__arquivos[nome] = (estatico, False)
+                self.__arquivos[estatico.nome_versionado] = (estatico, True)
+
+    def url(self, nome: str) -> str:
+        """
+        URL do arquivo com a impressão digital (usada nos templates).
+
+        Args:
+            nome: Nome do arquivo na pasta de estáticos
+
+        Returns:
+            URL versionada, ou a URL simples se o arquivo não é conhecido
+        """
+        encontrado = self.__arquivos.get(nome)
+        if encontrado is None:
+            return self.__prefixo + nome
+        return self.__prefixo + encontrado[0].nome_versionado
+
+    def responder(self, nome: str):
+        """
+        Resposta para o pedido de um arquivo estático: com cache de um ano
+        se o nome tem a impressão digital, senão com revalidação pela ETag
+        (304 se o navegador já tem o conteúdo); gzip se o cliente aceita.
+
+        Args:
+            nome: Caminho pedido, relativo à pasta de estáticos
+
+        Returns:
+            HTTPResponse, ou None se o arquivo não é conhecido
+        """
+        encontrado = self.__arquivos.get(nome)
+        if encontrado is None:
+            return None
+        estatico, versionado = encontrado
+
+        # Cada codificação tem a sua ETag (os bytes enviados são outros)
+        gzip_aceito = (estatico.dados_gzip is not None
+                       and aceita_gzip(request.get_header('Accept-Encoding')))
+        cabecalhos = {
+            'Content-Type': estatico.tipo,
+            'ETag': f'"{estatico.impressao}-gz"' if gzip_aceito else f'"{estatico.impressao}"',
+            'Cache-Control': CACHE_IMUTAVEL if versionado else 'no-cache',
+        }
+        if estatico.dados_gzip is not None:
+            cabecalhos['Vary'] = 'Accept-Encoding'
+
+        if etag_corresponde(request.get_header('If-None-Match'), cabecalhos['ETag']):
+            return HTTPResponse(status=304, **cabecalhos)
+
+        corpo = estatico.dados
+        if gzip_aceito:
+            corpo = estatico.dados_gzip
+            cabecalhos['Content-Encoding'] = 'gzip'
+        cabecalhos['Content-Length'] = str(len(corpo))
+        return HTTPResponse(b'' if request.method == 'HEAD' else corpo, **cabecalhos)
+
+
+class CompressaoGzip:
+    """
+    Plugin do Bottle que comprime com gzip as respostas HTML/JSON das rotas
+    quando o cliente aceita e o corpo tem pelo menos `minimo` bytes. JSON
+    gerado em partes (geradores) é comprimido parte a parte; os demais
+    streams (SSE), arquivos e redirecionamentos passam sem alteração.
+    Uso: app.install(CompressaoGzip())
+    """
+
+    name = 'gzip'
+    api = 2
+
+    def __init__(self, minimo: int = GZIP_MINIMO, nivel: int = GZIP_NIVEL):
+        """
+        Configura o plugin.
+
+        Args:
+            minimo: Tamanho mínimo do corpo (bytes) para comprimir
+            nivel: Nível de compressão gzip (1-9)
+        """
+        self.minimo = minimo
+        self.nivel = nivel
+
+    def apply(self, callback, rota):
+        """Envolve a rota, comprimindo o que ela retorna."""
+        def comprimindo(*args, **kwargs):
+            return self.comprimir_resposta(callback(*args, **kwargs))
+        return comprimindo
+
+    def comprimir_resposta(self, corpo):
+        """
+        Comprime o corpo retornado por uma rota, se couber.
+
+        Args:
+            corpo: Retorno da rota
+
+        Returns:
+            Corpo comprimido (bytes) com os cabeçalhos ajustados, ou o original
+        """
+        if 'Content-Encoding' in response:
+            return corpo
+        if isinstance(corpo, types.GeneratorType):
+            if not (response.content_type or '').startswith(TIPOS_STREAM_COMPRIMIVEIS):
+                return corpo
+            response.add_header('Vary', 'Accept-Encoding')
+            if not aceita_gzip(request.get_header('Accept-Encoding')):
+                return corpo
+            response.set_header('Content-Encoding', 'gzip')
+            return comprimir_partes(corpo, self.nivel)
+        if not isinstance(corpo, (str, bytes)):
+            return corpo
+        if not comprimivel(response.content_type):
+            return corpo
+        response.add_header('Vary', 'Accept-Encoding')
+
+        dados = corpo.encode(response.charset) if isinstance(corpo, str) else corpo
+        if len(dados) < self.minimo or not aceita_gzip(request.get_header('Accept-Encoding')):
+            return corpo
+
+        etag = response.get_header('ETag')
+        if etag and not etag.startswith('W/'):
+            # O corpo comprimido não é byte a byte o mesmo: a ETag vira fraca
+            response.set_header('ETag', 'W/' + etag)
+        response.set_header('Content-Encoding', 'gzip')
+        return comprimir(dados, self.nivel)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Servidor WSGI de produção: atende várias requisições ao mesmo tempo
+com um número configurável de threads de trabalho, em um único processo
+(o cache de colônias e as sessões ficam na memória desse processo).
+"""
+from bottle import ServerAdapter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, make_server
+import os
+
+
+TRABALHADORES_PADRAO = int(os.environ.get('COLONIA_TRABALHADORES', 8))
+
+
+class ServidorWSGIThreads(WSGIServer):
+    """
+    WSGIServer (biblioteca padrão) que atende cada conexão em uma thread
+    de um pool de tamanho fixo, em vez de uma conexão por vez. As
+    conexões além do pool esperam na fila do pool.
+    """
+
+    request_queue_size = 128
+
+    def __init__(self, endereco, classe_handler, trabalhadores: int = TRABALHADORES_PADRAO):
+        """
+        Cria o servidor e o pool de threads.
+
+        Args:
+            endereco: Tupla (host, porta)
+            classe_handler: Classe do handler das requisições
+            trabalhadores: Número de threads de trabalho
+        """
+        if trabalhadores < 1:
+            raise ValueError("Número de trabalhadores deve ser maior que 0")
+        self.trabalhadores = trabalhadores
+        self.__pool = ThreadPoolExecutor(max_workers=trabalhadores,
+                                         thread_name_prefix='Trabalhador')
+        super().__init__(endereco, classe_handler)
+
+    def process_request(self, request, client_address):
+        """Entrega a conexão a uma thread do pool."""
+        self.__pool.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        """Atende a conexão (na thread do pool) e a fecha."""
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        """Fecha o socket e espera as requisições em andamento."""
+        super().server_close()
+        self.__pool.shutdown(wait=True)
+
+
+class HandlerSilencioso(WSGIRequestHandler):
+    """Handler que não escreve cada requisição no stderr."""
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class ServidorThreads(ServerAdapter):
+    """
+    Adaptador do Bottle para o ServidorWSGIThreads.
+    Uso: run(app, server=ServidorThreads, trabalhadores=8)
+    """
+
+    def run(self, handler):
+        """Inicia o servidor e atende até ser interrompido."""
+        trabalhadores = self.options.get('trabalhadores', TRABALHADORES_PADRAO)
+        classe_handler = HandlerSilencioso if self.quiet else WSGIRequestHandler
+        servidor = make_server(self.host, self.port, handler,
+                               partial(ServidorWSGIThreads, trabalhadores=trabalhadores),
+                               classe_handler)
+        self.port = servidor.server_port
+        try:
+            servidor.serve_forever()
+        finally:
+            servidor.server_close()
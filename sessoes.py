@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Sessões dos jogadores: identificador em cookie e estado no servidor.
+Permite vários jogadores ao mesmo tempo, cada um com sua colônia.
+"""
+import os
+import secrets
+import threading
+import time
+
+
+class Sessao:
+    """
+    Sessão de um jogador autenticado.
+    A colônia não fica na sessão: a cada requisição ela é obtida do cache
+    de colônias pelo caminho do save (o "identificador" da colônia).
+    """
+
+    def __init__(self, id_sessao: str, usuario: dict, caminho_save: str):
+        """
+        Cria a sessão.
+
+        Args:
+            id_sessao: Identificador aleatório (valor do cookie)
+            usuario: Dicionário do usuário (ver usuarios.json)
+            caminho_save: Caminho do save da colônia do usuário
+        """
+        self.__id = id_sessao
+        self.__usuario = usuario
+        self.__caminho_save = caminho_save
+        self.__criada_em = time.time()
+        self.__ultimo_acesso = self.__criada_em
+
+    @property
+    def id(self) -> str:
+        """Retorna o identificador da sessão."""
+        return self.__id
+
+    @property
+    def usuario(self) -> dict:
+        """Retorna o usuário da sessão."""
+        return self.__usuario
+
+    @property
+    def username(self) -> str:
+        """Retorna o nome de usuário."""
+        return self.__usuario['username']
+
+    @property
+    def caminho_save(self) -> str:
+        """Retorna o caminho do save da colônia do usuário."""
+        return self.__caminho_save
+
+    @property
+    def criada_em(self) -> float:
+        """Retorna o instante de criação (epoch)."""
+        return self.__criada_em
+
+    @property
+    def ultimo_acesso(self) -> float:
+        """Retorna o instante do último acesso (epoch)."""
+        return self.__ultimo_acesso
+
+    def tocar(self, agora: float = None):
+        """Registra um acesso, adiando a expiração."""
+        self.__ultimo_acesso = time.time() if agora is None else agora
+
+
+class ArmazenamentoSessoes:
+    """
+    Sessões em memória, com expiração por inatividade.
+
+    As sessões expiradas são removidas na primeira leitura depois de
+    `intervalo_varredura` segundos da última varredura (sem thread
+    própria); uma sessão expirada nunca é devolvida, mesmo antes disso.
+    """
+
+    DURACAO_PADRAO = int(os.environ.get('COLONIA_SESSAO_MINUTOS', 120)) * 60
+    INTERVALO_VARREDURA_PADRAO = 60
+
+    def __init__(self, duracao: float = None, intervalo_varredura: float = None):
+        """
+        Inicializa o armazenamento vazio.
+
+        Args:
+            duracao: Segundos de inatividade até a sessão expirar
+            intervalo_varredura: Segundos entre varreduras das expiradas
+        """
+        if duracao is None:
+            duracao = self.DURACAO_PADRAO
+        if intervalo_varredura is None:
+            intervalo_varredura = self.INTERVALO_VARREDURA_PADRAO
+        if duracao <= 0:
+            raise ValueError("Duração da sessão deve ser maior que 0")
+
+        self.__duracao = duracao
+        self.__intervalo_varredura = intervalo_varredura
+        self.__sessoes = {}  # id -> Sessao
+        self.__trava = threading.Lock()
+        self.__ultima_varredura = time.time()
+        self.__estatisticas = {'criadas': 0, 'encerradas': 0, 'expiradas': 0}
+
+    @property
+    def duracao(self) -> float:
+        """Retorna os segundos de inatividade até a expiração."""
+        return self.__duracao
+
+    @property
+    def estatisticas(self) -> dict:
+        """Retorna contadores de sessões criadas, encerradas e expiradas."""
+        with self.__trava:
+            return dict(self.__estatisticas, ativas=len(self.__sessoes))
+
+    def __len__(self) -> int:
+        """Retorna o número de sessões guardadas."""
+        with self.__trava:
+            return len(self.__sessoes)
+
+    def criar(self, usuario: dict, caminho_save: str) -> Sessao:
+        """
+        Cria uma sessão para o usuário autenticado.
+
+        Args:
+            usuario: Dicionário do usuário
+            caminho_save: Caminho do save da colônia do usuário
+
+        Returns:
+            Sessão criada
+        """
+        sessao = Sessao(secrets.token_urlsafe(32), usuario, caminho_save)
+        with self.__trava:
+            self.__sessoes[sessao.id] = sessao
+            self.__estatisticas['criadas'] += 1
+        return sessao
+
+    def obter(self, id_sessao: str):
+        """
+        Retorna a sessão do identificador, registrando o acesso.
+
+        Args:
+            id_sessao: Identificador (valor do cookie; pode ser None)
+
+        Returns:
+            Sessão, ou None se não existir ou tiver expirado
+        """
+        agora = time.time()
+        with self.__trava:
+            if agora - self.__ultima_varredura >= self.__intervalo_varredura:
+                self._varrer(agora)
+
+            sessao = self.__sessoes.get(id_sessao) if id_sessao else None
+            if sessao is None:
+                return None
+            if agora - sessao.ultimo_acesso > self.__duracao:
+                del self.__sessoes[id_sessao]
+                self.__estatisticas['expiradas'] += 1
+                return None
+            sessao.tocar(agora)
+            return sessao
+
+    def encerrar(self, id_sessao: str):
+        """
+        Remove a sessão (logout).
+
+        Args:
+            id_sessao: Identificador da sessão
+        """
+        with self.__trava:
+            if self.__sessoes.pop(id_sessao, None) is not None:
+                self.__estatisticas['encerradas'] += 1
+
+    def varrer(self) -> int:
+        """
+        Remove as sessões expiradas.
+
+        Returns:
+            Número de sessões removidas
+        """
+        with self.__trava:
+            return self._varrer(time.time())
+
+    def _varrer(self, agora: float) -> int:
+        """Remove as sessões expiradas. Chamar com a trava."""
+        expiradas = [id_sessao for id_sessao, sessao in self.__sessoes.items()
+                     if agora - sessao.ultimo_acesso > self.__duracao]
+        for id_sessao in expiradas:
+            del self.__sessoes[id_sessao]
+        self.__estatisticas['expiradas'] += len(expiradas)
+        self.__ultima_varredura = agora
+        return len(expiradas)
@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+Simulação Monte Carlo sem interface, para ajustar o balanceamento.
+
+Executa N colônias a partir de um arquivo de cenário, aplica uma
+política roteirizada de construção e contratação e avança M dias em
+paralelo (ProcessPoolExecutor). Cada execução é gravada em uma linha
+JSONL assim que termina, e ao final é impresso um relatório com
+percentis de sobrevivência e curvas de recursos.
+
+Uso:
+    python3 simulacao.py cenarios/exemplo.json --execucoes 10000 --dias 365 \\
+        --saida resultados.jsonl --relatorio relatorio.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Adiciona o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import Colonia, Colono, EventoAleatorio, TIPOS_EDIFICIOS
+
+
+# Séries amostradas ao longo dos dias de cada execução
+SERIES = ['vivos', 'comida', 'agua', 'energia', 'metal']
+
+# Percentis reportados
+PERCENTIS = (5, 50, 95)
+
+# Cenário do processo atual (definido uma vez por processo)
+_cenario = None
+
+
+def carregar_cenario(caminho: str) -> dict:
+    """
+    Carrega e valida um arquivo de cenário.
+
+    Args:
+        caminho: Caminho do arquivo JSON
+
+    Returns:
+        Dicionário do cenário
+    """
+    with open(caminho, 'r', encoding='utf-8') as f:
+        cenario = json.load(f)
+
+    politica = cenario.get('politica', {})
+    tipos = [item['tipo'] for item in politica.get('construir', [])]
+    tipos += [regra['construir'] for regra in politica.get('regras', [])]
+    tipos += list(cenario.get('balanceamento', {}).get('custos', {}))
+    for tipo in tipos:
+        if tipo not in TIPOS_EDIFICIOS:
+            raise ValueError(f"Tipo de edifício inválido no cenário: {tipo}")
+
+    return cenario
+
+
+def aplicar_balanceamento(balanceamento: dict):
+    """
+    Sobrescreve as constantes de balanceamento das classes do modelo.
+    Chamado uma vez em cada processo, antes das execuções.
+
+    Args:
+        balanceamento: Seção 'balanceamento' do cenário
+    """
+    if 'chance_evento' in balanceamento:
+        EventoAleatorio.CHANCE_EVENTO = balanceamento['chance_evento']
+
+    probabilidades = balanceamento.get('eventos', {})
+    if probabilidades:
+        EventoAleatorio.EVENTOS = [
+            {**evento, 'probabilidade': probabilidades.get(evento['tipo'], evento['probabilidade'])}
+            for evento in EventoAleatorio.EVENTOS
+        ]
+
+    for tipo, custo in balanceamento.get('custos', {}).items():
+        TIPOS_EDIFICIOS[tipo].CUSTO_CONSTRUCAO = dict(custo)
+
+    if 'consumo_comida' in balanceamento:
+        Colono.CONSUMO_COMIDA = balanceamento['consumo_comida']
+    if 'consumo_agua' in balanceamento:
+        Colono.CONSUMO_AGUA = balanceamento['consumo_agua']
+
+
+def _inicializar_processo(cenario: dict):
+    """Inicializador dos processos: guarda o cenário e aplica o balanceamento."""
+    global _cenario
+    _cenario = cenario
+    aplicar_balanceamento(cenario.get('balanceamento', {}))
+
+
+def _aplicar_politica(colonia: Colonia, politica: dict, dia: int):
+    """
+    Aplica a política roteirizada no início de um dia.
+
+    Args:
+        colonia: Colônia simulada
+        politica: Seção 'politica' do cenário
+        dia: Dia atual da colônia
+    """
+    # Construções agendadas
+    for item in politica.get('construir', []):
+        if item['dia'] == dia:
+            for _ in range(item.get('quantidade', 1)):
+                colonia.construir_edificio(item['tipo'])
+
+    # Regras reativas: constrói quando um recurso fica abaixo do limite
+    for regra in politica.get('regras', []):
+        if colonia.recursos[regra['recurso']].quantidade < regra['abaixo_de']:
+            colonia.construir_edificio(regra['construir'])
+
+    # Contratação periódica
+    contratar = politica.get('contratar')
+    if contratar and dia % contratar.get('a_cada', 1) == 0:
+        limite = contratar.get('limite')
+        for _ in range(contratar.get('quantidade', 1)):
+            if limite is not None and colonia.total_colonos_vivos >= limite:
+                break
+            colonia.adicionar_colono()
+
+
+def _amostrar(colonia: Colonia) -> list:
+    """Retorna os valores atuais das séries amostradas."""
+    recursos = colonia.recursos
+    return [colonia.total_colonos_vivos] + [round(recursos[r].quantidade, 2) for r in SERIES[1:]]
+
+
+def executar(tarefa: tuple) -> dict:
+    """
+    Executa uma colônia do cenário do processo atual.
+
+    Args:
+        tarefa: Tupla (indice, semente, dias, amostragem)
+
+    Returns:
+        Dicionário com o resultado da execução
+    """
+    indice, semente, dias, amostragem = tarefa
+    cenario = _cenario
+
+    colonia = Colonia(
+        cenario.get('nome', 'Simulação'),
+        vetorizado=cenario.get('vetorizado', False),
+        empilhar=cenario.get('empilhar', False),
+        semente=semente,
+        historico_dias=0  # Execuções descartáveis: sem viagem no tempo
+    )
+    for recurso, valor in cenario.get('recursos_iniciais', {}).items():
+        colonia.recursos[recurso].remover(colonia.recursos[recurso].quantidade)
+        colonia.recursos[recurso].adicionar(valor)
+
+    politica = cenario.get('politica', {})
+    curvas = [_amostrar(colonia)]
+    eventos = 0
+    dias_sobrevividos = 0
+
+    for turno in range(1, dias + 1):
+        _aplicar_politica(colonia, politica, colonia.dia)
+        relatorio = colonia.processar_turno(salvar=False)
+        if relatorio['evento']:
+            eventos += 1
+
+        vivos = colonia.total_colonos_vivos
+        if vivos > 0:
+            dias_sobrevividos = turno
+        if turno % amostragem == 0 or vivos == 0:
+            # O estado final de uma colônia extinta vale para as amostras seguintes
+            curvas.append(_amostrar(colonia))
+        if vivos == 0:
+            break
+
+    return {
+        'execucao': indice,
+        'semente': semente,
+        'sobreviveu': colonia.total_colonos_vivos > 0,
+        'dias_sobrevividos': dias_sobrevividos,
+        'vivos': colonia.total_colonos_vivos,
+        'mortos': colonia.total_colonos_mortos,
+        'edificios': colonia.total_edificios,
+        'eventos': eventos,
+        'recursos': {r: round(rec.quantidade, 2) for r, rec in colonia.recursos.items()},
+        'curvas': curvas
+    }
+
+
+def percentil(valores_ordenados: list, p: float) -> float:
+    """
+    Percentil com interpolação linear (sem depender de NumPy).
+
+    Args:
+        valores_ordenados: Valores em ordem crescente
+        p: Percentil (0-100)
+
+    Returns:
+        Valor do percentil
+    """
+    if not valores_ordenados:
+        return 0
+    posicao = (len(valores_ordenados) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(valores_ordenados) - 1)
+    fracao = posicao - inferior
+    return valores_ordenados[inferior] * (1 - fracao) + valores_ordenados[superior] * fracao
+
+
+def _percentis(valores: list) -> dict:
+    """Retorna {'p5': ..., 'p50': ..., 'p95': ...} dos valores."""
+    ordenados = sorted(valores)
+    return {f"p{p}": round(percentil(ordenados, p), 2) for p in PERCENTIS}
+
+
+class AgregadorResultados:
+    """
+    Acumula os resultados das execuções para o relatório final.
+    Guarda só os números necessários, não os resultados completos.
+    """
+
+    def __init__(self, dias: int, amostragem: int):
+        """
+        Inicializa o agregador.
+
+        Args:
+            dias: Dias simulados por execução
+            amostragem: Intervalo (em dias) entre amostras das curvas
+        """
+        self.__dias_amostrados = list(range(0, dias + 1, amostragem))
+        self.__dias_sobrevividos = []
+        self.__vivos = []
+        self.__mortos = []
+        self.__sobreviventes = 0
+        # series[serie][amostra] -> valores de todas as execuções
+        self.__series = {s: [[] for _ in self.__dias_amostrados] for s in SERIES}
+
+    def adicionar(self, resultado: dict):
+        """Registra o resultado de uma execução."""
+        self.__dias_sobrevividos.append(resultado['dias_sobrevividos'])
+        self.__vivos.append(resultado['vivos'])
+        self.__mortos.append(resultado['mortos'])
+        if resultado['sobreviveu']:
+            self.__sobreviventes += 1
+
+        # Execuções encerradas antes mantêm o último estado
+        curvas = resultado['curvas']
+        for amostra in range(len(self.__dias_amostrados)):
+            valores = curvas[min(amostra, len(curvas) - 1)]
+            for s, valor in zip(SERIES, valores):
+                self.__series[s][amostra].append(valor)
+
+    def relatorio(self) -> dict:
+        """
+        Gera o relatório de percentis.
+
+        Returns:
+            Dicionário com taxa de sobrevivência, percentis finais e curvas
+        """
+        execucoes = len(self.__vivos)
+        curvas = {'dias': [d + 1 for d in self.__dias_amostrados]}
+        curvas['sobrevivencia'] = [
+            round(sum(1 for v in valores if v > 0) / execucoes, 4) if execucoes else 0
+            for valores in self.__series['vivos']
+        ]
+        for s in SERIES:
+            por_percentil = [_percentis(valores) for valores in self.__series[s]]
+            curvas[s] = {f"p{p}": [a[f"p{p}"] for a in por_percentil] for p in PERCENTIS}
+
+        return {
+            'execucoes': execucoes,
+            'taxa_sobrevivencia': round(self.__sobreviventes / execucoes, 4) if execucoes else 0,
+            'dias_sobrevividos': _percentis(self.__dias_sobrevividos),
+            'vivos_final': _percentis(self.__vivos),
+            'mortos_final': _percentis(self.__mortos),
+            'curvas': curvas
+        }
+
+
+def simular(cenario: dict, execucoes: int, dias: int, saida: str = None,
+            processos: int = None, semente: int = None, amostragem: int = 7) -> dict:
+    """
+    Executa as simulações e retorna o relatório.
+
+    Args:
+        cenario: Cenário carregado com carregar_cenario()
+        execucoes: Número de colônias simuladas
+        dias: Dias por execução
+        saida: Arquivo JSONL com um resultado por linha (opcional)
+        processos: Número de processos (padrão: todos os núcleos)
+        semente: Semente base; cada execução recebe uma semente derivada
+        amostragem: Intervalo (em dias) entre amostras das curvas
+
+    Returns:
+        Dicionário do relatório
+    """
+    if execucoes < 1 or dias < 1 or amostragem < 1:
+        raise ValueError("Execuções, dias e amostragem devem ser maiores que 0")
+
+    processos = processos or os.cpu_count() or 1
+    gerador = random.Random(semente)
+    tarefas = [(i, gerador.getrandbits(63), dias, amostragem) for i in range(execucoes)]
+    agregador = AgregadorResultados(dias, amostragem)
+
+    arquivo = open(saida, 'w', encoding='utf-8') if saida else None
+    try:
+        if processos == 1:
+            _inicializar_processo(cenario)
+            resultados = map(executar, tarefas)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(
+                max_workers=processos,
+                initializer=_inicializar_processo,
+                initargs=(cenario,)
+            )
+            # Lotes grandes diluem o custo de comunicação entre processos
+            lote = max(1, execucoes // (processos * 16))
+            resultados = executor.map(executar, tarefas, chunksize=lote)
+
+        for resultado in resultados:
+            agregador.adicionar(resultado)
+            if arquivo:
+                arquivo.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+
+        if executor is not None:
+            executor.shutdown()
+    finally:
+        if arquivo:
+            arquivo.close()
+
+    relatorio = agregador.relatorio()
+    relatorio['dias'] = dias
+    relatorio['semente'] = semente
+    return relatorio
+
+
+def imprimir_relatorio(relatorio: dict):
+    """Imprime um resumo legível do relatório."""
+    print(f"Execuções: {relatorio['execucoes']} | Dias: {relatorio['dias']}")
+    print(f"Taxa de sobrevivência: {relatorio['taxa_sobrevivencia'] * 100:.1f}%")
+    for chave in ('dias_sobrevividos', 'vivos_final', 'mortos_final'):
+        p = relatorio[chave]
+        print(f"{chave:<18} p5={p['p5']:<8} p50={p['p50']:<8} p95={p['p95']}")
+
+    curvas = relatorio['curvas']
+    print()
+    print(f"{'dia':>5} {'sobrev.':>8}" + "".join(f" {s + ' p50 [p5-p95]':>26}" for s in SERIES))
+    for i, dia in enumerate(curvas['dias']):
+        linha = f"{dia:>5} {curvas['sobrevivencia'][i] * 100:>7.1f}%"
+        for s in SERIES:
+            faixa = f"{curvas[s]['p50'][i]:g} [{curvas[s]['p5'][i]:g}-{curvas[s]['p95'][i]:g}]"
+            linha += f" {faixa:>26}"
+        print(linha)
+
+
+def main(argv: list = None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(description="Simulação Monte Carlo de colônias")
+    parser.add_argument('cenario', help="Arquivo JSON do cenário")
+    parser.add_argument('--execucoes', '-n', type=int, help="Número de execuções")
+    parser.add_argument('--dias', '-d', type=int, help="Dias por execução")
+    parser.add_argument('--saida', '-o', help="Arquivo JSONL com os resultados de cada execução")
+    parser.add_argument('--relatorio', help="Arquivo JSON para o relatório de percentis")
+    parser.add_argument('--processos', '-p', type=int, help="Processos (padrão: todos os núcleos)")
+    parser.add_argument('--semente', '-s', type=int, help="Semente base das execuções")
+    parser.add_argument('--amostragem', type=int, default=7, help="Intervalo em dias entre amostras")
+    args = parser.parse_args(argv)
+
+    cenario = carregar_cenario(args.cenario)
+    execucoes = args.execucoes or cenario.get('execucoes', 100)
+    dias = args.dias or cenario.get('dias', 365)
+
+    inicio = time.perf_counter()
+    relatorio = simular(cenario, execucoes, dias, args.saida, args.processos,
+                        args.semente, args.amostragem)
+    relatorio['segundos'] = round(time.perf_counter() - inicio, 2)
+
+    imprimir_relatorio(relatorio)
+    print(f"\nConcluído em {relatorio['segundos']}s")
+
+    if args.relatorio:
+        with open(args.relatorio, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Configuração comum dos testes: cada teste roda em uma pasta temporária,
+para que saves, diários e logs não fiquem no projeto.
+"""
+import io
+import json
+import os
+import sys
+from wsgiref.util import setup_testing_defaults
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+@pytest.fixture(autouse=True)
+def pasta_temporaria(tmp_path, monkeypatch):
+    """Executa o teste com a pasta temporária como diretório atual."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class ClienteWSGI:
+    """
+    Cliente mínimo do app Bottle, chamado direto pela interface WSGI (sem
+    servidor), que guarda os cookies recebidos (a sessão).
+    """
+
+    def __init__(self, aplicacao):
+        self.aplicacao = aplicacao
+        self.cookies = {}
+
+    def requisitar(self, caminho: str, metodo: str = 'GET', corpo: bytes = b'',
+                   cabecalhos: dict = None, tipo: str = None):
+        """
+        Faz uma requisição.
+
+        Returns:
+            Tupla (status, cabeçalhos, corpo em bytes)
+        """
+        caminho, _, consulta = caminho.partition('?')
+        ambiente = {'REQUEST_METHOD': metodo, 'PATH_INFO': caminho, 'QUERY_STRING': consulta,
+                    'CONTENT_LENGTH': str(len(corpo)), 'wsgi.input': io.BytesIO(corpo)}
+        if tipo:
+            ambiente['CONTENT_TYPE'] = tipo
+        for nome, valor in (cabecalhos or {}).items():
+            ambiente['HTTP_' + nome.upper().replace('-', '_')] = valor
+        if self.cookies:
+            ambiente['HTTP_COOKIE'] = '; '.join(f'{nome}={valor}' for nome, valor in self.cookies.items())
+        setup_testing_defaults(ambiente)
+
+        resposta = {}
+
+        def iniciar_resposta(status, lista_cabecalhos, exc_info=None):
+            resposta['status'] = int(status.split()[0])
+            resposta['cabecalhos'] = lista_cabecalhos
+
+        dados = b''.join(self.aplicacao(ambiente, iniciar_resposta))
+        for nome, valor in resposta['cabecalhos']:
+            if nome.lower() == 'set-cookie':
+                cookie, _, valor_cookie = valor.split(';')[0].partition('=')
+                self.cookies[cookie] = valor_cookie
+        return resposta['status'], dict(resposta['cabecalhos']), dados
+
+
+@pytest.fixture
+def cliente(pasta_temporaria):
+    """
+    Cliente do app (app.py) com um usuário logado e uma colônia nova
+    (o save dela em `cliente.save`). O app lê views/ e static/ do projeto
+    ao ser importado; saves, logs e usuários ficam na pasta temporária.
+    """
+    for pasta in ('views', 'static'):
+        os.symlink(os.path.join(RAIZ, pasta), pasta)
+    import app
+
+    # Um save por teste: o cache de colônias do app é do processo
+    usuario = {'id': 1, 'username': 'teste', 'password': 'senha',
+               'save_file': f'saves/{pasta_temporaria.name}.bin'}
+    with open('usuarios.json', 'w', encoding='utf-8') as f:
+        json.dump({'usuarios': [usuario]}, f)
+
+    cliente = ClienteWSGI(app.app)
+    cliente.save = usuario['save_file']
+    cliente.requisitar('/login', 'POST', b'username=teste&password=senha',
+                       tipo='application/x-www-form-urlencoded')
+    cliente.requisitar('/novo_jogo', 'POST', b'nome_colonia=Teste',
+                       tipo='application/x-www-form-urlencoded')
+    yield cliente
+    app.cache_colonias.descartar(cliente.save)
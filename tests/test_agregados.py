@@ -0,0 +1,93 @@
+"""
+Testes dos agregados incrementais da colônia: depois de cada alteração
+devem ser iguais a uma recontagem completa (Colonia.verificar_agregados).
+"""
+import pytest
+
+from models import Colonia, NUMPY_DISPONIVEL
+
+MOTORES = [
+    pytest.param(True, id='vetorizado',
+                 marks=pytest.mark.skipif(not NUMPY_DISPONIVEL, reason="NumPy ausente")),
+    pytest.param(False, id='objetos'),
+]
+
+
+@pytest.fixture(autouse=True)
+def depurar_agregados(monkeypatch):
+    """Toda leitura dos agregados também os confere com uma recontagem."""
+    monkeypatch.setattr(Colonia, 'DEBUG_AGREGADOS', True)
+
+
+def abastecer(colonia: Colonia):
+    """Enche os recursos da colônia."""
+    for recurso in colonia.recursos.values():
+        recurso.adicionar(recurso.capacidade_maxima)
+
+
+@pytest.mark.parametrize('vetorizado', MOTORES)
+def test_construir_e_contratar(vetorizado):
+    colonia = Colonia('Agregados', vetorizado=vetorizado, semente=1)
+    for tipo in ('habitacao', 'habitacao', 'hospital', 'fazenda'):
+        abastecer(colonia)
+        assert colonia.construir_edificio(tipo)[0]
+        colonia.verificar_agregados()
+
+    contratados = 0
+    while colonia.adicionar_colono()[0]:
+        contratados += 1
+        colonia.verificar_agregados()
+    assert colonia.total_colonos_vivos == colonia.capacidade_habitacao
+    assert colonia.agregados['vivos'] == 3 + contratados
+
+
+@pytest.mark.parametrize('vetorizado', MOTORES)
+def test_mortes(vetorizado):
+    colonia = Colonia('Agregados', vetorizado=vetorizado, semente=2)
+    for _ in range(8):
+        colonia.adicionar_colono()
+
+    # Sem reposição de recursos os colonos passam fome até morrer
+    for _ in range(40):
+        colonia.processar_turno(salvar=False)
+        colonia.verificar_agregados()
+    assert colonia.agregados['mortos'] > 0
+    assert colonia.agregados['mortos'] == colonia.total_colonos_mortos
+
+
+@pytest.mark.parametrize('vetorizado', MOTORES)
+def test_desempilhar(vetorizado):
+    colonia = Colonia('Agregados', vetorizado=vetorizado, empilhar=True, semente=3)
+    for _ in range(6):
+        abastecer(colonia)
+        assert colonia.construir_edificio('habitacao')[0]
+    habitacoes, = colonia.edificios_do_tipo('Habitacao')
+    assert habitacoes.quantidade == 6
+
+    # Em manutenção, cada habitação volta a funcionar com 30% de chance
+    # por turno e sai do grupo
+    habitacoes.status = 'manutencao'
+    colonia.verificar_agregados()
+    assert colonia.capacidade_habitacao == 0
+    grupos = set()
+    for _ in range(30):
+        abastecer(colonia)
+        colonia.processar_turno(salvar=False)
+        colonia.verificar_agregados()
+        grupos.add(len(colonia.edificios_do_tipo('Habitacao')))
+    assert max(grupos) > 1
+    assert colonia.totais_edificios['Habitacao'] == {'ativo': 6, 'manutencao': 0}
+    assert colonia.capacidade_habitacao == 6 * habitacoes.capacidade
+
+
+@pytest.mark.parametrize('vetorizado', MOTORES)
+def test_carregar_refaz_agregados(vetorizado):
+    colonia = Colonia('Agregados', vetorizado=vetorizado, semente=4)
+    for _ in range(10):
+        abastecer(colonia)
+        colonia.adicionar_colono()
+        colonia.processar_turno(salvar=False)
+
+    carregada = Colonia.desserializar(colonia.serializar())
+    carregada.verificar_agregados()
+    assert carregada.agregados == colonia.agregados
@@ -0,0 +1,39 @@
+"""
+Testes do fluxo aleatório de cada colônia (models.aleatorio).
+"""
+from models import Colonia
+
+
+def lotar(colonia: Colonia):
+    """Constrói uma habitação e contrata até a capacidade."""
+    for recurso in colonia.recursos.values():
+        recurso.adicionar(500)
+    assert colonia.construir_edificio('habitacao')[0]
+    while colonia.adicionar_colono()[0]:
+        pass
+
+
+def test_mesma_semente_mesma_partida():
+    colonias = [Colonia('Semente', semente=21) for _ in range(2)]
+    for colonia in colonias:
+        lotar(colonia)
+        colonia.processar_turnos(10, salvar=False)
+    primeira, segunda = colonias
+    assert ([c.to_dict() | {'id': None} for c in primeira.colonos]
+            == [c.to_dict() | {'id': None} for c in segunda.colonos])
+    assert primeira.rng.estado == segunda.rng.estado
+
+
+def test_contratacao_recusada_nao_avanca_o_fluxo():
+    colonia = Colonia('Semente', semente=5)
+    lotar(colonia)
+    estado = colonia.rng.estado
+
+    sucesso, _ = colonia.adicionar_colono()
+    assert not sucesso
+    assert colonia.rng.estado == estado
+
+    # A recusa não muda a partida: mesmos turnos que uma colônia sem ela
+    referencia = Colonia('Semente', semente=5)
+    lotar(referencia)
+    assert colonia.processar_turno(salvar=False) == referencia.processar_turno(salvar=False)
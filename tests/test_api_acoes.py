@@ -0,0 +1,71 @@
+"""
+Testes do /api/acoes: limites do lote e comandos aplicados (e gravados no
+diário) antes de um que falha.
+"""
+import json
+
+from models import DiarioAcoes
+
+
+def acoes(cliente, comandos):
+    """POST /api/acoes; retorna (status, dados)."""
+    codigo, _, corpo = cliente.requisitar('/api/acoes', 'POST', json.dumps(comandos).encode('utf-8'),
+                                          tipo='application/json')
+    return codigo, json.loads(corpo)
+
+
+def status(cliente):
+    """Estatísticas atuais (GET /api/status)."""
+    return json.loads(cliente.requisitar('/api/status')[2])
+
+
+def test_limite_de_comandos_por_lote(cliente):
+    codigo, dados = acoes(cliente, [{'acao': 'contratar'}] * 201)
+    assert codigo == 400
+    assert 'erro' in dados
+    assert status(cliente)['colonos_vivos'] == 3  # Nada foi executado
+
+    codigo, dados = acoes(cliente, [{'acao': 'contratar'}] * 200)
+    assert codigo == 200
+    assert len(dados['resultados']) == 200
+
+
+def test_limite_de_turnos_por_lote(cliente):
+    codigo, dados = acoes(cliente, [{'acao': 'turno', 'n': 300}, {'acao': 'turno', 'n': 300},
+                                    {'acao': 'turno'}, {'acao': 'contratar'}])
+    assert codigo == 200
+    primeiro, segundo, terceiro, contratar = dados['resultados']
+    assert primeiro['sucesso'] and segundo['sucesso']
+    assert terceiro['sucesso'] is False
+    assert 'Limite de 500 turnos' in terceiro['mensagem']
+    assert 'sucesso' in contratar  # Os demais comandos continuam
+
+    # Um comando sozinho também é limitado
+    acoes(cliente, [{'acao': 'turno', 'n': 10000}])
+
+    # Turnos pedidos a cada comando, como gravados no diário (a partida
+    # pode acabar antes, com todos os colonos mortos)
+    registros = DiarioAcoes(cliente.save)._ler_registros()
+    assert [r['args']['n'] for r in registros if r['acao'] == 'proximo_turno'] == [300, 200, 500]
+
+
+def test_falha_no_meio_do_lote(cliente, monkeypatch):
+    def falhar(colonia, argumentos):
+        raise RuntimeError("Falha ao construir")
+
+    monkeypatch.setitem(DiarioAcoes.ACOES, 'construir', falhar)
+    codigo, dados = acoes(cliente, [{'acao': 'contratar'},
+                                    {'acao': 'construir', 'tipo': 'fazenda'},
+                                    {'acao': 'contratar'}])
+    assert codigo == 500
+    assert 'Falha ao construir' in dados['erro']
+
+    # O comando anterior ao que falhou foi aplicado; o seguinte, não
+    assert status(cliente)['colonos_vivos'] == 4
+
+    # Os dois executados estão no diário, o que falhou marcado
+    diario = DiarioAcoes(cliente.save)
+    registros = diario._ler_registros()
+    assert [(r['acao'], r.get('falhou', False)) for r in registros] == [('contratar', False),
+                                                                         ('construir', True)]
+    assert diario.recuperar().total_colonos_vivos == 4
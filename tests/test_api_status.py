@@ -0,0 +1,121 @@
+"""
+Testes do /api/status: ETag e 304 (inclusive a ETag fraca das respostas
+comprimidas), respostas ?since= e versões que nunca se repetem.
+"""
+import gzip
+import json
+
+from models import Colonia
+
+SAVE = 'saves/colonia.bin'
+
+
+def status(cliente, consulta: str = '', **cabecalhos):
+    """GET /api/status; retorna (status, ETag, dados ou None)."""
+    codigo, resposta, corpo = cliente.requisitar('/api/status' + consulta, cabecalhos=cabecalhos)
+    if resposta.get('Content-Encoding') == 'gzip':
+        corpo = gzip.decompress(corpo)
+    return codigo, resposta.get('Etag'), json.loads(corpo) if corpo else None
+
+
+def acoes(cliente, *comandos):
+    """POST /api/acoes com os comandos."""
+    return cliente.requisitar('/api/acoes', 'POST', json.dumps(comandos).encode('utf-8'),
+                              tipo='application/json')
+
+
+def test_etag_e_304(cliente):
+    codigo, etag, dados = status(cliente)
+    assert codigo == 200
+    assert etag == f'"{dados["versao"]}"'
+
+    codigo, etag_304, dados = status(cliente, If_None_Match=etag)
+    assert (codigo, etag_304, dados) == (304, etag, None)
+
+    # Uma ação muda a versão: a ETag antiga deixa de corresponder
+    acoes(cliente, {'acao': 'contratar'})
+    codigo, nova, dados = status(cliente, If_None_Match=etag)
+    assert codigo == 200
+    assert nova != etag
+    assert dados['colonos_vivos'] == 4
+
+
+def test_etag_fraca_da_resposta_comprimida(cliente):
+    codigo, etag, _ = status(cliente, Accept_Encoding='gzip')
+    assert codigo == 200
+    assert etag.startswith('W/"')
+
+    # O navegador devolve a ETag fraca, que corresponde à mesma versão
+    codigo, _, dados = status(cliente, Accept_Encoding='gzip', If_None_Match=etag)
+    assert (codigo, dados) == (304, None)
+    codigo, _, _ = status(cliente, If_None_Match=etag)
+    assert codigo == 304
+
+
+def test_since_traz_so_os_paineis_alterados(cliente):
+    _, _, inicial = status(cliente)
+    versao = inicial['versao']
+
+    acoes(cliente, {'acao': 'contratar'})
+    codigo, etag, dados = status(cliente, f'?since={versao}')
+    assert codigo == 200
+    assert dados['completo'] is False
+    assert dados['desde'] == versao
+    assert etag.endswith(f'-d{versao.split(".")[1]}"')
+    assert dados['colonos_vivos'] == 4
+    assert len(dados['colonos']['novos']) == 1
+    # Recursos, edifícios e eventos não mudaram: nem entram na resposta
+    assert not {'recursos', 'edificios', 'eventos_recentes'} & set(dados)
+
+    # Desde a versão atual: nada mudou, nada é montado
+    atual = dados['versao']
+    _, _, dados = status(cliente, f'?since={atual}')
+    assert dados == {'versao': atual, 'desde': atual, 'completo': False}
+
+    # A resposta parcial também fica guardada, completa, como base do
+    # próximo ?since=
+    acoes(cliente, {'acao': 'contratar'})
+    _, _, dados = status(cliente, f'?since={atual}')
+    assert dados['completo'] is False
+    assert dados['colonos_vivos'] == 5
+    assert len(dados['colonos']['novos']) == 1
+    atual = dados['versao']
+
+    acoes(cliente, {'acao': 'turno'})
+    _, _, dados = status(cliente, f'?since={atual}')
+    assert dados['completo'] is False
+    assert dados['dia'] == 2
+    assert 'recursos' in dados
+    assert dados['colonos']['novos'] == []
+
+
+def test_since_de_outro_processo_traz_tudo(cliente):
+    _, _, inicial = status(cliente)
+    numero = inicial['versao'].split('.')[1]
+
+    codigo, etag, dados = status(cliente, f'?since=outro.{numero}')
+    assert codigo == 200
+    assert dados['completo'] is True
+    assert dados['colonos_vivos'] == 3 and len(dados['colonos']) == 3
+    assert etag.endswith('-d"')
+
+    codigo, _, dados = status(cliente, f'?since={numero}')
+    assert codigo == 400
+    assert 'erro' in dados
+
+
+def test_versao_nunca_se_repete_ao_recarregar():
+    colonia = Colonia('Versões', semente=1)
+    colonia.salvar(SAVE)
+    colonia.adicionar_colono()
+
+    # Recarregada (ex.: saiu do cache), a colônia não volta a uma versão já vista
+    carregada = Colonia.carregar(SAVE)
+    assert carregada.versao > colonia.versao
+    assert min(carregada.versoes_paineis.values()) > colonia.versao
+
+    # Voltar no tempo também só avança a versão
+    carregada.processar_turno(salvar=False)
+    versao = carregada.versao
+    assert carregada.voltar_para_dia(1)[0]
+    assert carregada.versao > versao
@@ -0,0 +1,66 @@
+"""
+Testes do cache de colônias (models.cache_colonias): trava dos saves
+entre instâncias do servidor.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from models import CacheColonias, Colonia, ColoniaEmUso, DiarioAcoes
+
+SAVE = 'saves/colonia.bin'
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def save():
+    """Save de uma colônia nova."""
+    Colonia('Cache', semente=1).salvar(SAVE)
+    return SAVE
+
+
+def test_segundo_cache_recebe_colonia_em_uso(save):
+    primeiro = CacheColonias(travar_saves=True)
+    segundo = CacheColonias(travar_saves=True)
+
+    colonia, _ = primeiro.obter(save)
+    assert colonia is not None
+    with pytest.raises(ColoniaEmUso):
+        segundo.obter(save)
+    with pytest.raises(ColoniaEmUso):
+        segundo.guardar(save, Colonia('Outra'), DiarioAcoes(save))
+
+    # Ao sair do primeiro cache (com o snapshot gravado) a trava é liberada
+    primeiro.esvaziar()
+    colonia, _ = segundo.obter(save)
+    assert colonia is not None
+    segundo.descartar(save)
+
+
+def test_outro_processo_recebe_colonia_em_uso(save):
+    cache = CacheColonias(travar_saves=True)
+    cache.obter(save)
+
+    codigo = (
+        "import sys\n"
+        "from models import CacheColonias, ColoniaEmUso\n"
+        "try:\n"
+        f"    CacheColonias(travar_saves=True).obter({save!r})\n"
+        "except ColoniaEmUso:\n"
+        "    sys.exit(3)\n"
+    )
+    ambiente = dict(os.environ, PYTHONPATH=RAIZ)
+    assert subprocess.run([sys.executable, '-c', codigo], env=ambiente).returncode == 3
+
+    cache.descartar(save)
+    assert subprocess.run([sys.executable, '-c', codigo], env=ambiente).returncode == 0
+
+
+def test_sem_travar_saves_nao_ha_trava(save):
+    primeiro = CacheColonias()
+    segundo = CacheColonias()
+    assert primeiro.obter(save)[0] is not None
+    assert segundo.obter(save)[0] is not None
+    assert not os.path.exists('saves/colonia.bin.trava')
@@ -0,0 +1,139 @@
+"""
+Testes do diário de ações (models.diario): snapshot, ações e recuperação.
+"""
+import os
+
+import pytest
+
+from models import Colonia, DiarioAcoes, SalvadorBackground
+
+# Ações da partida: (ação, argumentos)
+ACOES = [
+    ('proximo_turno', {'n': 2}),
+    ('construir', {'tipo': 'fazenda'}),
+    ('contratar', {}),
+    ('proximo_turno', {'n': 3}),
+    ('construir', {'tipo': 'poco'}),
+    ('proximo_turno', {'n': 1}),
+    ('contratar', {}),
+    ('construir', {'tipo': 'casa'}),
+    ('proximo_turno', {'n': 4}),
+]
+
+
+def sem_ids(valor):
+    """
+    Estatísticas sem os IDs das entidades: os colonos e edifícios criados
+    depois do snapshot ganham IDs novos ao reaplicar o diário.
+    """
+    if isinstance(valor, dict):
+        return {chave: sem_ids(v) for chave, v in valor.items() if chave != 'id'}
+    if isinstance(valor, list):
+        return [sem_ids(v) for v in valor]
+    return valor
+
+
+def estado_comparavel(colonia: Colonia) -> tuple:
+    """Estatísticas (sem IDs), gerador aleatório e sequência do diário."""
+    return sem_ids(colonia.obter_estatisticas()), colonia.rng.estado, colonia._seq_diario
+
+
+def jogar(colonia: Colonia, diario: DiarioAcoes, acoes: list):
+    """Executa as ações pelo diário."""
+    for acao, argumentos in acoes:
+        diario.executar(colonia, acao, **argumentos)
+
+
+@pytest.mark.parametrize('intervalo', [1, 4, 100])
+def test_recuperar_reaplica_acoes_depois_do_snapshot(intervalo):
+    colonia = Colonia('Diário', semente=7)
+    diario = DiarioAcoes('saves/colonia.bin', intervalo_snapshot=intervalo)
+    diario.snapshot(colonia)
+    jogar(colonia, diario, ACOES)
+    assert diario.pendentes == len(ACOES) % intervalo
+
+    recuperada = DiarioAcoes('saves/colonia.bin').recuperar()
+    assert estado_comparavel(recuperada) == estado_comparavel(colonia)
+
+
+def test_recuperar_com_salvador_em_segundo_plano():
+    salvador = SalvadorBackground(janela=0.01)
+    try:
+        colonia = Colonia('Diário', semente=11)
+        diario = DiarioAcoes('saves/colonia.bin', intervalo_snapshot=3, salvador=salvador)
+        assert diario.snapshot(colonia, aguardar=True)
+        jogar(colonia, diario, ACOES)
+        with diario.trava:
+            esperado = estado_comparavel(colonia)
+
+        recuperada = DiarioAcoes('saves/colonia.bin', salvador=salvador).recuperar()
+        assert estado_comparavel(recuperada) == esperado
+    finally:
+        salvador.encerrar()
+
+
+def test_recuperar_viagem_no_tempo():
+    colonia = Colonia('Diário', semente=3, historico_dias=20)
+    diario = DiarioAcoes('saves/colonia.bin', intervalo_snapshot=5)
+    diario.snapshot(colonia)
+    jogar(colonia, diario, ACOES)
+    jogar(colonia, diario, [('voltar_dia', {'dia': 6}), ('proximo_turno', {'n': 2})])
+    assert colonia.dia == 8
+
+    recuperada = DiarioAcoes('saves/colonia.bin').recuperar()
+    assert estado_comparavel(recuperada) == estado_comparavel(colonia)
+    assert recuperada.historico.dias == colonia.historico.dias
+
+
+def test_diario_com_lacuna():
+    colonia = Colonia('Diário', semente=5)
+    diario = DiarioAcoes('saves/colonia.bin', intervalo_snapshot=100)
+    diario.snapshot(colonia)
+    jogar(colonia, diario, ACOES[:3])
+    with open('saves/colonia.bin.diario', encoding='utf-8') as f:
+        linhas = f.readlines()
+    with open('saves/colonia.bin.diario', 'w', encoding='utf-8') as f:
+        f.writelines(linhas[:1] + linhas[2:])
+
+    with pytest.raises(ValueError, match='lacuna'):
+        DiarioAcoes('saves/colonia.bin').recuperar()
+
+
+def test_acao_que_falha_no_meio_e_registrada(monkeypatch):
+    # Ação que altera a colônia e depois falha: o diário a registra para
+    # que a recuperação chegue ao mesmo estado
+    def contratar_e_falhar(colonia, argumentos):
+        colonia.adicionar_colono()
+        raise RuntimeError("falha depois de contratar")
+
+    monkeypatch.setitem(DiarioAcoes.ACOES, 'contratar_e_falhar', contratar_e_falhar)
+    colonia = Colonia('Diário', semente=13)
+    diario = DiarioAcoes('saves/colonia.bin', intervalo_snapshot=100)
+    diario.snapshot(colonia)
+    jogar(colonia, diario, ACOES[:2])
+    with pytest.raises(RuntimeError):
+        diario.executar(colonia, 'contratar_e_falhar')
+    with pytest.raises(RuntimeError):
+        diario.executar_lote(colonia, [('proximo_turno', {'n': 1}), ('contratar_e_falhar', {}),
+                                       ('construir', {'tipo': 'poco'})])
+    jogar(colonia, diario, ACOES[2:])
+    assert colonia._seq_diario == len(ACOES) + 3
+
+    recuperada = DiarioAcoes('saves/colonia.bin').recuperar()
+    assert estado_comparavel(recuperada) == estado_comparavel(colonia)
+
+
+def test_acao_confirmada_esta_no_disco(monkeypatch):
+    sincronizados = []
+    fsync = os.fsync
+    monkeypatch.setattr(os, 'fsync', lambda fd: sincronizados.append(fd) or fsync(fd))
+
+    colonia = Colonia('Diário', semente=17)
+    diario = DiarioAcoes('saves/colonia.bin', intervalo_snapshot=100)
+    diario.snapshot(colonia)
+    sincronizados.clear()
+
+    diario.executar(colonia, 'contratar')
+    assert len(sincronizados) == 1
+    diario.executar_lote(colonia, ACOES)
+    assert len(sincronizados) == 2
@@ -0,0 +1,113 @@
+"""
+Testes do formato binário dos saves (models.formato_binario).
+"""
+import pytest
+
+from models import Colonia, NUMPY_DISPONIVEL, eh_formato_binario
+from models.formato_binario import VERSAO_FORMATO, _CABECALHO
+
+MOTORES = [
+    pytest.param(True, id='vetorizado',
+                 marks=pytest.mark.skipif(not NUMPY_DISPONIVEL, reason="NumPy ausente")),
+    pytest.param(False, id='objetos'),
+]
+
+
+def colonia_jogada(vetorizado: bool, turnos: int = 12) -> Colonia:
+    """Colônia com edifícios, colonos novos e eventos após alguns turnos."""
+    colonia = Colonia('Teste', vetorizado=vetorizado, semente=42)
+    for i in range(turnos):
+        for recurso in colonia.recursos.values():
+            recurso.adicionar(200)
+        if i % 3 == 0:
+            colonia.construir_edificio(('fazenda', 'poco', 'casa')[i % 9 // 3])
+            colonia.adicionar_colono()
+        colonia.processar_turno(salvar=False)
+    return colonia
+
+
+def estado_comparavel(colonia: Colonia) -> tuple:
+    """Estatísticas, gerador aleatório e eventos da colônia."""
+    return (colonia.obter_estatisticas(), colonia.rng.estado,
+            colonia.eventos_historico, colonia.eventos.total)
+
+
+@pytest.mark.parametrize('vetorizado', MOTORES)
+@pytest.mark.parametrize('compressao', ['nenhuma', 'zlib', 'lzma'])
+def test_ida_e_volta(vetorizado, compressao):
+    colonia = colonia_jogada(vetorizado)
+    dados = colonia.serializar('binario', compressao)
+
+    assert eh_formato_binario(dados)
+    carregada = Colonia.desserializar(dados)
+    assert estado_comparavel(carregada) == estado_comparavel(colonia)
+
+    # A colônia carregada continua a partida igual à original
+    colonia.processar_turno(salvar=False)
+    carregada.processar_turno(salvar=False)
+    assert estado_comparavel(carregada) == estado_comparavel(colonia)
+
+
+@pytest.mark.parametrize('vetorizado', MOTORES)
+def test_salvar_e_carregar_arquivo_mapeado(vetorizado, monkeypatch):
+    monkeypatch.setattr(Colonia, 'COLONOS_SAVE_MAPEADO', 1)
+    monkeypatch.setattr(Colonia, 'MAPEAR_SAVES', True)
+    colonia = colonia_jogada(vetorizado)
+    colonia.salvar('saves/colonia.bin')
+
+    carregada = Colonia.carregar('saves/colonia.bin')
+    assert estado_comparavel(carregada) == estado_comparavel(colonia)
+
+    colonia.processar_turno(salvar=False)
+    carregada.processar_turno(salvar=False)
+    assert estado_comparavel(carregada) == estado_comparavel(colonia)
+
+
+def test_carregar_escolhe_formato_pelos_bytes_magicos():
+    colonia = colonia_jogada(vetorizado=False, turnos=4)
+    with open('colonia.pkl', 'wb') as f:
+        f.write(colonia.serializar('pickle'))
+    colonia.salvar('colonia.bin')
+
+    assert estado_comparavel(Colonia.carregar('colonia.pkl')) == estado_comparavel(colonia)
+    assert estado_comparavel(Colonia.carregar('colonia.bin')) == estado_comparavel(colonia)
+    with open('colonia.pkl', 'rb') as f:
+        assert not eh_formato_binario(f.read())
+
+
+def test_save_corrompido():
+    dados = bytearray(colonia_jogada(vetorizado=False, turnos=2).serializar('binario', 'nenhuma'))
+    dados[-1] ^= 0xFF
+    with pytest.raises(ValueError, match='corrompido'):
+        Colonia.desserializar(bytes(dados))
+
+
+def test_versao_desconhecida():
+    dados = bytearray(colonia_jogada(vetorizado=False, turnos=2).serializar('binario'))
+    magico, _, compressao, reservado, tamanho, crc = _CABECALHO.unpack_from(dados, 0)
+    _CABECALHO.pack_into(dados, 0, magico, VERSAO_FORMATO + 1, compressao, reservado, tamanho, crc)
+    with pytest.raises(ValueError, match='Versão'):
+        Colonia.desserializar(bytes(dados))
+
+
+
+def test_crc_de_save_mapeado_so_quando_pedido(monkeypatch):
+    monkeypatch.setattr(Colonia, 'COMPRESSAO_SAVE', 'nenhuma')
+    colonia_jogada(vetorizado=False, turnos=4).salvar('colonia.bin')
+    with open('colonia.bin', 'r+b') as f:
+        f.seek(-1, 2)
+        ultimo = f.read(1)
+        f.seek(-1, 2)
+        f.write(bytes([ultimo[0] ^ 0xFF]))
+
+    # Mapeado, o CRC leria o arquivo inteiro: só é conferido se pedido
+    monkeypatch.setattr(Colonia, 'MAPEAR_SAVES', True)
+    assert Colonia.carregar('colonia.bin') is not None
+    monkeypatch.setattr(Colonia, 'VERIFICAR_SAVES_MAPEADOS', True)
+    with pytest.raises(ValueError, match='corrompido'):
+        Colonia.carregar('colonia.bin')
+
+    monkeypatch.setattr(Colonia, 'VERIFICAR_SAVES_MAPEADOS', False)
+    monkeypatch.setattr(Colonia, 'MAPEAR_SAVES', False)
+    with pytest.raises(ValueError, match='corrompido'):
+        Colonia.carregar('colonia.bin')
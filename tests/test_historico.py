@@ -0,0 +1,96 @@
+"""
+Testes do histórico de dias (models.historico): padrão, arquivo ao lado
+do save e coerência entre os dois depois de uma queda.
+"""
+from models import Colonia, HistoricoDias
+
+SAVE = 'saves/colonia.bin'
+
+
+def sem_ids(valor):
+    """Estatísticas sem os IDs das entidades."""
+    if isinstance(valor, dict):
+        return {chave: sem_ids(v) for chave, v in valor.items() if chave != 'id'}
+    if isinstance(valor, list):
+        return [sem_ids(v) for v in valor]
+    return valor
+
+
+def jogar(colonia: Colonia, turnos: int):
+    """Turnos com recursos repostos e uma contratação a cada 3."""
+    for i in range(turnos):
+        for recurso in colonia.recursos.values():
+            recurso.adicionar(100)
+        if i % 3 == 0:
+            colonia.adicionar_colono()
+        colonia.processar_turno(salvar=False)
+
+
+def dias_iguais(colonia: Colonia, outra: Colonia, dias) -> bool:
+    """Compara o estado reconstruído de cada dia nas duas colônias."""
+    return all(sem_ids(colonia.colonia_no_dia(dia).obter_estatisticas())
+               == sem_ids(outra.colonia_no_dia(dia).obter_estatisticas()) for dia in dias)
+
+
+def test_historico_ativo_por_padrao():
+    colonia = Colonia('Histórico', semente=1)
+    assert colonia.historico.limite == HistoricoDias.LIMITE_PADRAO == 1000
+    assert colonia.historico.intervalo_keyframe == 30
+    jogar(colonia, 5)
+    assert colonia.historico.dias == [1, 2, 3, 4, 5]
+    assert colonia.colonia_no_dia(3).dia == 3
+
+
+def test_dias_arquivados_ao_lado_do_save():
+    colonia = Colonia('Histórico', semente=2)
+    for _ in range(4):
+        jogar(colonia, 10)
+        colonia.salvar(SAVE)
+    assert colonia.historico.pendentes == []
+    assert colonia.historico.arquivadas == 40
+
+    carregada = Colonia.carregar(SAVE)
+    assert carregada.historico.dias == colonia.historico.dias == list(range(1, 41))
+    assert dias_iguais(colonia, carregada, [1, 17, 30, 31, 40])
+
+
+def test_queda_depois_de_arquivar_e_antes_do_save():
+    colonia = Colonia('Histórico', semente=3)
+    jogar(colonia, 12)
+    colonia.salvar(SAVE)
+    salva = Colonia.carregar(SAVE)
+
+    # Os dias seguintes chegam ao arquivo, mas o save que os conta não
+    jogar(colonia, 6)
+    colonia.preparar_salvamento(SAVE)
+
+    carregada = Colonia.carregar(SAVE)
+    assert carregada.historico.dias == list(range(1, 13))
+    assert dias_iguais(salva, carregada, carregada.historico.dias)
+
+    # Os registros que sobraram são sobrescritos pelos dias da nova partida
+    jogar(carregada, 8)
+    carregada.salvar(SAVE)
+    recarregada = Colonia.carregar(SAVE)
+    assert recarregada.historico.dias == list(range(1, 21))
+    assert dias_iguais(carregada, recarregada, recarregada.historico.dias)
+
+
+def test_queda_entre_reescrita_e_save():
+    colonia = Colonia('Histórico', semente=4)
+    jogar(colonia, 12)
+    colonia.salvar(SAVE)
+
+    # Voltar sobre dias arquivados reescreve o arquivo (nova geração) no
+    # próximo save; a queda impede que esse save chegue ao disco
+    assert colonia.voltar_para_dia(5)[0]
+    jogar(colonia, 3)
+    colonia.preparar_salvamento(SAVE)
+
+    carregada = Colonia.carregar(SAVE)
+    assert carregada.dia == 13
+    assert carregada.historico.dias == []
+    jogar(carregada, 2)
+    assert carregada.historico.dias == [13, 14]
+    carregada.salvar(SAVE)
+    assert Colonia.carregar(SAVE).historico.dias == [13, 14]
@@ -0,0 +1,122 @@
+"""
+Testes dos dois motores de colonos: objetos Colono e colunas NumPy
+(models.populacao) devem produzir os mesmos turnos com a mesma semente.
+"""
+import pytest
+
+from models import Colonia, NUMPY_DISPONIVEL
+
+pytestmark = pytest.mark.skipif(not NUMPY_DISPONIVEL, reason="NumPy ausente")
+
+
+def sem_ids(valor):
+    """Estatísticas sem os IDs das entidades (sorteados a cada criação)."""
+    if isinstance(valor, dict):
+        return {chave: sem_ids(v) for chave, v in valor.items() if chave != 'id'}
+    if isinstance(valor, list):
+        return [sem_ids(v) for v in valor]
+    return valor
+
+
+def estado_comparavel(colonia: Colonia) -> tuple:
+    """Colonos (vivos e mortos), estatísticas, eventos e gerador aleatório."""
+    return (sem_ids([c.to_dict() for c in colonia.colonos]),
+            sem_ids(colonia.obter_estatisticas()),
+            [r.to_dict() for r in colonia.eventos_historico],
+            colonia.rng.estado)
+
+
+def jogar_abastecida(colonia: Colonia, turnos: int):
+    """Partida com recursos repostos, construções e contratações."""
+    tipos = ('habitacao', 'hospital', 'fazenda', 'poco', 'habitacao', 'mina')
+    for i in range(turnos):
+        for recurso in colonia.recursos.values():
+            recurso.adicionar(150)
+        if i % 4 == 0:
+            colonia.construir_edificio(tipos[i // 4 % len(tipos)])
+            colonia.adicionar_colono()
+        yield colonia.processar_turno(salvar=False)
+
+
+def jogar_com_fome(colonia: Colonia, turnos: int):
+    """Partida sem reposição: racionamento, felicidade negativa e mortes."""
+    for _ in range(6):
+        colonia.adicionar_colono()
+    for _ in range(turnos):
+        yield colonia.processar_turno(salvar=False)
+
+
+@pytest.mark.parametrize('semente', [1, 2, 3])
+@pytest.mark.parametrize('partida', [jogar_abastecida, jogar_com_fome])
+def test_motores_produzem_os_mesmos_turnos(partida, semente):
+    objetos = Colonia('Motores', vetorizado=False, semente=semente)
+    vetorizada = Colonia('Motores', vetorizado=True, semente=semente)
+
+    for turno_objetos, turno_vetorizado in zip(partida(objetos, 40), partida(vetorizada, 40)):
+        assert turno_vetorizado == turno_objetos
+        assert estado_comparavel(vetorizada) == estado_comparavel(objetos)
+    assert objetos.dia == 41
+
+
+def test_partida_com_fome_mata_colonos():
+    colonia = Colonia('Motores', semente=1)
+    for _ in jogar_com_fome(colonia, 40):
+        pass
+    assert colonia.total_colonos_mortos > 0
+
+
+def colonia_faminta(vetorizado: bool, empilhar: bool, tipos: tuple) -> Colonia:
+    """
+    Colônia com hospitais e habitações construídos na ordem de `tipos`
+    e sem comida nem água (fazenda e purificador parados): a felicidade
+    fica negativa antes dos benefícios.
+    """
+    colonia = Colonia('Benefícios', vetorizado=vetorizado, empilhar=empilhar, semente=9)
+    for edificio in colonia.edificios:
+        if edificio.tipo in ('Fazenda', 'Purificador'):
+            edificio.status = 'inativo'
+    for tipo in tipos:
+        for recurso in colonia.recursos.values():
+            recurso.adicionar(500)
+        assert colonia.construir_edificio(tipo)[0]
+    for _ in range(12):
+        colonia.adicionar_colono()
+    colonia.recursos['comida'].remover(colonia.recursos['comida'].quantidade)
+    colonia.recursos['agua'].remover(colonia.recursos['agua'].quantidade)
+    return colonia
+
+
+def jogar_faminta(colonia: Colonia, turnos: int):
+    """Turnos com energia de sobra para hospitais e habitações."""
+    for _ in range(turnos):
+        colonia.recursos['energia'].adicionar(500)
+        yield colonia.processar_turno(salvar=False)
+
+
+ORDENS = {
+    'intercalados': ('habitacao', 'hospital', 'habitacao', 'habitacao', 'hospital', 'habitacao'),
+    'hospitais_primeiro': ('hospital', 'hospital', 'habitacao', 'habitacao'),
+    'habitacoes_primeiro': ('habitacao', 'habitacao', 'hospital', 'hospital'),
+}
+
+
+@pytest.mark.parametrize('empilhar', [False, True])
+@pytest.mark.parametrize('ordem', list(ORDENS))
+def test_beneficios_em_ordem_de_construcao(ordem, empilhar):
+    objetos = colonia_faminta(False, empilhar, ORDENS[ordem])
+    vetorizada = colonia_faminta(True, empilhar, ORDENS[ordem])
+
+    for turno_objetos, turno_vetorizado in zip(jogar_faminta(objetos, 15),
+                                               jogar_faminta(vetorizada, 15)):
+        assert turno_vetorizado == turno_objetos
+        assert estado_comparavel(vetorizada) == estado_comparavel(objetos)
+
+
+@pytest.mark.parametrize('vetorizado', [False, True])
+def test_ordem_dos_beneficios_muda_o_resultado(vetorizado):
+    # O hospital não limita a felicidade negativa em 0 e a habitação sim
+    def felicidades_atendidos(ordem):
+        colonia = colonia_faminta(vetorizado, False, ORDENS[ordem])
+        return [[c.felicidade for c in colonia.colonos[:3]] for _ in jogar_faminta(colonia, 15)]
+
+    assert felicidades_atendidos('hospitais_primeiro') != felicidades_atendidos('habitacoes_primeiro')